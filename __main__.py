@@ -1,43 +1,87 @@
 import argparse
 import os
+import sys
 
-from sakura_flow.cli_entry import register_cli_commands, handle_cli_command
-from sakura_flow.controller import TodoController
-from sakura_flow.manager import TodoManager
+from sakura_flow.cli_entry import register_cli_commands, handle_cli_command, READ_ONLY_COMMANDS
+from sakura_flow.boards import BoardRegistry, ALL_BOARDS
+from sakura_flow.backup import BackupScheduler
+from sakura_flow.config import load_config, config_path_for_root, configure_manager, data_path_for
+from sakura_flow.manager import DataFileError
+from sakura_flow.metrics import metrics
+from sakura_flow import daemon
 
 
-def main():
-    parser = argparse.ArgumentParser(description="Sakura Flow CLI")
-    register_cli_commands(parser)
-
-    args = parser.parse_args()
-
+def resolve_mcdr_root() -> str:
     # Determine data path logic
     cwd = os.getcwd()
     
     # Strategy: Try to find MCDR root relative to current location
     # Priority 1: If running inside plugin source folder (contains mcdreforged.plugin.json)
     if os.path.exists(os.path.join(cwd, "mcdreforged.plugin.json")):
-        mcdr_root = os.path.abspath(os.path.join(cwd, "../.."))
+        return os.path.abspath(os.path.join(cwd, "../.."))
     # Priority 2: If running in a directory that contains .pyz file (e.g. plugins dir)
     elif os.path.exists(os.path.join(cwd, "../sf_tasks")):
-        mcdr_root = os.path.abspath(os.path.join(cwd, ".."))
+        return os.path.abspath(os.path.join(cwd, ".."))
     # Priority 3: Fallback to current directory (assuming running from MCDR root)
     else:
         # If sf_tasks exists in ../.., use it
         if os.path.exists(os.path.join(cwd, "../../sf_tasks")):
-             mcdr_root = os.path.abspath(os.path.join(cwd, "../.."))
+             return os.path.abspath(os.path.join(cwd, "../.."))
         else:
              # If we really can't find it, assume we are in plugin folder as requested
-             mcdr_root = os.path.abspath(os.path.join(cwd, "../.."))
+             return os.path.abspath(os.path.join(cwd, "../.."))
 
-    data_path = os.path.join(mcdr_root, 'sf_tasks', 'tasks.json')
-    
-    # Initialize manager and controller
-    manager = TodoManager(data_path)
-    controller = TodoController(manager)
 
-    handle_cli_command(args, controller)
+def main():
+    parser = argparse.ArgumentParser(description="Sakura Flow CLI")
+    register_cli_commands(parser)
+
+    args = parser.parse_args()
+
+    mcdr_root = resolve_mcdr_root()
+    config = load_config(config_path_for_root(mcdr_root))
+    data_path = data_path_for(config, mcdr_root)
+    socket_path = daemon.default_socket_path(data_path)
+
+    # Fast path: hand the call to a resident daemon (standalone or hosted by the plugin) if one is listening
+    if args.command and args.command not in daemon.LOCAL_COMMANDS:
+        if daemon.forward(socket_path, sys.argv[1:], sys.stdout):
+            return
+
+    metrics.configure(slow_threshold_ms=config["slow_command_threshold_ms"], window=config["stats_window"],
+                      slow_logger=lambda msg: print(f"[WARN] {msg}", file=sys.stderr))
+
+    # Boards are loaded lazily: a plain command only ever opens the board it targets
+    boards = BoardRegistry(data_path, role="daemon" if args.command in daemon.SERVE_COMMANDS else "CLI",
+                           configure=lambda m: configure_manager(m, config),
+                           read_only=args.command in READ_ONLY_COMMANDS)
+
+    if args.command in daemon.SERVE_COMMANDS:
+        if not daemon.is_supported():
+            print("Unix domain sockets are not supported on this platform.")
+            return
+        server = daemon.TodoDaemon(boards, socket_path)
+        BackupScheduler(config["backup_interval_minutes"] * 60,
+                        lambda: [c.manager.backups for c in boards.loaded().values()],
+                        logger=lambda msg: print(f"[WARN] {msg}", file=sys.stderr)).start()
+        print(f"Serving boards in {boards.base_dir} on {server.socket_path} (Ctrl+C to stop)")
+        server.serve_forever()
+        return
+
+    try:
+        controller = boards.get(None if args.board == ALL_BOARDS else args.board)
+    except (ValueError, DataFileError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(2)
+    if controller.manager.recovered_from:
+        print(f"[WARN] {controller.manager.data_path} was unreadable, loaded backup {controller.manager.recovered_from}",
+              file=sys.stderr)
+
+    try:
+        handle_cli_command(args, controller, boards=boards)
+    except BrokenPipeError:
+        # Output was piped into a command that stopped reading early (e.g. `| head`)
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,94 @@
+"""
+CLI cold-start benchmark.
+
+Runs ``python __main__.py list`` in fresh interpreters against an empty
+temporary store and reports wall-clock startup time as JSON. The CLI path
+must stay stdlib-only, so the benchmark also verifies that MCDReforged is
+never imported.
+
+Usage: python benchmarks/cli_startup.py [--runs N] [--target-ms MS]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN_SCRIPT = os.path.join(PROJECT_ROOT, '__main__.py')
+
+# Executed in a child interpreter: runs the CLI entry exactly like __main__.py
+# and reports whether any MCDReforged module got imported along the way.
+PROBE = (
+    "import runpy, sys; sys.path.insert(0, {root!r}); sys.argv = [{script!r}, 'list']; "
+    "runpy.run_path({script!r}, run_name='__main__'); "
+    "print('MCDR_LOADED=' + str(any(m.split('.')[0] == 'mcdreforged' for m in sys.modules)))"
+)
+
+
+def make_workdir(root: str) -> str:
+    """__main__.py resolves the store as <cwd>/../../sf_tasks, so run two levels deep."""
+    workdir = os.path.join(root, 'plugins', 'SakuraFlow')
+    os.makedirs(workdir, exist_ok=True)
+    return workdir
+
+
+def time_cli(workdir: str, runs: int) -> list:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, MAIN_SCRIPT, 'list'], cwd=workdir,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def time_interpreter(runs: int) -> list:
+    """Baseline: bare interpreter startup, which no amount of import hygiene can remove."""
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', 'pass'], check=True)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def mcdr_loaded(workdir: str) -> bool:
+    code = PROBE.format(root=PROJECT_ROOT, script=MAIN_SCRIPT)
+    out = subprocess.run([sys.executable, '-c', code], cwd=workdir, capture_output=True, text=True, check=True).stdout
+    return 'MCDR_LOADED=True' in out
+
+
+def run(runs: int = 20, target_ms: float = 100.0) -> dict:
+    with tempfile.TemporaryDirectory() as root:
+        workdir = make_workdir(root)
+        cli = time_cli(workdir, runs)
+        base = time_interpreter(runs)
+        return {
+            'benchmark': 'cli_startup',
+            'runs': runs,
+            'cli_median_ms': round(statistics.median(cli), 2),
+            'cli_min_ms': round(min(cli), 2),
+            'interpreter_median_ms': round(statistics.median(base), 2),
+            'target_ms': target_ms,
+            'within_target': statistics.median(cli) < target_ms,
+            'mcdreforged_imported': mcdr_loaded(workdir),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--target-ms', type=float, default=100.0)
+    args = parser.parse_args()
+
+    result = run(args.runs, args.target_ms)
+    print(json.dumps(result, indent=4))
+    sys.exit(0 if result['within_target'] and not result['mcdreforged_imported'] else 1)
+
+
+if __name__ == '__main__':
+    main()
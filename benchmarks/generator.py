@@ -0,0 +1,103 @@
+"""
+Seeded synthetic board generator.
+
+Produces data in the exact tasks.json schema written by TodoManager, with the
+shapes that make real boards expensive: Zipf-skewed labels and collaborators,
+a dependency DAG with mostly local edges, a long tail of note counts and a
+large archive of Done tasks.
+"""
+import json
+import os
+import random
+import time
+from typing import Dict, Any, List
+
+from sakura_flow.constants import GT_TIERS
+from sakura_flow.enums import Status, Priority
+
+WORDS = [
+    "iron", "farm", "reactor", "wiring", "cooling", "shielding", "bee", "tree", "quarry", "smeltery",
+    "assembler", "multiblock", "boiler", "turbine", "sorter", "storage", "railway", "portal", "wither", "nether",
+    "建造", "刷铁机", "流水线", "仓库", "电网", "矿场", "农场", "高炉", "聚变", "反应堆",
+]
+EPOCH = 1_600_000_000  # 2020-09-13, a plausible board creation date
+
+
+def _zipf_weights(n: int, s: float = 1.2) -> List[float]:
+    return [1.0 / (rank ** s) for rank in range(1, n + 1)]
+
+
+def _fmt(ts: float) -> str:
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(ts))
+
+
+def generate_board(size: int, seed: int = 0, players: int = 60, labels: int = 200,
+                   max_notes: int = 200) -> Dict[str, Any]:
+    """
+    Build a board with ``size`` tasks.
+    :param players: size of the collaborator/creator population (Zipf-skewed)
+    :param labels: size of the label vocabulary (Zipf-skewed)
+    :param max_notes: cap of the heavy-tailed per-task note count
+    """
+    rng = random.Random(seed)
+    player_names = [f"Player{i:03d}" for i in range(players)]
+    label_names = [f"{rng.choice(WORDS)}-{i}" for i in range(labels)]
+    player_weights = _zipf_weights(players)
+    label_weights = _zipf_weights(labels)
+    priorities = [p.value for p in Priority]
+    statuses = [Status.DONE.value, Status.IN_PROGRESS.value, Status.ON_HOLD.value]
+
+    tasks: Dict[str, Dict[str, Any]] = {}
+    now = EPOCH
+    for i in range(1, size + 1):
+        tid = str(i)
+        now += rng.expovariate(1 / 600)
+        creator = rng.choices(player_names, player_weights)[0]
+        collaborators = sorted(set(rng.choices(player_names, player_weights, k=rng.choice([0, 1, 1, 2, 3]))))
+        task_labels = sorted(set(rng.choices(label_names, label_weights, k=rng.choice([0, 1, 2, 2, 3, 5]))))
+
+        # Dependency DAG: edges only point to earlier tasks, mostly nearby ones
+        deps = set()
+        if i > 1:
+            for _ in range(rng.choice([0, 0, 1, 1, 2, 4])):
+                back = min(i - 1, max(1, int(rng.expovariate(1 / 20))))
+                deps.add(str(i - back))
+        dependencies = sorted(deps, key=int)
+
+        note_count = min(max_notes, int(rng.paretovariate(1.3)) - 1)
+        notes = []
+        note_ts = now
+        for _ in range(note_count):
+            note_ts += rng.expovariate(1 / 3600)
+            notes.append({
+                "time": _fmt(note_ts),
+                "author": rng.choices(player_names, player_weights)[0],
+                "content": " ".join(rng.choices(WORDS, k=rng.randint(3, 20))),
+            })
+
+        tasks[tid] = {
+            "title": " ".join(rng.choices(WORDS, k=rng.randint(2, 6))),
+            "creator": creator,
+            "description": " ".join(rng.choices(WORDS, k=rng.randint(0, 30))),
+            "status": rng.choices(statuses, [6, 3, 1])[0],
+            "tier": rng.choice(GT_TIERS),
+            "priority": rng.choices(priorities, [1, 3, 6, 3, 1])[0],
+            "labels": task_labels,
+            "collaborators": collaborators,
+            "dependencies": dependencies,
+            "notes": notes,
+            "created_at": _fmt(now),
+            "last_updated": _fmt(max(now, note_ts)),
+            "last_editor": notes[-1]["author"] if notes else creator,
+        }
+
+    return {"tasks": tasks, "next_id": size + 1, "default_tier": "LV"}
+
+
+def write_board(path: str, size: int, seed: int = 0, **kwargs) -> Dict[str, Any]:
+    """Generate a board and write it where TodoManager expects its data file"""
+    data = generate_board(size, seed, **kwargs)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=4, ensure_ascii=False)
+    return data
@@ -0,0 +1,298 @@
+"""
+Multi-process concurrency stress harness.
+
+Spawns N worker processes that hammer add / set / append / note / complete
+against one temporary store, contending on FileLock and transaction().
+"manager" workers keep one TodoManager for their whole run, like the plugin;
+"cli" workers push every operation through the CLI parser and
+handle_cli_command on a freshly loaded board, like separate
+``python __main__.py ...`` invocations. The harness reports sustained ops/sec
+and the lock wait distribution, then verifies the final store: valid JSON,
+no duplicate or lost task IDs, a consistent next_id, and no lost notes,
+labels, title updates or completions.
+
+Usage (from the project root):
+    python -m benchmarks.stress --workers 8 --cli-workers 4 --ops 200
+    python -m pytest -m stress
+"""
+import argparse
+import io
+import json
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+import traceback
+from collections import Counter
+from typing import Dict, Any, List, Optional
+
+from sakura_flow.cli_entry import register_cli_commands, handle_cli_command
+from sakura_flow.controller import TodoController
+from sakura_flow.enums import Status
+from sakura_flow.lock import LockTimeoutError
+from sakura_flow.manager import TodoManager
+from sakura_flow.metrics import metrics, summarize
+
+ROLES = ("manager", "cli")
+# Operation mix: (name, weight)
+OPERATIONS = (("add", 2), ("set", 2), ("append", 2), ("note", 3), ("complete", 1))
+# Tasks created before the workers start; every worker appends labels and notes to them
+SHARED_TASKS = 4
+
+
+class _ManagerClient:
+    """Long-lived in-process manager, as used by the plugin."""
+
+    def __init__(self, data_path: str, name: str, lock_timeout: float):
+        self.name = name
+        self.controller = TodoController(TodoManager(data_path, role="MCDR"))
+        self.controller.manager.file_lock.configure(timeout=lock_timeout)
+
+    def add(self, title: str) -> Optional[str]:
+        return self.controller.add_task(title, self.name)
+
+    def set_title(self, task_id: str, title: str) -> bool:
+        return self.controller.set_property(task_id, "title", title, self.name)[0]
+
+    def append_label(self, task_id: str, label: str) -> bool:
+        return self.controller.append_list_property(task_id, "label", label, self.name)[0]
+
+    def note(self, task_id: str, content: str) -> bool:
+        return self.controller.add_note(task_id, content, self.name)
+
+    def complete(self, task_id: str) -> bool:
+        return self.controller.update_status(task_id, Status.DONE, self.name)
+
+
+class _CliClient:
+    """One CLI invocation per operation: parse argv and load the board from disk every time."""
+
+    def __init__(self, data_path: str, name: str, lock_timeout: float):
+        self.data_path = data_path
+        self.name = name
+        self.lock_timeout = lock_timeout
+        self.parser = argparse.ArgumentParser()
+        register_cli_commands(self.parser)
+
+    def _run(self, *argv: str) -> str:
+        manager = TodoManager(self.data_path, role="CLI")
+        manager.file_lock.configure(timeout=self.lock_timeout)
+        out = io.StringIO()
+        handle_cli_command(self.parser.parse_args(list(argv)), TodoController(manager), out)
+        return out.getvalue()
+
+    def add(self, title: str) -> Optional[str]:
+        output = self._run("add", title, "--creator", self.name)
+        prefix = "Task created with ID: "
+        return output.strip()[len(prefix):] if output.startswith(prefix) else None
+
+    def set_title(self, task_id: str, title: str) -> bool:
+        return self._run("set", task_id, "title", title, "--editor", self.name).startswith("Set ")
+
+    def append_label(self, task_id: str, label: str) -> bool:
+        return self._run("append", task_id, "labels", label, "--editor", self.name).startswith("Appended ")
+
+    def note(self, task_id: str, content: str) -> bool:
+        return self._run("note", task_id, content, "--author", self.name).startswith("Note added.")
+
+    def complete(self, task_id: str) -> bool:
+        return "marked as completed" in self._run("complete", task_id)
+
+
+def _worker(data_path: str, index: int, role: str, ops: int, seed: int, lock_timeout: float,
+            barrier, results):
+    """Run ``ops`` random operations and report what was done, so the final store can be checked."""
+    try:
+        results.put(_work(data_path, index, role, ops, seed, lock_timeout, barrier))
+    except BaseException:
+        results.put({"worker": f"w{index}", "error": traceback.format_exc()})
+
+
+def _work(data_path: str, index: int, role: str, ops: int, seed: int, lock_timeout: float,
+          barrier) -> Dict[str, Any]:
+    metrics.configure(window=ops * 4 + 16)
+    rng = random.Random(seed * 1000 + index)
+    name = f"w{index}"
+    client = (_ManagerClient if role == "manager" else _CliClient)(data_path, name, lock_timeout)
+    names, weights = zip(*OPERATIONS)
+    shared = [str(i) for i in range(1, SHARED_TASKS + 1)]
+    log: Dict[str, Any] = {"worker": name, "role": role, "ops": Counter(), "failed": Counter(),
+                           "created": [], "titles": {}, "labels": [], "notes": [], "completed": []}
+    open_tasks: List[str] = []
+
+    barrier.wait()
+    log["start"] = time.time()
+    for k in range(ops):
+        op = rng.choices(names, weights)[0]
+        if op in ("set", "complete") and not open_tasks:
+            op = "add"
+        try:
+            if op == "add":
+                task_id = client.add(f"{name}-t{k}")
+                ok = task_id is not None
+                if ok:
+                    log["created"].append(task_id)
+                    open_tasks.append(task_id)
+            elif op == "set":
+                task_id, title = rng.choice(log["created"]), f"{name}-s{k}"
+                ok = client.set_title(task_id, title)
+                if ok:
+                    log["titles"][task_id] = title
+            elif op == "append":
+                task_id, label = rng.choice(shared), f"{name}-l{k}"
+                ok = client.append_label(task_id, label)
+                if ok:
+                    log["labels"].append((task_id, label))
+            elif op == "note":
+                task_id, content = rng.choice(shared + log["created"]), f"{name}-n{k}"
+                ok = client.note(task_id, content)
+                if ok:
+                    log["notes"].append((task_id, content))
+            else:
+                task_id = open_tasks.pop(rng.randrange(len(open_tasks)))
+                ok = client.complete(task_id)
+                if ok:
+                    log["completed"].append(task_id)
+        except LockTimeoutError:
+            ok = False
+        log["ops"][op] += 1
+        if not ok:
+            log["failed"][op] += 1
+    log["end"] = time.time()
+    log["lock_wait"] = metrics.samples("lock_wait")
+    log["lock_hold"] = metrics.samples("lock_hold")
+    return log
+
+
+def verify(data_path: str, logs: List[Dict[str, Any]]) -> List[str]:
+    """Check the final store against what the workers report they did; returns the violations found."""
+    try:
+        with open(data_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except ValueError as e:
+        return [f"data file is not valid JSON: {e}"]
+    tasks = data["tasks"]
+    violations = []
+
+    created = [task_id for log in logs for task_id in log["created"]]
+    duplicates = sorted(task_id for task_id, n in Counter(created).items() if n > 1)
+    if duplicates:
+        violations.append(f"task IDs handed out more than once: {duplicates}")
+    missing = sorted(set(created) - set(tasks))
+    if missing:
+        violations.append(f"created tasks missing from the store: {missing}")
+    if len(tasks) != SHARED_TASKS + len(set(created)):
+        violations.append(f"store holds {len(tasks)} tasks, expected {SHARED_TASKS + len(set(created))}")
+
+    highest = max((int(task_id) for task_id in tasks if task_id.isdigit()), default=0)
+    if data.get("next_id", 1) <= highest:
+        violations.append(f"next_id {data.get('next_id')} is not above the highest task ID {highest}")
+    try:
+        with open(data_path + ".seq", 'r', encoding='utf-8') as f:
+            sequence = int(f.read().strip())
+    except (OSError, ValueError):
+        sequence = None
+    if sequence is None or sequence <= highest:
+        violations.append(f"ID sequence {sequence} is not above the highest task ID {highest}")
+
+    notes = Counter((task_id, note["content"]) for task_id, task in tasks.items() for note in task.get("notes", []))
+    lost = [entry for log in logs for entry in map(tuple, log["notes"]) if notes[entry] != 1]
+    if lost:
+        violations.append(f"{len(lost)} note(s) lost or duplicated, e.g. {lost[:3]}")
+    lost = [(task_id, label) for log in logs for task_id, label in log["labels"]
+            if label not in tasks.get(task_id, {}).get("labels", [])]
+    if lost:
+        violations.append(f"{len(lost)} label(s) lost, e.g. {lost[:3]}")
+    lost = [(task_id, title) for log in logs for task_id, title in log["titles"].items()
+            if tasks.get(task_id, {}).get("title") != title]
+    if lost:
+        violations.append(f"{len(lost)} title update(s) lost, e.g. {lost[:3]}")
+    lost = [task_id for log in logs for task_id in log["completed"]
+            if tasks.get(task_id, {}).get("status") != Status.DONE.value]
+    if lost:
+        violations.append(f"{len(lost)} completion(s) lost, e.g. {lost[:3]}")
+    return violations
+
+
+def run_stress(workers: int = 4, cli_workers: Optional[int] = None, ops: int = 50, seed: int = 0,
+               lock_timeout: float = 30.0, data_dir: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Run the harness and return the report. ``cli_workers`` of the ``workers`` processes use the
+    CLI role (half by default). The store is created in a temporary directory unless ``data_dir`` is given.
+    """
+    cli_workers = workers // 2 if cli_workers is None else min(cli_workers, workers)
+    with tempfile.TemporaryDirectory() as tmp:
+        data_path = os.path.join(data_dir or tmp, 'sf_tasks', 'tasks.json')
+        seeder = TodoController(TodoManager(data_path))
+        with seeder.manager.transaction():
+            for i in range(SHARED_TASKS):
+                seeder.add_task(f"shared-{i + 1}", "stress")
+
+        context = multiprocessing.get_context("spawn")
+        barrier = context.Barrier(workers + 1)
+        results = context.Queue()
+        processes = [context.Process(target=_worker, daemon=True,
+                                     args=(data_path, i, ROLES[i < cli_workers], ops, seed, lock_timeout,
+                                           barrier, results))
+                     for i in range(workers)]
+        for process in processes:
+            process.start()
+        try:
+            barrier.wait(timeout=120)
+            # Drain the queue before joining: a worker cannot exit while its result is unread
+            logs = [results.get(timeout=lock_timeout * ops + 60) for _ in processes]
+        finally:
+            for process in processes:
+                process.join(timeout=10)
+                if process.is_alive():
+                    process.terminate()
+        errors = [log for log in logs if "error" in log]
+        if errors:
+            raise RuntimeError(f"worker {errors[0]['worker']} crashed:\n{errors[0]['error']}")
+        violations = verify(data_path, logs)
+
+    elapsed = max(log["end"] for log in logs) - min(log["start"] for log in logs)
+    total = sum(sum(log["ops"].values()) for log in logs)
+    by_role = {role: [log for log in logs if log["role"] == role] for role in ROLES}
+    return {
+        "workers": workers,
+        "cli_workers": cli_workers,
+        "ops_per_worker": ops,
+        "total_ops": total,
+        "failed_ops": sum(sum(log["failed"].values()) for log in logs),
+        "operations": dict(sum((log["ops"] for log in logs), Counter())),
+        "elapsed_s": round(elapsed, 3),
+        "ops_per_sec": round(total / elapsed, 1) if elapsed > 0 else 0.0,
+        "lock_wait_ms": summarize(s for log in logs for s in log["lock_wait"]),
+        "lock_wait_ms_by_role": {role: summarize(s for log in entries for s in log["lock_wait"])
+                                 for role, entries in by_role.items() if entries},
+        "lock_hold_ms": summarize(s for log in logs for s in log["lock_hold"]),
+        "violations": violations,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sakura Flow multi-process concurrency stress test")
+    parser.add_argument('--workers', type=int, default=8, help="Worker processes")
+    parser.add_argument('--cli-workers', type=int, default=None, help="Workers using the CLI role (default: half)")
+    parser.add_argument('--ops', type=int, default=200, help="Operations per worker")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--lock-timeout', type=float, default=30.0, help="Lock timeout per operation (seconds)")
+    parser.add_argument('--output', help="Write the JSON report to this file (default: stdout)")
+    args = parser.parse_args()
+
+    report = run_stress(args.workers, args.cli_workers, args.ops, args.seed, args.lock_timeout)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=4)
+    else:
+        print(json.dumps(report, indent=4))
+    for violation in report["violations"]:
+        print(f"[FAIL] {violation}", file=sys.stderr)
+    sys.exit(1 if report["violations"] else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,32 @@
+"""
+Lightweight stand-ins for MCDR's ServerInterface and CommandSource.
+
+MagicMock would dominate the measurements, so these implement just what the
+UI layer touches. Replies are serialized to the chat JSON the server would
+actually send, so rendering benchmarks include that cost.
+"""
+from typing import Any
+
+
+class StubServer:
+    def tr(self, key: str, *args: Any) -> str:
+        if args:
+            return key + " " + " ".join(map(str, args))
+        return key
+
+
+class StubSource:
+    def __init__(self, server: StubServer, player: str = "Player000"):
+        self.server = server
+        self.player = player
+        self.is_player = player is not None
+        self.is_console = player is None
+        self.replies = 0
+
+    def get_server(self) -> StubServer:
+        return self.server
+
+    def reply(self, message: Any):
+        if hasattr(message, 'to_json_object'):
+            message.to_json_object()
+        self.replies += 1
@@ -0,0 +1,219 @@
+"""
+Synthetic-load benchmark suite.
+
+Times TodoManager load/save/transaction, every public TodoController method,
+query mixes through search_tasks and the full UI rendering paths on seeded
+boards, and writes the results as JSON so releases can be compared.
+
+Usage (from the project root):
+    python -m benchmarks.suite --sizes 1000 10000 --output bench.json
+    python -m benchmarks.suite --sizes 1000 --compare bench.json
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, Any, List, Optional
+
+from sakura_flow.controller import TodoController
+from sakura_flow.enums import Status
+from sakura_flow.manager import TodoManager
+from sakura_flow import transfer
+
+from .generator import write_board
+
+DEFAULT_SIZES = [1000, 10000, 50000, 200000]
+
+# Query mix: common dashboard filters, a rare label, negations and combinations
+QUERY_MIX = [
+    {'status': '!Done'},
+    {'status': 'Done'},
+    {'title': 'iron'},
+    {'title': 'reactor cooling'},
+    {'label': 'farm-1'},
+    {'label': '!farm-1', 'status': '!Done'},
+    {'collaborator': 'Player000'},
+    {'collaborator': 'Player059'},
+    {'creator': '!Player000', 'priority': 'High'},
+    {'tier': 'IV', 'status': 'In Progress', 'label': 'iron-0'},
+]
+
+
+def measure(func: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {
+        'min_ms': round(min(samples), 4),
+        'median_ms': round(statistics.median(samples), 4),
+        'mean_ms': round(statistics.fmean(samples), 4),
+    }
+
+
+class Suite:
+    def __init__(self, size: int, seed: int, repeat: int, workdir: str):
+        self.size = size
+        self.repeat = repeat
+        self.data_path = os.path.join(workdir, f'board-{size}', 'tasks.json')
+        data = write_board(self.data_path, size, seed)
+        tasks = data["tasks"]
+        self.file_bytes = os.path.getsize(self.data_path)
+
+        self.manager = TodoManager(self.data_path)
+        self.controller = TodoController(self.manager)
+        # Representative targets: a mid-board task and the heaviest one by notes + dependencies
+        self.mid_id = str(size // 2)
+        self.heavy_id = max(tasks, key=lambda t: len(tasks[t]["notes"]) + len(tasks[t]["dependencies"]))
+        self.import_rows = [{"id": str(i), **tasks[str(i)]} for i in range(1, min(size, 100) + 1)]
+        self.results: List[Dict[str, Any]] = []
+
+    def record(self, group: str, name: str, func: Callable[[], Any], repeat: Optional[int] = None):
+        stats = measure(func, repeat or self.repeat)
+        self.results.append({'group': group, 'name': name, 'size': self.size, **stats})
+        print(f"  {group:<10} {name:<44} median {stats['median_ms']:>10.3f} ms", file=sys.stderr)
+
+    def run_manager(self):
+        m = self.manager
+
+        def empty_transaction():
+            with m.transaction():
+                pass
+
+        self.record('manager', 'load', m.load)
+        # Read-only CLI path: the offset index published by the first reader is reused, tasks decoded on access
+        self.record('manager', 'load (snapshot) + get_task',
+                    lambda: TodoManager(self.data_path, read_only=True).data["tasks"][self.mid_id])
+        self.record('manager', 'load (snapshot) + first 8 open tasks',
+                    lambda: list(zip(range(8), TodoController(TodoManager(self.data_path, read_only=True))
+                                     .iter_tasks({'status': '!Done'}))))
+        self.record('manager', 'save', m.save)
+        self.record('manager', 'transaction (no-op)', empty_transaction)
+
+    def run_controller(self):
+        c, mid, heavy = self.controller, self.mid_id, self.heavy_id
+        c.search_tasks({'status': '!Done'}, cache_key='bench')
+        toggle = iter(range(10 ** 9))
+
+        self.record('controller', 'add_task', lambda: c.add_task("benchmark task", "Bench"))
+        self.record('controller', 'get_task', lambda: c.get_task(mid))
+        self.record('controller', 'get_tasks', lambda: c.get_tasks())
+        self.record('controller', 'get_archived_tasks', c.get_archived_tasks)
+        self.record('controller', 'search_tasks', lambda: c.search_tasks({'status': '!Done'}))
+        self.record('controller', 'iter_tasks (first 8)',
+                    lambda: [x for _, x in zip(range(8), c.iter_tasks({'status': '!Done'}))])
+        self.record('controller', 'select_tasks (sort+limit)',
+                    lambda: list(c.select_tasks({}, sort='priority', limit=8)))
+        self.record('controller', 'get_cached_search', lambda: c.get_cached_search('bench'))
+        self.record('controller', 'update_status',
+                    lambda: c.update_status(mid, Status.ON_HOLD if next(toggle) % 2 else Status.IN_PROGRESS, "Bench"))
+        self.record('controller', 'add_note', lambda: c.add_note(heavy, "benchmark note", "Bench"))
+        self.record('controller', 'set_property', lambda: c.set_property(mid, 'tier', 'IV', "Bench"))
+        self.record('controller', 'append_list_property', lambda: c.append_list_property(mid, 'label', 'bench', "Bench"))
+        self.record('controller', 'remove_list_property', lambda: c.remove_list_property(mid, 'label', 'bench', "Bench"))
+        self.record('controller', 'set_default_tier', lambda: c.set_default_tier('LV'))
+        self.record('controller', 'import_tasks (100 rows)', lambda: c.import_tasks(iter(self.import_rows), True))
+        self.record('controller', 'export (jsonl)',
+                    lambda: transfer.export_tasks(self.manager.data["tasks"], io.StringIO(), 'jsonl'), repeat=1)
+
+    def run_queries(self):
+        c = self.controller
+        for criteria in QUERY_MIX:
+            name = " ".join(f"{k}={v}" for k, v in criteria.items())
+            self.record('search', name, lambda criteria=criteria: c.search_tasks(criteria))
+        self.record('search', 'mix (all of the above)', lambda: [c.search_tasks(q) for q in QUERY_MIX])
+
+    def run_render(self):
+        try:
+            from sakura_flow.interface import UI
+        except ImportError:
+            print("  render     skipped (MCDReforged not installed)", file=sys.stderr)
+            return
+        from .stubs import StubServer, StubSource
+
+        server = StubServer()
+        source = StubSource(server)
+        c, tasks_db = self.controller, self.manager.data["tasks"]
+        open_tasks = c.search_tasks({'status': '!Done'})
+
+        self.record('render', 'render_paged_list (page 1)',
+                    lambda: UI.render_paged_list(source, open_tasks, self.manager, 'sakuraflow.list.header',
+                                                 'sakuraflow.list.empty', input_page=1))
+        self.record('render', 'list command (search + page)',
+                    lambda: UI.render_paged_list(source, c.search_tasks({'status': '!Done'}), self.manager,
+                                                 'sakuraflow.list.header', 'sakuraflow.list.empty', input_page=1))
+        self.record('render', 'render_task_info (heaviest)',
+                    lambda: source.reply(UI.render_task_info(self.heavy_id, tasks_db[self.heavy_id], tasks_db, server)))
+        self.record('render', 'create_hover_info',
+                    lambda: UI.create_hover_info(self.mid_id, tasks_db[self.mid_id], tasks_db, server).to_json_object())
+
+    def run(self) -> List[Dict[str, Any]]:
+        print(f"[size={self.size}] data file {self.file_bytes / 1024 / 1024:.1f} MiB", file=sys.stderr)
+        self.run_manager()
+        self.run_queries()
+        self.run_render()
+        self.run_controller()
+        return self.results
+
+
+def compare(current: List[Dict[str, Any]], baseline_path: str):
+    """Print median ratios against a previous result file (>1.0 means slower now)"""
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = {(r['group'], r['name'], r['size']): r for r in json.load(f)['results']}
+    print(f"{'benchmark':<60} {'baseline':>12} {'current':>12} {'ratio':>7}")
+    for r in current:
+        old = baseline.get((r['group'], r['name'], r['size']))
+        if not old:
+            continue
+        ratio = r['median_ms'] / old['median_ms'] if old['median_ms'] else float('inf')
+        label = f"{r['group']}/{r['name']} [{r['size']}]"
+        print(f"{label:<60} {old['median_ms']:>12.3f} {r['median_ms']:>12.3f} {ratio:>7.2f}")
+
+
+def run_suite(sizes: List[int], seed: int = 0, repeat: int = 5) -> Dict[str, Any]:
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in sizes:
+            # Big boards make every mutation a multi-second save; fewer samples keep the run bounded
+            size_repeat = repeat if size <= 10000 else max(1, repeat // 3)
+            results.extend(Suite(size, seed, size_repeat, workdir).run())
+    return {
+        'meta': {
+            'timestamp': time.strftime("%Y-%m-%d %H:%M:%S"),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'seed': seed,
+            'sizes': sizes,
+            'repeat': repeat,
+        },
+        'results': results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sakura Flow synthetic-load benchmarks")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help="Board sizes to generate")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=5, help="Samples per benchmark")
+    parser.add_argument('--output', help="Write JSON results to this file (default: stdout)")
+    parser.add_argument('--compare', help="Previous JSON results to compare against")
+    args = parser.parse_args()
+
+    report = run_suite(args.sizes, args.seed, args.repeat)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=4, ensure_ascii=False)
+    elif not args.compare:
+        print(json.dumps(report, indent=4, ensure_ascii=False))
+    if args.compare:
+        compare(report['results'], args.compare)
+
+
+if __name__ == '__main__':
+    main()
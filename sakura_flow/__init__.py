@@ -1,26 +1,144 @@
-from mcdreforged.api.all import PluginServerInterface
 import os
+import threading
+from typing import TYPE_CHECKING
 
-from .manager import TodoManager
-from .controller import TodoController
-from .mcdr_entry import register_mcdr_commands
+from .backup import BackupScheduler
+from .boards import BoardRegistry, DEFAULT_BOARD
 from .constants import COMMAND_PREFIX
+from .config import load_config, configure_manager, data_path_for
+from .deadlines import ReminderScheduler
+from .metrics import metrics
 
-manager = None
-controller = None
+if TYPE_CHECKING:
+    from mcdreforged.api.all import PluginServerInterface
 
-def on_load(server: PluginServerInterface, _prev):
-    global manager, controller
-    # 初始化管理器
-    # 数据存放到 MCDR 根目录下的 sf_tasks 目录
-    data_path = os.path.join(os.getcwd(), 'sf_tasks', 'tasks.json')
-    manager = TodoManager(data_path)
-    
-    # 初始化控制器
-    controller = TodoController(manager)
+# 注意：包级别只导入纯标准库的核心模块
+# CLI (__main__.py) 导入 sakura_flow.cli_entry 时同样会执行这里，MCDR 相关模块需在 on_load 中延迟导入
+
+boards = None
+todo_daemon = None
+backup_scheduler = None
+reminder_scheduler = None
+
+def on_load(server: 'PluginServerInterface', _prev):
+    from .mcdr_entry import register_mcdr_commands
+
+    global boards, backup_scheduler, reminder_scheduler
+    config = load_config(os.path.join(server.get_data_folder(), 'config.json'), write_default=True)
+    metrics.configure(slow_threshold_ms=config["slow_command_threshold_ms"], window=config["stats_window"],
+                      slow_logger=server.logger.warning)
+
+    # 初始化看板注册表，各看板在首次访问时才加载
+    # 数据默认存放到 MCDR 根目录下的 sf_tasks 目录，默认看板为 sf_tasks/tasks.json
+    data_path = data_path_for(config, os.getcwd())
+    boards = BoardRegistry(data_path, role="MCDR", configure=lambda m: configure_manager(m, config))
+    boards.load_hooks.append(lambda name, c: _warn_recovered(server, name, c))
+    # 看板加载时即构建补全索引，玩家第一次按 Tab 时不必等待全量构建
+    boards.load_hooks.append(lambda name, c: c.completion.ensure())
+
+    # 托管套接字的实例本身就是协调者；否则若已有协调者在运行，则作为它的客户端
+    if not config["serve_socket"] and config["use_coordinator"]:
+        _connect_coordinator(server, boards, data_path)
+
+    # 定时为已加载的看板生成备份
+    backup_scheduler = BackupScheduler(config["backup_interval_minutes"] * 60,
+                                       lambda: [c.manager.backups for c in boards.loaded().values()],
+                                       logger=server.logger.warning)
+    backup_scheduler.start()
+
+    # 截止提醒：看板加载时构建其截止时间索引，调度线程睡眠到最早的提醒；后台加载全部看板，使提醒不依赖于有人先访问看板
+    if config["due_reminders"]:
+        reminder_scheduler = ReminderScheduler(lambda *event: _announce_deadline(server, *event),
+                                               logger=server.logger.warning)
+        for name, controller in boards.loaded().items():
+            reminder_scheduler.watch(name, controller)
+        boards.load_hooks.append(reminder_scheduler.watch)
+        reminder_scheduler.start()
+        threading.Thread(target=lambda: [boards.get(name) for name in boards.names()],
+                         name="SakuraFlow-Preload", daemon=True).start()
 
     # 注册指令帮助条目
     server.register_help_message(COMMAND_PREFIX, "任务管理")
 
     # 注册 MCDR 指令
-    register_mcdr_commands(server, controller)
+    register_mcdr_commands(server, boards)
+
+    # 可选：托管守护进程套接字，外部 CLI 调用将共享插件的内存状态与写入路径
+    if config["serve_socket"]:
+        _start_daemon(server, boards, data_path)
+
+
+def on_unload(_server: 'PluginServerInterface'):
+    global todo_daemon, backup_scheduler, reminder_scheduler
+    if backup_scheduler is not None:
+        backup_scheduler.stop()
+        backup_scheduler = None
+    if reminder_scheduler is not None:
+        reminder_scheduler.stop()
+        reminder_scheduler = None
+    if boards is not None:
+        boards.close()
+    if todo_daemon is not None:
+        todo_daemon.stop()
+        todo_daemon = None
+
+
+def on_player_joined(server: 'PluginServerInterface', player: str, _info):
+    # 进服时推送该玩家在当前看板上的任务摘要，数据来自增量维护的分配索引而非全表扫描
+    from .interface import UI
+
+    if boards is None:
+        return
+    with metrics.command("join_digest"):
+        controller = boards.for_player(player)
+        digest = controller.assignments.digest(player)
+        if digest["open"]:
+            server.tell(player, UI.render_digest(server, digest, controller.manager.data["tasks"]))
+
+
+def _announce_deadline(server: 'PluginServerInterface', board: str, controller, tid: str, kind: str):
+    """提醒或截止时间已到：私信任务的协作者，没有协作者时全服广播"""
+    from .interface import UI
+
+    task = controller.get_task(tid)
+    if task is None:
+        return
+    message = UI.render_deadline_alert(server, tid if board == DEFAULT_BOARD else f"{board}:{tid}", task, kind)
+    collaborators = task.get("collaborators", [])
+    if collaborators:
+        for player in collaborators:
+            server.tell(player, message)
+    else:
+        server.broadcast(message)
+
+
+def _warn_recovered(server: 'PluginServerInterface', name: str, controller):
+    if controller.manager.recovered_from:
+        server.logger.warning(f"Data file of board {name} was unreadable, loaded backup {controller.manager.recovered_from}")
+
+
+def _connect_coordinator(server: 'PluginServerInterface', registry: BoardRegistry, data_path: str):
+    from . import daemon
+    from .coordinator import CoordinatorClient
+
+    client = CoordinatorClient(daemon.default_socket_path(data_path), logger=server.logger.warning)
+    if client.connect():
+        registry.coordinator = client
+        server.logger.info(f"Connected to the task coordinator at {client.socket_path}")
+
+
+def _start_daemon(server: 'PluginServerInterface', registry: BoardRegistry, data_path: str):
+    from . import daemon
+
+    global todo_daemon
+    if not daemon.is_supported():
+        server.logger.warning("Unix domain sockets are not supported on this platform, serve_socket ignored")
+        return
+    # 守护进程与插件共享看板注册表：其命令交给 MCDR 的任务执行线程执行，与玩家指令串行
+    todo_daemon = daemon.TodoDaemon(registry, daemon.default_socket_path(data_path),
+                                    run_in_host=lambda fn: server.schedule_task(fn, block=True).result())
+    try:
+        todo_daemon.start()
+    except (OSError, RuntimeError) as e:
+        server.logger.warning(f"Failed to host daemon socket: {e}")
+        todo_daemon = None
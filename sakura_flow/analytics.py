@@ -0,0 +1,158 @@
+import bisect
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Dict, Any, List, Optional
+
+from .enums import Status
+from .manager import TodoManager
+
+_DONE = Status.DONE.value
+
+# 统计的分组维度 -> 任务字段；除状态外只统计未完成的任务
+GROUP_FIELDS = {"status": "status", "tier": "tier", "priority": "priority", "creator": "creator"}
+
+
+def week_of(day: str) -> str:
+    """"YYYY-MM-DD" 所在的 ISO 周，形如 "2024-W05\""""
+    year, week, _ = date.fromisoformat(day).isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def _timestamp(value: str) -> Optional[datetime]:
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class _Entry:
+    """单个任务对各项统计的贡献，更新时先撤销旧贡献再计入新贡献"""
+    __slots__ = ("groups", "labels", "collaborators", "done_day", "done_week", "duration")
+
+    def __init__(self, task: Dict[str, Any]):
+        is_open = task.get("status") != _DONE
+        self.groups = {name: task.get(field, "") for name, field in GROUP_FIELDS.items()
+                       if is_open or name == "status"}
+        self.labels = tuple(dict.fromkeys(task.get("labels", []))) if is_open else ()
+        self.collaborators = tuple(dict.fromkeys(task.get("collaborators", []))) if is_open else ()
+        self.done_day = self.done_week = None
+        self.duration: Optional[float] = None
+        if not is_open:
+            # 旧数据没有 completed_at 时以最后修改时间近似
+            finished = task.get("completed_at") or task.get("last_updated") or ""
+            if finished[:10]:
+                try:
+                    self.done_week = week_of(finished[:10])
+                    self.done_day = finished[:10]
+                except ValueError:
+                    pass
+            start, end = _timestamp(task.get("created_at", "")), _timestamp(finished)
+            if start is not None and end is not None:
+                self.duration = max((end - start).total_seconds(), 0.0)
+
+
+class BoardAnalytics:
+    """
+    看板统计：按状态/等级/优先级/创建者/标签计数、每日与每周的完成数、从创建到完成的耗时中位数及最忙碌的协作者
+    各项聚合随事务提交增量更新，每个任务的时间字符串只在其变更时解析一次；数据文件被重新解析后在下次使用时重建
+    """
+    def __init__(self, manager: TodoManager):
+        self.manager = manager
+        self._reset()
+        # 每个任务的贡献 {任务ID: _Entry}；None 表示尚未构建
+        self._entries: Optional[Dict[str, _Entry]] = None
+
+    def _reset(self):
+        self._entries = {}
+        self.groups: Dict[str, Counter] = {name: Counter() for name in GROUP_FIELDS}
+        self.labels = Counter()
+        self.collaborators = Counter()
+        self.completed_per_day = Counter()
+        self.completed_per_week = Counter()
+        # 已完成任务的耗时（秒），保持有序以便直接取中位数
+        self.durations: List[float] = []
+
+    def _apply(self, entry: _Entry, sign: int):
+        for name, value in entry.groups.items():
+            self._bump(self.groups[name], value, sign)
+        for label in entry.labels:
+            self._bump(self.labels, label, sign)
+        for player in entry.collaborators:
+            self._bump(self.collaborators, player, sign)
+        if entry.done_day is not None:
+            self._bump(self.completed_per_day, entry.done_day, sign)
+            self._bump(self.completed_per_week, entry.done_week, sign)
+        if entry.duration is not None:
+            if sign > 0:
+                bisect.insort(self.durations, entry.duration)
+            else:
+                del self.durations[bisect.bisect_left(self.durations, entry.duration)]
+
+    @staticmethod
+    def _bump(counter: Counter, key: str, sign: int):
+        counter[key] += sign
+        if counter[key] <= 0:
+            del counter[key]
+
+    def _index(self, tid: str, task: Optional[Dict[str, Any]]):
+        old = self._entries.pop(tid, None)
+        if old is not None:
+            self._apply(old, -1)
+        if task is not None:
+            entry = self._entries[tid] = _Entry(task)
+            self._apply(entry, 1)
+
+    def ensure(self) -> 'BoardAnalytics':
+        if self._entries is None:
+            self._reset()
+            for tid, task in self.manager.data["tasks"].items():
+                self._index(tid, task)
+        return self
+
+    # --- 监听者接口 ---
+
+    def on_commit(self, changes):
+        if self._entries is None:
+            return
+        for tid, _, after, _ in changes:
+            self._index(tid, after)
+
+    on_sync = on_commit
+
+    def on_reload(self):
+        self._entries = None
+
+    # --- 查询 ---
+
+    def median_duration(self) -> Optional[float]:
+        """从创建到完成的耗时中位数（秒）"""
+        n = len(self.ensure().durations)
+        if not n:
+            return None
+        mid = n // 2
+        return self.durations[mid] if n % 2 else (self.durations[mid - 1] + self.durations[mid]) / 2
+
+    def report(self, days: int = 7, weeks: int = 4, top: int = 5, today: Optional[date] = None) -> Dict[str, Any]:
+        """
+        :param days: 列出最近多少天（含今天）的每日完成数
+        :param weeks: 列出最近多少个 ISO 周的完成数
+        :param top: 标签、创建者与协作者只列出数量最多的前几个
+        """
+        self.ensure()
+        today = today or date.today()
+        recent_days = [(today - timedelta(days=i)).isoformat() for i in range(days)]
+        recent_weeks = list(dict.fromkeys(week_of((today - timedelta(weeks=i)).isoformat()) for i in range(weeks)))
+        median = self.median_duration()
+        return {
+            "total": len(self._entries),
+            "open": len(self._entries) - self.groups["status"].get(_DONE, 0),
+            "status": dict(self.groups["status"].most_common()),
+            "tier": dict(self.groups["tier"].most_common()),
+            "priority": dict(self.groups["priority"].most_common()),
+            "creator": dict(self.groups["creator"].most_common(top)),
+            "label": dict(self.labels.most_common(top)),
+            "completed_per_day": {day: self.completed_per_day.get(day, 0) for day in recent_days},
+            "completed_per_week": {week: self.completed_per_week.get(week, 0) for week in recent_weeks},
+            "median_hours_to_done": round(median / 3600, 1) if median is not None else None,
+            "busiest_collaborators": dict(self.collaborators.most_common(top)),
+        }
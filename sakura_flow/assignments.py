@@ -0,0 +1,84 @@
+from typing import Dict, Any, List, Optional, Set, Tuple
+
+from .enums import Status
+from .manager import TodoManager
+
+
+class AssignmentIndex:
+    """
+    玩家分配索引：玩家名（不区分大小写）-> 其创建或协作的未完成任务 ID
+    首次查询时才全量构建，之后随事务提交增量维护；数据文件被重新解析后丢弃，下次查询时重建
+    就绪/受阻只对该玩家自己的未完成任务检查依赖状态，不扫描整个看板
+    """
+    def __init__(self, manager: TodoManager):
+        self.manager = manager
+        self._by_player: Optional[Dict[str, Set[str]]] = None
+        # 任务当前登记在哪些玩家名下，用于更新时撤销旧的登记
+        self._players_of: Dict[str, Tuple[str, ...]] = {}
+
+    @staticmethod
+    def _players(task: Dict[str, Any]) -> Tuple[str, ...]:
+        if task.get("status") == Status.DONE.value:
+            return ()
+        names = [task.get("creator", "")] + list(task.get("collaborators", []))
+        return tuple(dict.fromkeys(n.lower() for n in names if n))
+
+    def _index(self, tid: str, task: Optional[Dict[str, Any]]):
+        for name in self._players_of.pop(tid, ()):
+            tids = self._by_player.get(name)
+            if tids is not None:
+                tids.discard(tid)
+                if not tids:
+                    del self._by_player[name]
+        players = self._players(task) if task is not None else ()
+        if players:
+            self._players_of[tid] = players
+            for name in players:
+                self._by_player.setdefault(name, set()).add(tid)
+
+    def _ensure(self) -> Dict[str, Set[str]]:
+        if self._by_player is None:
+            self._by_player, self._players_of = {}, {}
+            for tid, task in self.manager.data["tasks"].items():
+                self._index(tid, task)
+        return self._by_player
+
+    # --- 监听者接口 ---
+
+    def on_commit(self, changes):
+        if self._by_player is None:
+            return
+        for tid, _, after, _ in changes:
+            self._index(tid, after)
+
+    on_sync = on_commit
+
+    def on_reload(self):
+        self._by_player, self._players_of = None, {}
+
+    # --- 查询 ---
+
+    def open_tasks(self, player: str) -> List[str]:
+        """玩家的未完成任务 ID，按 ID 排序"""
+        return sorted(self._ensure().get(player.lower(), ()),
+                      key=lambda tid: (0, int(tid), "") if tid.isdigit() else (1, 0, tid))
+
+    def is_blocked(self, task: Dict[str, Any]) -> bool:
+        """存在尚未完成的依赖；依赖的任务不存在时不视为受阻"""
+        tasks = self.manager.data["tasks"]
+        return any(tasks[dep].get("status") != Status.DONE.value
+                   for dep in task.get("dependencies", []) if dep in tasks)
+
+    def digest(self, player: str) -> Dict[str, List[str]]:
+        """
+        :return: {"open": 未完成, "ready": 进行中且依赖均已完成, "blocked": 有未完成的依赖}
+        """
+        tasks = self.manager.data["tasks"]
+        result = {"open": self.open_tasks(player), "ready": [], "blocked": []}
+        for tid in result["open"]:
+            task = tasks[tid]
+            if self.is_blocked(task):
+                result["blocked"].append(tid)
+            elif task.get("status") == Status.IN_PROGRESS.value:
+                result["ready"].append(tid)
+        return result
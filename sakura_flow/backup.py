@@ -0,0 +1,165 @@
+import json
+import os
+import shutil
+import threading
+import time
+from typing import Dict, Any, List, Optional, Callable, Iterable
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# Linux ioctl FICLONE：在 btrfs、XFS 等文件系统上创建共享数据块的写时复制副本
+FICLONE = 0x40049409
+
+
+def clone_file(src: str, dst: str):
+    """
+    以写时复制方式克隆文件，文件系统不支持时退化为普通复制；dst 已存在时抛出 FileExistsError
+    读取的是打开 src 时的那个 inode，数据文件在复制期间被原子替换也不影响副本的完整性
+    """
+    with open(src, 'rb') as fsrc, open(dst, 'xb') as fdst:
+        st = os.fstat(fsrc.fileno())
+        try:
+            if fcntl is None:
+                raise OSError("reflink not supported")
+            fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+        except OSError:
+            shutil.copyfileobj(fsrc, fdst)
+    # 副本沿用原文件的修改时间，据此判断数据是否变化
+    os.utime(dst, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+
+class BackupStore:
+    """
+    数据文件的轮换备份，存放于 <数据文件>.backups/<时间>.json
+    数据文件总是以"写临时文件 + 原子重命名"的方式保存，复制时读取的 inode 不会被改写，因此备份不需要持有写锁
+    备份优先使用写时复制克隆（只有之后改动的数据块才占用新空间），否则为普通复制；
+    不使用硬链接，避免就地写入数据文件的外部程序同时破坏备份
+    自上一代备份以来数据文件未变化时不会产生新的一代
+    """
+    def __init__(self, data_path: str, keep: int = 24):
+        """
+        :param keep: 保留的备份代数，超出时删除最旧的
+        """
+        self.data_path = data_path
+        self.dir = data_path + ".backups"
+        self.keep = keep
+
+    def path_for(self, name: str) -> str:
+        return os.path.join(self.dir, f"{name}.json")
+
+    def generations(self) -> List[str]:
+        """所有备份代的名称，从新到旧"""
+        try:
+            names = [entry.name[:-5] for entry in os.scandir(self.dir) if entry.name.endswith(".json")]
+        except OSError:
+            return []
+        return sorted(names, reverse=True)
+
+    def list(self) -> List[Dict[str, Any]]:
+        result = []
+        for name in self.generations():
+            try:
+                st = os.stat(self.path_for(name))
+            except OSError:
+                continue
+            result.append({"name": name, "size": st.st_size,
+                           "time": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(st.st_mtime))})
+        return result
+
+    def _unchanged(self, st: os.stat_result) -> bool:
+        generations = self.generations()
+        if not generations:
+            return False
+        try:
+            latest = os.stat(self.path_for(generations[0]))
+        except OSError:
+            return False
+        return (latest.st_size, latest.st_mtime_ns) == (st.st_size, st.st_mtime_ns)
+
+    def take(self) -> Optional[str]:
+        """
+        生成一代新的备份，无需持有数据文件的写锁
+        :return: 新备份的名称；数据文件不存在或自上一代以来未变化时返回 None
+        """
+        try:
+            st = os.stat(self.data_path)
+        except OSError:
+            return None
+        if self._unchanged(st):
+            return None
+        os.makedirs(self.dir, exist_ok=True)
+        base = time.strftime("%Y%m%d-%H%M%S")
+        suffix = 0
+        while True:
+            name = base if not suffix else f"{base}-{suffix}"
+            path = self.path_for(name)
+            try:
+                clone_file(self.data_path, path)
+                break
+            except FileExistsError:
+                suffix += 1
+        self.rotate()
+        return name
+
+    def rotate(self):
+        for name in self.generations()[max(self.keep, 1):]:
+            try:
+                os.remove(self.path_for(name))
+            except OSError:
+                pass
+
+    def read(self, name: str) -> Dict[str, Any]:
+        """读取并解析一代备份；不存在时抛出 FileNotFoundError，内容损坏时抛出 ValueError"""
+        if not name or os.path.basename(name) != name or name.startswith("."):
+            raise FileNotFoundError(name)
+        with open(self.path_for(name), 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if not isinstance(data, dict) or not isinstance(data.get("tasks"), dict):
+            raise ValueError(f"Backup '{name}' is not a task board")
+        return data
+
+    def latest_valid(self) -> Optional[str]:
+        """最新的一代可以正常解析的备份"""
+        for name in self.generations():
+            try:
+                self.read(name)
+            except (OSError, ValueError):
+                continue
+            return name
+        return None
+
+
+class BackupScheduler:
+    """
+    定时备份：后台线程每隔 interval 秒为各个已加载看板生成一代备份
+    备份本身不持有写锁，不会阻塞正在进行的写入
+    """
+    def __init__(self, interval: float, stores: Callable[[], Iterable[BackupStore]],
+                 logger: Optional[Callable[[str], None]] = None):
+        self.interval = interval
+        self.stores = stores
+        self.logger = logger
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self.interval <= 0 or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="SakuraFlow-Backup", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            for store in list(self.stores()):
+                try:
+                    store.take()
+                except OSError as e:
+                    if self.logger is not None:
+                        self.logger(f"Backup of {store.data_path} failed: {e}")
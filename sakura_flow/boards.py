@@ -0,0 +1,155 @@
+import json
+import os
+import re
+import threading
+from typing import Dict, Any, List, Optional, Callable, Tuple
+
+from .controller import TodoController
+from .coordinator import CoordinatorClient, CoordinatedController
+from .manager import TodoManager
+
+DEFAULT_BOARD = "main"
+# 看板名只允许字母、数字、下划线与连字符，":" 用于 "<看板>:<任务ID>" 形式的限定 ID
+BOARD_NAME_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,32}$")
+ALL_BOARDS = "*"
+
+
+def is_valid_board_name(name: str) -> bool:
+    return bool(BOARD_NAME_PATTERN.match(name))
+
+
+class BoardRegistry:
+    """
+    多看板注册表：每个看板拥有独立的数据文件、锁、next_id、default_tier 与索引
+    默认看板沿用 sf_tasks/tasks.json，其余看板存放于 sf_tasks/boards/<名称>.json
+    看板在首次访问时才加载，不同看板的写入互不阻塞
+    """
+    def __init__(self, data_path: str, role: str = "MCDR",
+                 configure: Optional[Callable[[TodoManager], None]] = None, read_only: bool = False):
+        """
+        :param data_path: 默认看板的数据文件路径
+        :param configure: 新建 TodoManager 后调用，用于套用锁超时、保留策略等配置
+        :param read_only: 以只读快照打开看板，不获取写锁，任务按需解码（只读的 CLI 命令使用）
+        """
+        self.data_path = data_path
+        self.base_dir = os.path.dirname(os.path.abspath(data_path))
+        self.boards_dir = os.path.join(self.base_dir, "boards")
+        self.selection_path = os.path.join(self.base_dir, "board_selection.json")
+        self.role = role
+        self.configure = configure
+        self.read_only = read_only
+        self._controllers: Dict[str, TodoController] = {}
+        self._lock = threading.Lock()
+        # 看板首次加载后调用 hook(名称, 控制器)，例如守护进程为其挂载变更通知
+        self.load_hooks: List[Callable[[str, TodoController], None]] = []
+        # 协调者客户端；设置后写操作交给协调者执行，读取使用由变更通知维护的本地缓存
+        self.coordinator: Optional[CoordinatorClient] = None
+        # 每位玩家当前使用的看板 {玩家: 看板名}
+        self._selection: Optional[Dict[str, str]] = None
+
+    def path_for(self, name: str) -> str:
+        if name == DEFAULT_BOARD:
+            return self.data_path
+        return os.path.join(self.boards_dir, f"{name}.json")
+
+    def names(self) -> List[str]:
+        """所有已知看板：默认看板、磁盘上已有的看板以及本进程中已加载的看板"""
+        names = {DEFAULT_BOARD, *self._controllers}
+        if os.path.isdir(self.boards_dir):
+            names.update(entry.name[:-5] for entry in os.scandir(self.boards_dir)
+                         if entry.name.endswith(".json") and is_valid_board_name(entry.name[:-5]))
+        return [DEFAULT_BOARD] + sorted(names - {DEFAULT_BOARD})
+
+    def loaded(self) -> Dict[str, TodoController]:
+        return dict(self._controllers)
+
+    def get(self, name: Optional[str] = None) -> TodoController:
+        """获取看板的控制器，首次访问时加载；看板文件在第一次写入时创建"""
+        name = name or DEFAULT_BOARD
+        controller = self._controllers.get(name)
+        if controller is None:
+            controller = self._load(name)
+        if self.coordinator is not None:
+            self.coordinator.apply_pending(name, controller)
+        return controller
+
+    def _load(self, name: str) -> TodoController:
+        if not is_valid_board_name(name):
+            raise ValueError(f"Invalid board name '{name}'")
+        with self._lock:
+            controller = self._controllers.get(name)
+            if controller is not None:
+                return controller
+            if self.coordinator is not None:
+                self.coordinator.track(name)
+            manager = TodoManager(self.path_for(name), role=self.role, read_only=self.read_only)
+            if self.configure is not None:
+                self.configure(manager)
+            if self.coordinator is not None:
+                controller = CoordinatedController(manager, self.coordinator, name)
+            else:
+                controller = TodoController(manager)
+            self._controllers[name] = controller
+        for hook in self.load_hooks:
+            hook(name, controller)
+        return controller
+
+    def close(self):
+        """断开协调者并归还各看板未用完的 ID 租约"""
+        if self.coordinator is not None:
+            self.coordinator.close()
+        for controller in self.loaded().values():
+            controller.manager.ids.release()
+
+    # --- 玩家当前看板 ---
+
+    def _load_selection(self) -> Dict[str, str]:
+        if self._selection is None:
+            try:
+                with open(self.selection_path, 'r', encoding='utf-8') as f:
+                    self._selection = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                self._selection = {}
+        return self._selection
+
+    def current(self, player: str) -> str:
+        return self._load_selection().get(player, DEFAULT_BOARD)
+
+    def use(self, player: str, name: str):
+        if not is_valid_board_name(name):
+            raise ValueError(f"Invalid board name '{name}'")
+        selection = self._load_selection()
+        if name == DEFAULT_BOARD:
+            selection.pop(player, None)
+        else:
+            selection[player] = name
+        try:
+            os.makedirs(self.base_dir, exist_ok=True)
+            with open(self.selection_path, 'w', encoding='utf-8') as f:
+                json.dump(selection, f, indent=4, ensure_ascii=False)
+        except IOError:
+            pass
+
+    def for_player(self, player: str) -> TodoController:
+        return self.get(self.current(player))
+
+    def resolve_id(self, player: str, raw_id: str) -> Tuple[str, TodoController, str]:
+        """
+        解析任务 ID，支持 "<看板>:<任务ID>" 形式的限定 ID，否则使用玩家当前看板
+        :return: (看板名, 控制器, 任务ID)
+        """
+        if ":" in raw_id:
+            board, tid = raw_id.split(":", 1)
+        else:
+            board, tid = self.current(player), raw_id
+        return board, self.get(board), tid
+
+    # --- 跨看板查询 ---
+
+    def search_all(self, criteria: Dict[str, str]) -> Dict[str, Dict[str, Any]]:
+        """在所有看板中搜索，结果以 "<看板>:<任务ID>" 为键"""
+        results = {}
+        for name in self.names():
+            for tid, task in self.get(name).iter_tasks(criteria):
+                results[f"{name}:{tid}"] = task
+        return results
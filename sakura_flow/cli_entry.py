@@ -1,14 +1,61 @@
 import argparse
-from .controller import TodoController
+import io
+import json
+import shlex
+import sys
+from typing import Optional, TextIO, Iterable, Tuple
+
+from .controller import TodoController, SORT_KEYS
+from .deadlines import DEADLINE_FIELDS
 from .enums import Status
+from .fuzzy import FUZZY_FIELDS
+from .metrics import metrics, PHASES
+from .diagnostics import memory_report, allocation_sampler
+from .history import normalize_timestamp
+from .boards import BoardRegistry, DEFAULT_BOARD, ALL_BOARDS
+from . import transfer
+
+# Commands that only make sense as a top-level process invocation
+TOP_LEVEL_COMMANDS = {"serve", "coordinator", "batch"}
+# Commands that never write: their boards are opened as lock-free read-only snapshots (see snapshot module),
+# decoding only the tasks they touch. `tree`, `report` and `due` are left out on purpose: the subtask, analytics
+# and deadline indexes read every task, so they load the board normally instead of decoding the whole snapshot
+# task by task
+READ_ONLY_COMMANDS = {"list", "info", "history", "export"}
+# Commands that read/write files relative to the caller or use its stdin/stdout, so they always run locally
+LOCAL_COMMANDS = {"serve", "coordinator", "batch", "export", "import"}
+
+# Output formats of `list`
+LIST_FORMATS = ("table", "json", "jsonl", "tsv")
+TSV_FIELDS = ["id", "status", "tier", "priority", "creator", "title"]
+
+
+class CommandArgumentError(Exception):
+    pass
+
+
+class CommandArgumentParser(argparse.ArgumentParser):
+    """
+    ArgumentParser that raises instead of exiting, for parsing commands inside a running process
+    (daemon requests, batch lines)
+    """
+    def error(self, message):
+        raise CommandArgumentError(message)
+
+    def exit(self, status=0, message=None):
+        raise CommandArgumentError(message or "")
+
 
 def register_cli_commands(parser: argparse.ArgumentParser):
+    parser.add_argument("--board", default=None,
+                        help=f"Board to operate on (default: {DEFAULT_BOARD}); '{ALL_BOARDS}' searches every board (list only)")
     subparsers = parser.add_subparsers(dest="command", help="Available commands")
 
     # Add
     add_parser = subparsers.add_parser("add", help="Add a new task")
     add_parser.add_argument("title", help="Task title")
     add_parser.add_argument("--creator", default="CLI", help="Creator name")
+    add_parser.add_argument("--parent", help="Create the task as a subtask of this task ID")
 
     # List
     list_parser = subparsers.add_parser("list", help="List tasks")
@@ -22,15 +69,31 @@ def register_cli_commands(parser: argparse.ArgumentParser):
     list_parser.add_argument("--creator", help="Filter by creator")
     list_parser.add_argument("--collab", help="Filter by collaborator")
     list_parser.add_argument("--label", help="Filter by label")
+    list_parser.add_argument("--fuzzy", action="store_true",
+                             help="Typo-tolerant title/label/creator/collab filters, ranked by closeness")
+    # Paging / output
+    list_parser.add_argument("--sort", choices=sorted(SORT_KEYS), help="Sort key (default: storage order)")
+    list_parser.add_argument("--reverse", action="store_true", help="Reverse the order")
+    list_parser.add_argument("--offset", type=int, default=0, help="Skip the first N matches")
+    list_parser.add_argument("--limit", type=int, help="Return at most N matches")
+    list_parser.add_argument("--format", choices=LIST_FORMATS, default="table", help="Output format")
+    list_parser.add_argument("--as-of", help="List the board as it was at this time (YYYY-MM-DD[ HH:MM[:SS]])")
 
     # Info
     info_parser = subparsers.add_parser("info", help="Show task details")
     info_parser.add_argument("id", help="Task ID")
+    info_parser.add_argument("--all", action="store_true", help="Include archived (compacted) notes")
+    info_parser.add_argument("--as-of", help="Show the task as it was at this time (YYYY-MM-DD[ HH:MM[:SS]])")
+
+    # History
+    history_parser = subparsers.add_parser("history", help="Show the change history of a task")
+    history_parser.add_argument("id", help="Task ID")
+    history_parser.add_argument("--limit", type=int, default=0, help="Only show the newest N changes")
 
     # Set
     set_parser = subparsers.add_parser("set", help="Set task property")
     set_parser.add_argument("id", help="Task ID")
-    set_parser.add_argument("prop", help="Property name (title, status, tier, priority, description)")
+    set_parser.add_argument("prop", help="Property name (title, status, tier, priority, description, due, remind, parent)")
     set_parser.add_argument("value", help="New value")
     set_parser.add_argument("--editor", default="CLI", help="Editor name")
 
@@ -71,130 +134,565 @@ def register_cli_commands(parser: argparse.ArgumentParser):
     dt_parser = subparsers.add_parser("default_tier", help="Set default tier")
     dt_parser.add_argument("tier", help="Tier value")
 
-def handle_cli_command(args, controller: TodoController):
+    # Import / Export
+    export_parser = subparsers.add_parser("export", help="Stream tasks to a JSON Lines or CSV file")
+    export_parser.add_argument("file", nargs="?", default="-", help="Output file ('-' for stdout)")
+    export_parser.add_argument("--format", choices=transfer.FORMATS,
+                               help="Output format (default: from file extension, else jsonl)")
+    export_parser.add_argument("--status", help="Only export tasks with this status (e.g. Done, !Done)")
+
+    import_parser = subparsers.add_parser("import", help="Import tasks from a JSON Lines or CSV file in one transaction")
+    import_parser.add_argument("file", help="Input file ('-' for stdin)")
+    import_parser.add_argument("--format", choices=transfer.FORMATS,
+                               help="Input format (default: from file extension, else jsonl)")
+    import_parser.add_argument("--id-remap", action="store_true",
+                               help="Allocate fresh ids and rewrite dependencies instead of keeping the file's ids")
+
+    # Stats
+    compact_parser = subparsers.add_parser("compact", help="Move old notes into the compressed per-task archive")
+    compact_parser.add_argument("--days", type=int, default=None,
+                                help="Archive notes older than N days (default: note_retention_days from config)")
+    compact_parser.add_argument("--keep", type=int, default=None,
+                                help="Keep only the newest K notes per task (default: note_retention_keep from config)")
+
+    backup_parser = subparsers.add_parser("backup", help="Take, list or restore rotating backups of the board")
+    backup_parser.add_argument("action", nargs="?", choices=("take", "list", "restore"), default="take",
+                               help="take (default): snapshot now if anything changed; list; restore <name>")
+    backup_parser.add_argument("name", nargs="?", help="restore: backup generation to restore (see 'backup list')")
+
+    stats_parser = subparsers.add_parser("stats", help="Show per-command latency percentiles and store counters")
+    stats_parser.add_argument("--format", choices=("table", "json"), default="table", help="Output format")
+
+    report_parser = subparsers.add_parser("report", help="Board analytics: counts, completions over time, cycle time")
+    report_parser.add_argument("--days", type=int, default=7, help="Daily completion buckets to show (default: 7)")
+    report_parser.add_argument("--weeks", type=int, default=4, help="Weekly completion buckets to show (default: 4)")
+    report_parser.add_argument("--top", type=int, default=5, help="Entries shown for creators, labels, collaborators")
+    report_parser.add_argument("--format", choices=("table", "json"), default="table", help="Output format")
+
+    due_parser = subparsers.add_parser("due", help="List open tasks due within the next N days (overdue ones included)")
+    due_parser.add_argument("--days", type=int, default=7, help="Look-ahead window in days (default: 7)")
+    due_parser.add_argument("--format", choices=("table", "json"), default="table", help="Output format")
+
+    tree_parser = subparsers.add_parser("tree", help="Show a task's subtask tree with rolled-up progress")
+    tree_parser.add_argument("id", help="Root task ID")
+    tree_parser.add_argument("--depth", type=int, help="Only show subtasks down to this depth")
+    tree_parser.add_argument("--format", choices=("table", "json"), default="table", help="Output format")
+
+    # Diagnostics
+    debug_parser = subparsers.add_parser("debug", help="Diagnostic reports")
+    debug_parser.add_argument("topic", choices=("lock", "memory"),
+                              help="lock: tasks.json lock holder and contention; memory: in-memory footprint")
+    debug_parser.add_argument("--trace", type=int, default=0, metavar="N",
+                              help="memory: sample allocation sites over the next N commands (useful against a daemon)")
+    debug_parser.add_argument("--format", choices=("table", "json"), default="table", help="Output format")
+
+    # Boards
+    subparsers.add_parser("boards", help="List boards and their task counts")
+
+    # Daemon
+    subparsers.add_parser("serve", aliases=["coordinator"],
+                          help="Keep the boards resident and serve CLI calls and MCDR instances over a Unix socket")
+
+    # Batch
+    batch_parser = subparsers.add_parser("batch", help="Run CLI commands read from a file or stdin in one process")
+    batch_parser.add_argument("file", nargs="?", default="-", help="Command file, one command per line ('-' for stdin)")
+    batch_parser.add_argument("--chunk-size", type=int, default=0,
+                              help="Commit every N commands (default: 0, everything in a single transaction)")
+
+def handle_cli_command(args, controller: TodoController, out: Optional[TextIO] = None,
+                       boards: Optional[BoardRegistry] = None) -> bool:
+    """
+    Execute a parsed CLI command against the board of ``controller``.
+    Output goes to ``out`` (stdout by default) so the daemon can stream it back over its socket.
+    ``boards`` is needed for commands that span boards (``boards``, ``--board '*'``).
+    Every call is timed under ``cli:<command>`` in the process-wide metrics.
+    Returns False when the command reported an error instead of completing.
+    """
+    out = out or sys.stdout
+    with metrics.command(f"cli:{args.command}"):
+        return _dispatch(args, controller, out, boards) is not False
+
+
+def _fail(out: TextIO, message: str) -> bool:
+    """Print a command's error message; handlers ``return _fail(...)`` so the caller can tell it failed."""
+    print(message, file=out)
+    return False
+
+
+def _dispatch(args, controller: TodoController, out: TextIO, boards: Optional[BoardRegistry]):
+    if getattr(args, "board", None) == ALL_BOARDS and args.command != "list":
+        return _fail(out, f"Error: --board '{ALL_BOARDS}' is only supported by 'list'")
+
     if args.command == "add":
-        task_id = controller.add_task(args.title, args.creator)
-        print(f"Task created with ID: {task_id}")
+        task_id = controller.add_task(args.title, args.creator, args.parent)
+        if task_id is None:
+            return _fail(out, f"Parent task {args.parent} not found.")
+        print(f"Task created with ID: {task_id}", file=out)
 
     elif args.command == "list":
         # Build criteria
         criteria = {}
         if args.title: criteria['title'] = args.title
-        if args.status: criteria['status'] = args.status
         if args.tier: criteria['tier'] = args.tier
         if args.priority: criteria['priority'] = args.priority
         if args.creator: criteria['creator'] = args.creator
         if args.collab: criteria['collaborator'] = args.collab
         if args.label: criteria['label'] = args.label
 
-        # If criteria exists, use search_tasks
-        if criteria:
-            tasks = controller.search_tasks(criteria)
-            # Apply archive/all filter on top of search results if needed?
-            # search_tasks currently searches ALL tasks.
-            # We should probably filter by status if --all is not present and status is not in criteria.
-            
-            filtered_tasks = {}
-            for tid, task in tasks.items():
-                is_done = task['status'] == Status.DONE.value
-                if args.archive:
-                    if is_done: filtered_tasks[tid] = task
-                elif args.all:
-                    filtered_tasks[tid] = task
-                else:
-                    # Default: only show not done
-                    if not is_done: filtered_tasks[tid] = task
-            
-            tasks = filtered_tasks
-            
-        else:
-            # Fallback to original logic
-            if args.archive:
-                 tasks = controller.get_archived_tasks()
-            else:
-                 tasks = controller.get_tasks(include_done=args.all)
-        
-        print(f"{'ID':<5} {'Status':<12} {'Title'}")
-        print("-" * 40)
-        for tid, task in tasks.items():
-            print(f"{tid:<5} {task['status']:<12} {task['title']}")
+        # Status scoping is part of the query: --archive -> Done, default -> not Done, --all -> any.
+        # An explicit --status takes precedence over the scope flags.
+        if args.status:
+            criteria['status'] = args.status
+        elif args.archive:
+            criteria['status'] = Status.DONE.value
+        elif not args.all:
+            criteria['status'] = '!' + Status.DONE.value
+
+        tasks = None
+        suggestions = {}
+        if args.fuzzy and (args.as_of or args.board == ALL_BOARDS):
+            return _fail(out, "Error: --fuzzy cannot be combined with --as-of or --board '*'")
+        if args.fuzzy:
+            # Rank-ordered matches; the remaining exact filters are re-applied below (and are cheap on the subset)
+            tasks, suggestions = controller.fuzzy_search(criteria)
+            criteria = {k: v for k, v in criteria.items() if k not in FUZZY_FIELDS or v.startswith('!')}
+        elif args.board == ALL_BOARDS and boards is not None:
+            if args.as_of:
+                return _fail(out, "Error: --as-of cannot be combined with --board '*'")
+            tasks = boards.search_all(criteria)
+        elif args.as_of:
+            try:
+                tasks = controller.tasks_at(normalize_timestamp(args.as_of))
+            except ValueError as e:
+                return _fail(out, f"Error: {e}")
+        rows = controller.select_tasks(criteria, sort=args.sort, reverse=args.reverse,
+                                       offset=max(args.offset, 0), tasks=tasks,
+                                       limit=max(args.limit, 0) if args.limit is not None else None)
+        write_task_rows(rows, args.format, out)
+        if args.format == "table":
+            for field, words in suggestions.items():
+                if words:
+                    print(f"Did you mean {field}: {', '.join(words)}?", file=out)
 
     elif args.command == "info":
-        task = controller.get_task(args.id)
+        if args.as_of:
+            try:
+                task = controller.task_at(args.id, normalize_timestamp(args.as_of))
+            except ValueError as e:
+                return _fail(out, f"Error: {e}")
+        else:
+            task = controller.get_task(args.id)
         if task:
-            print(f"ID: {args.id}")
-            print(f"Title: {task['title']}")
-            print(f"Status: {task['status']}")
+            print(f"ID: {args.id}", file=out)
+            print(f"Title: {task['title']}", file=out)
+            print(f"Status: {task['status']}", file=out)
             description = task.get('description', '')
             if not description:
                 description = "No description"
-            print(f"Description: {description}")
-            print(f"Tier: {task.get('tier', '')}")
-            print(f"Priority: {task.get('priority', '')}")
-            print(f"Dependencies: {', '.join(map(str, task.get('dependencies', [])))}")
-            print(f"Collaborators: {', '.join(task.get('collaborators', []))}")
-            print("Notes:")
+            print(f"Description: {description}", file=out)
+            print(f"Tier: {task.get('tier', '')}", file=out)
+            print(f"Priority: {task.get('priority', '')}", file=out)
+            for field in DEADLINE_FIELDS:
+                if task.get(field):
+                    print(f"{field.capitalize()}: {task[field]}", file=out)
+            if task.get("parent"):
+                print(f"Parent: {task['parent']}", file=out)
+            rollups = controller.rollups
+            if not args.as_of and rollups is not None:
+                progress = rollups.progress(args.id)
+                if progress is not None:
+                    print(f"Subtasks: {progress[0]}/{progress[1]} done", file=out)
+            print(f"Dependencies: {', '.join(map(str, task.get('dependencies', [])))}", file=out)
+            print(f"Collaborators: {', '.join(task.get('collaborators', []))}", file=out)
+            print("Notes:", file=out)
+            if args.all:
+                for note in controller.get_archived_notes(args.id):
+                    print(f"  [{note['time']}] {note['author']}: {note['content']} (archived)", file=out)
+            elif task.get("archived_notes"):
+                print(f"  ({task['archived_notes']} older note(s) archived, use --all to show)", file=out)
             for note in task.get("notes", []):
-                print(f"  [{note['time']}] {note['author']}: {note['content']}")
+                print(f"  [{note['time']}] {note['author']}: {note['content']}", file=out)
         else:
-            print(f"Task {args.id} not found.")
+            return _fail(out, f"Task {args.id} not found" + (f" at {args.as_of}." if args.as_of else "."))
+
+    elif args.command == "history":
+        entries = controller.get_task_history(args.id)
+        if not entries:
+            print(f"No recorded changes for task {args.id}.", file=out)
+        for entry in entries[-args.limit if args.limit > 0 else 0:]:
+            print(f"[{entry['time']}] {entry['editor']}" + (" created the task" if entry["created"] else ""), file=out)
+            if entry["created"]:
+                continue
+            for field, old, new in entry["changes"]:
+                print(f"  {field}: {describe_change(old, new)}", file=out)
 
     elif args.command == "set":
         success, val, err = controller.set_property(args.id, args.prop, args.value, args.editor)
         if success:
-            print(f"Set {args.prop} to {val}")
+            print(f"Set {args.prop} to {val}", file=out)
         else:
-            print(f"Error: {err}")
+            return _fail(out, f"Error: {err}")
 
     elif args.command == "append":
         success, err = controller.append_list_property(args.id, args.list_prop, args.value, args.editor)
         if success:
-            print(f"Appended {args.value} to {args.list_prop}")
+            print(f"Appended {args.value} to {args.list_prop}", file=out)
         else:
-            print(f"Error: {err}")
+            return _fail(out, f"Error: {err}")
 
     elif args.command == "remove":
         success, err = controller.remove_list_property(args.id, args.list_prop, args.value, args.editor)
         if success:
-            print(f"Removed {args.value} from {args.list_prop}")
+            print(f"Removed {args.value} from {args.list_prop}", file=out)
         else:
-            print(f"Error: {err}")
+            return _fail(out, f"Error: {err}")
 
     elif args.command == "note":
         if controller.add_note(args.id, args.content, args.author):
-            print("Note added.")
+            print("Note added.", file=out)
         else:
-            print("Failed to add note.")
+            return _fail(out, "Failed to add note.")
 
     elif args.command == "complete":
         if controller.update_status(args.id, Status.DONE, "CLI"):
-            print(f"Task {args.id} marked as completed.")
+            print(f"Task {args.id} marked as completed.", file=out)
         else:
-            print(f"Failed to update task {args.id}.")
+            return _fail(out, f"Failed to update task {args.id}.")
 
     elif args.command == "pause":
         if controller.update_status(args.id, Status.ON_HOLD, "CLI"):
-            print(f"Task {args.id} paused.")
+            print(f"Task {args.id} paused.", file=out)
         else:
-            print(f"Failed to update task {args.id}.")
+            return _fail(out, f"Failed to update task {args.id}.")
 
     elif args.command == "resume":
         if controller.update_status(args.id, Status.IN_PROGRESS, "CLI"):
-            print(f"Task {args.id} resumed.")
+            print(f"Task {args.id} resumed.", file=out)
         else:
-            print(f"Failed to update task {args.id}.")
+            return _fail(out, f"Failed to update task {args.id}.")
 
     elif args.command == "restore":
         if controller.update_status(args.id, Status.IN_PROGRESS, "CLI"):
-            print(f"Task {args.id} restored.")
+            print(f"Task {args.id} restored.", file=out)
         else:
-            print(f"Failed to update task {args.id}.")
+            return _fail(out, f"Failed to update task {args.id}.")
             
     elif args.command == "default_tier":
         if controller.set_default_tier(args.tier):
-            print(f"Default tier set to {args.tier}")
+            print(f"Default tier set to {args.tier}", file=out)
+        else:
+            return _fail(out, "Invalid tier.")
+
+    elif args.command == "export":
+        fmt = args.format or transfer.guess_format(args.file)
+        tasks = controller.search_tasks({'status': args.status}) if args.status else controller.manager.data["tasks"]
+        if args.file == "-":
+            transfer.export_tasks(tasks, out, fmt)
         else:
-            print("Invalid tier.")
+            with open(args.file, 'w', encoding='utf-8', newline='') as f:
+                count = transfer.export_tasks(tasks, f, fmt)
+            print(f"Exported {count} task(s) to {args.file}", file=out)
+
+    elif args.command == "import":
+        fmt = args.format or transfer.guess_format(args.file)
+        try:
+            if args.file == "-":
+                imported, skipped = controller.import_tasks(transfer.read_tasks(sys.stdin, fmt), args.id_remap)
+            else:
+                with open(args.file, 'r', encoding='utf-8', newline='') as f:
+                    imported, skipped = controller.import_tasks(transfer.read_tasks(f, fmt), args.id_remap)
+        except ValueError as e:
+            return _fail(out, f"Error: {e}")
+        print(f"Imported {imported} task(s), skipped {skipped}.", file=out)
+
+    elif args.command == "compact":
+        r = controller.compact_notes(args.days, args.keep)
+        print(f"Archived {r['notes']} note(s) from {r['tasks']} task(s). "
+              f"tasks.json {r['bytes_before']} -> {r['bytes_after']} bytes "
+              f"(reclaimed {r['bytes_before'] - r['bytes_after']}), archive grew by {r['archive_bytes']} bytes.", file=out)
+
+    elif args.command == "backup":
+        if args.action == "list":
+            for b in controller.list_backups():
+                print(f"{b['name']:<20} {b['time']}  {b['size']:>10} bytes", file=out)
+        elif args.action == "restore":
+            if not args.name:
+                return _fail(out, "Error: 'backup restore' needs the name of a backup (see 'backup list')")
+            try:
+                restored = controller.restore_backup(args.name, "CLI")
+            except ValueError as e:
+                return _fail(out, f"Error: {e}")
+            if not restored:
+                return _fail(out, f"Error: Backup {args.name} not found.")
+            print(f"Restored backup {args.name}. The previous state was backed up first.", file=out)
+        else:
+            name = controller.take_backup()
+            print(f"Backup {name} taken." if name else "No changes since the last backup.", file=out)
+
+    elif args.command == "boards":
+        for name in (boards.names() if boards is not None else []):
+            print(f"{name:<24} {len(boards.get(name).manager.data['tasks']):>6} task(s)", file=out)
+
+    elif args.command == "stats":
+        write_stats(metrics.snapshot(), args.format, out)
+
+    elif args.command == "report":
+        write_report(controller.report(days=max(args.days, 0), weeks=max(args.weeks, 0), top=max(args.top, 1)),
+                     args.format, out)
+
+    elif args.command == "due":
+        days = max(args.days, 0)
+        rows = [{"id": tid, "due": due, "title": controller.get_task(tid)["title"]}
+                for due, tid in controller.upcoming_deadlines(days)]
+        if args.format == "json":
+            out.write(json.dumps(rows, ensure_ascii=False, indent=4) + "\n")
+        elif not rows:
+            print(f"No open tasks due within {days} day(s).", file=out)
+        else:
+            for row in rows:
+                print(f"{row['due']}  #{row['id']:<6} {row['title']}", file=out)
+
+    elif args.command == "tree":
+        if controller.get_task(args.id) is None:
+            return _fail(out, f"Task {args.id} not found.")
+        rows = []
+        for depth, tid in controller.subtask_tree(args.id, args.depth):
+            task = controller.get_task(tid) or {}
+            rollup = controller.subtasks.rollup(tid)
+            rows.append({"id": tid, "depth": depth, "title": task.get("title", ""), "status": task.get("status", ""),
+                         **(rollup.to_dict() if rollup is not None else {})})
+        if args.format == "json":
+            out.write(json.dumps(rows, ensure_ascii=False, indent=4) + "\n")
+        else:
+            for row in rows:
+                progress = f"  ({row['done']}/{row['total']} done)" if "total" in row else ""
+                print(f"{'  ' * row['depth']}#{row['id']} [{row['status']}] {row['title']}{progress}", file=out)
+
+    elif args.command == "debug":
+        if args.topic == "lock":
+            write_lock_report(controller.manager.file_lock.diagnose(), args.format, out)
+        elif args.trace > 0:
+            allocation_sampler.start(args.trace)
+            print(f"Sampling allocations over the next {args.trace} command(s).", file=out)
+        else:
+            write_memory_report(memory_report(controller), args.format, out)
+
+    elif args.command == "batch":
+        if args.file == "-":
+            run_batch(sys.stdin, controller, out, args.chunk_size)
+        else:
+            with open(args.file, 'r', encoding='utf-8') as f:
+                run_batch(f, controller, out, args.chunk_size)
 
     else:
-        print("No command specified. Use --help for usage.")
+        return _fail(out, "No command specified. Use --help for usage.")
+
+
+def _tsv_cell(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+def write_task_rows(rows: Iterable, fmt: str, out: TextIO):
+    """
+    Stream (tid, task) pairs to ``out`` as they are produced.
+    json writes one array incrementally, jsonl one object per line, tsv a header plus
+    one escaped row per task (backslash, tab and newlines are escaped as \\\\, \\t, \\n, \\r).
+    """
+    if fmt == "table":
+        print(f"{'ID':<5} {'Status':<12} {'Title'}", file=out)
+        print("-" * 40, file=out)
+        for tid, task in rows:
+            print(f"{tid:<5} {task['status']:<12} {task['title']}", file=out)
+
+    elif fmt == "jsonl":
+        for tid, task in rows:
+            out.write(json.dumps({"id": tid, **task}, ensure_ascii=False) + "\n")
+
+    elif fmt == "json":
+        out.write("[")
+        for i, (tid, task) in enumerate(rows):
+            out.write(("," if i else "") + "\n" + json.dumps({"id": tid, **task}, ensure_ascii=False))
+        out.write("\n]\n")
+
+    elif fmt == "tsv":
+        out.write("\t".join(TSV_FIELDS) + "\n")
+        for tid, task in rows:
+            row = {"id": tid, **task}
+            out.write("\t".join(_tsv_cell(row.get(f, "")) for f in TSV_FIELDS) + "\n")
+
+
+def describe_change(old, new) -> str:
+    """One-line summary of a field change; lists are shown as added/removed items."""
+    if isinstance(old, list) or isinstance(new, list):
+        old, new = old or [], new or []
+        added = [x for x in new if x not in old]
+        removed = [x for x in old if x not in new]
+        parts = [f"+{x['content'] if isinstance(x, dict) else x}" for x in added]
+        parts += [f"-{x['content'] if isinstance(x, dict) else x}" for x in removed]
+        return ", ".join(parts) or "reordered"
+    return f"{old!r} -> {new!r}"
+
+
+def write_stats(snapshot: dict, fmt: str, out: TextIO):
+    """
+    Print a metrics snapshot. Statistics live in the process that ran the commands,
+    so this is mostly useful against a daemon (or at the end of a batch).
+    """
+    if fmt == "json":
+        out.write(json.dumps(snapshot, indent=4) + "\n")
+        return
+    header = f"{'Command':<24} {'Calls':>7} {'p50':>9} {'p95':>9} {'p99':>9}  " + " ".join(f"{p:>9}" for p in PHASES)
+    print(header, file=out)
+    print("-" * len(header), file=out)
+    for name, entry in snapshot["commands"].items():
+        total, phases = entry["total"], entry["phases"]
+        print(f"{name:<24} {entry['calls']:>7} {total['p50']:>9.2f} {total['p95']:>9.2f} {total['p99']:>9.2f}  "
+              + " ".join(f"{phases[p]:>9.2f}" for p in PHASES), file=out)
+    print("(times in ms; phase columns are medians)", file=out)
+    print("Counters: " + ", ".join(f"{k}={v}" for k, v in sorted(snapshot["counters"].items())), file=out)
+
+
+def write_report(report: dict, fmt: str, out: TextIO):
+    if fmt == "json":
+        out.write(json.dumps(report, indent=4, ensure_ascii=False) + "\n")
+        return
+    print(f"Tasks: {report['total']} ({report['open']} open)", file=out)
+    median = report["median_hours_to_done"]
+    print(f"Median time to Done: {f'{median} h' if median is not None else 'n/a'}", file=out)
+    sections = [("Status", "status"), ("Tier (open)", "tier"), ("Priority (open)", "priority"),
+                ("Creators (open)", "creator"), ("Labels (open)", "label"),
+                ("Busiest collaborators (open)", "busiest_collaborators"),
+                ("Completed per day", "completed_per_day"), ("Completed per week", "completed_per_week")]
+    for title, key in sections:
+        print(f"{title}:", file=out)
+        if not report[key]:
+            print("  -", file=out)
+        for name, count in report[key].items():
+            print(f"  {name:<20} {count:>6}", file=out)
+
+
+def write_lock_report(report: dict, fmt: str, out: TextIO):
+    if fmt == "json":
+        out.write(json.dumps(report, indent=4) + "\n")
+        return
+    holder = report["holder"]
+    print(f"Lock file: {report['lock_file']}", file=out)
+    if holder:
+        state = "STALE (holder process is gone)" if holder["stale"] else "held"
+        print(f"Holder: pid {holder.get('pid')} [{holder.get('role')}] command={holder.get('command')} "
+              f"host={holder.get('host')} for {holder['held_for']:.2f}s - {state}", file=out)
+    else:
+        print("Holder: none" if not report["locked"] else "Holder: unknown (no lock record)", file=out)
+    proc = report["process"]
+    print(f"This process: pid {proc['pid']} [{proc['role']}] timeout={proc['timeout']}s "
+          f"break_stale={proc['break_stale']}", file=out)
+    for name in ("wait_ms", "hold_ms"):
+        d = report[name]
+        print(f"{name:<8} n={d['count']:<6} p50={d['p50']:.2f} p95={d['p95']:.2f} p99={d['p99']:.2f} max={d['max']:.2f}",
+              file=out)
+    print("Counters: " + ", ".join(f"{k}={v}" for k, v in report["counters"].items()), file=out)
+
+
+def write_memory_report(report: dict, fmt: str, out: TextIO):
+    if fmt == "json":
+        out.write(json.dumps(report, indent=4) + "\n")
+        return
+    print(f"{report['task_count']} task(s), {report['note_count']} note(s), walked in {report['walk_ms']} ms", file=out)
+    for section, size in report["sections"].items():
+        print(f"{section:<18} {size:>14,} B", file=out)
+    for name, size in report["indexes"].items():
+        print(f"  {name:<16} {size:>14,} B", file=out)
+    print(f"{'total':<18} {report['total']:>14,} B", file=out)
+    if report["tracemalloc"]:
+        print(f"tracemalloc current={report['tracemalloc']['current']:,} B peak={report['tracemalloc']['peak']:,} B",
+              file=out)
+    trace = report["trace"]
+    if trace["active"]:
+        print(f"Allocation sampling active, {trace['remaining']} command(s) left.", file=out)
+    elif trace["top"]:
+        print("Top allocation sites in the last sampling window:", file=out)
+        for entry in trace["top"]:
+            print(f"  {entry['size_diff']:>+12,} B {entry['count_diff']:>+8} {entry['site']}", file=out)
+
+
+class _LineRejected(Exception):
+    """Raised inside a batch line's savepoint when its command reported an error, so its writes are undone"""
+
+
+def run_batch(lines: Iterable[str], controller: TodoController, out: TextIO, chunk_size: int = 0):
+    """
+    Execute a stream of CLI commands against one loaded store.
+    Every chunk of ``chunk_size`` commands (all of them when 0) runs inside a single transaction,
+    so the whole chunk costs one lock, one load and one save. Results are printed per line as
+    ``<line number>: <output>``; blank lines and lines starting with '#' are skipped.
+    Each line runs inside a savepoint: a line that cannot be parsed or whose command reports an error
+    leaves no writes behind and is counted as rejected without aborting the batch.
+    Output is held back until the chunk commits: if a command fails unexpectedly the chunk is rolled
+    back, every line in it is reported as rejected, and the batch continues with the next chunk.
+    """
+    parser = CommandArgumentParser(prog="batch")
+    register_cli_commands(parser)
+    manager = controller.manager
+    executed = failed = 0
+
+    def run_line(line: str) -> Tuple[bool, str]:
+        buffer = io.StringIO()
+        try:
+            args = parser.parse_args(shlex.split(line))
+            if args.command in TOP_LEVEL_COMMANDS:
+                raise CommandArgumentError(f"'{args.command}' is not allowed inside a batch")
+            if args.board is not None:
+                raise CommandArgumentError("--board is not allowed inside a batch, pass it to 'batch' instead")
+            with manager.savepoint():
+                if not handle_cli_command(args, controller, buffer):
+                    raise _LineRejected()
+            ok = True
+        except _LineRejected:
+            ok = False
+        except (CommandArgumentError, ValueError) as e:
+            print(f"Error: {e}", file=buffer)
+            ok = False
+        return ok, buffer.getvalue()
+
+    pending = []
+
+    def flush():
+        nonlocal executed, failed
+        results = []
+        current = None
+        try:
+            with manager.transaction():
+                for current, line in pending:
+                    results.append((current, *run_line(line)))
+                current = None
+        except Exception as e:
+            # The whole chunk was rolled back, so none of its lines may report success
+            executed += len(pending)
+            failed += len(pending)
+            for lineno, _ in pending:
+                if current is None:
+                    reason = f"Rolled back: {e}"
+                elif lineno == current:
+                    reason = f"Error: {e}"
+                else:
+                    reason = f"Rolled back: line {current} failed"
+                print(f"{lineno}: {reason}", file=out)
+        else:
+            for lineno, ok, output in results:
+                executed += 1
+                failed += not ok
+                for result_line in output.splitlines() or [""]:
+                    print(f"{lineno}: {result_line}", file=out)
+        pending.clear()
+
+    for lineno, raw in enumerate(lines, start=1):
+        line = raw.strip()
+        if not line or line.startswith("#"):
+            continue
+        pending.append((lineno, line))
+        if chunk_size > 0 and len(pending) >= chunk_size:
+            flush()
+    if pending:
+        flush()
+
+    print(f"Batch finished: {executed} command(s), {failed} rejected.", file=out)
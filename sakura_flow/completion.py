@@ -0,0 +1,180 @@
+import bisect
+from typing import Dict, Any, List, Optional, Tuple, Iterable
+
+from .enums import Status
+from .manager import TodoManager
+
+
+def match_options(options: Iterable[str], prefix: str, limit: int) -> List[str]:
+    """在固定的小候选集（属性别名、枚举值等）中按前缀筛选，保持原有顺序，大小写不同的重复项只保留第一个"""
+    prefix = prefix.lower()
+    unique = {}
+    for option in options:
+        unique.setdefault(option.lower(), option)
+    return [o for key, o in unique.items() if key.startswith(prefix)][:limit]
+
+
+def enum_options(enum_cls) -> List[str]:
+    """枚举的标准值及其全部别名"""
+    options = [member.value for member in enum_cls]
+    for member in enum_cls:
+        options.extend(member.aliases)
+    return options
+
+
+_DONE = Status.DONE.value
+
+
+class PrefixIndex:
+    """
+    不区分大小写的前缀索引（可重复计数的词集合）
+    词按长度分桶，桶内为有序数组：同一前缀的词在每个桶内是连续区间，二分定位后按长度由短到长依次取出，
+    效果等同于按层遍历的字典树，但不必为每个字符创建节点；插入与删除为一次二分加数组移动
+    """
+    def __init__(self):
+        self._buckets: Dict[int, List[str]] = {}
+        # 小写词 -> [引用计数, 显示形式（第一次出现时的大小写）]
+        self._terms: Dict[str, list] = {}
+
+    def __len__(self):
+        return len(self._terms)
+
+    def load(self, terms: Iterable[str]):
+        """一次性载入大量词（全量构建时使用），比逐个插入少做数组移动"""
+        for term in terms:
+            key = term.lower()
+            entry = self._terms.get(key)
+            if entry is None:
+                self._terms[key] = [1, term]
+            else:
+                entry[0] += 1
+        self._buckets = {}
+        for key in self._terms:
+            self._buckets.setdefault(len(key), []).append(key)
+        for bucket in self._buckets.values():
+            bucket.sort()
+
+    def add(self, term: str):
+        key = term.lower()
+        entry = self._terms.get(key)
+        if entry is not None:
+            entry[0] += 1
+            return
+        self._terms[key] = [1, term]
+        bisect.insort(self._buckets.setdefault(len(key), []), key)
+
+    def discard(self, term: str):
+        key = term.lower()
+        entry = self._terms.get(key)
+        if entry is None:
+            return
+        entry[0] -= 1
+        if entry[0] > 0:
+            return
+        del self._terms[key]
+        bucket = self._buckets[len(key)]
+        del bucket[bisect.bisect_left(bucket, key)]
+        if not bucket:
+            del self._buckets[len(key)]
+
+    def complete(self, prefix: str, limit: int, exclude: Iterable[str] = ()) -> List[str]:
+        """以 prefix 开头的词（显示形式），短词在前，最多 limit 个"""
+        prefix = prefix.lower()
+        exclude = {e.lower() for e in exclude}
+        result: List[str] = []
+        for length in sorted(self._buckets):
+            if length < len(prefix):
+                continue
+            bucket = self._buckets[length]
+            i = bisect.bisect_left(bucket, prefix)
+            while i < len(bucket) and bucket[i].startswith(prefix):
+                if bucket[i] not in exclude:
+                    result.append(self._terms[bucket[i]][1])
+                    if len(result) >= limit:
+                        return result
+                i += 1
+        return result
+
+
+class CompletionIndex:
+    """
+    指令补全使用的前缀索引：未完成/已完成任务 ID、标签、玩家（创建者与协作者）以及标题中的词
+    首次使用时构建，之后随事务提交增量维护；数据文件被重新解析后在下次使用时重建
+    """
+    def __init__(self, manager: TodoManager):
+        self.manager = manager
+        self._reset()
+
+    def _reset(self):
+        self.open_ids = PrefixIndex()
+        self.closed_ids = PrefixIndex()
+        self.labels = PrefixIndex()
+        self.players = PrefixIndex()
+        self.title_words = PrefixIndex()
+        # 每个任务登记的词条 {任务ID: (是否未完成, 标签, 玩家, 标题词)}，用于更新时撤销；None 表示尚未构建
+        self._entries: Optional[Dict[str, Tuple[bool, tuple, tuple, tuple]]] = None
+
+    @staticmethod
+    def _entry(task: Dict[str, Any]) -> Tuple[bool, tuple, tuple, tuple]:
+        players = [task.get("creator", "")] + list(task.get("collaborators", []))
+        return (task.get("status") != _DONE,
+                tuple(dict.fromkeys(task.get("labels", []))),
+                tuple(dict.fromkeys(p for p in players if p)),
+                tuple(dict.fromkeys(task.get("title", "").split())))
+
+    def _apply(self, tid: str, entry: Tuple[bool, tuple, tuple, tuple], add: bool):
+        is_open, labels, players, words = entry
+        op = "add" if add else "discard"
+        getattr(self.open_ids if is_open else self.closed_ids, op)(tid)
+        for index, terms in ((self.labels, labels), (self.players, players), (self.title_words, words)):
+            for term in terms:
+                getattr(index, op)(term)
+
+    def _index(self, tid: str, task: Optional[Dict[str, Any]]):
+        old = self._entries.pop(tid, None)
+        if old is not None:
+            self._apply(tid, old, False)
+        if task is not None:
+            entry = self._entries[tid] = self._entry(task)
+            self._apply(tid, entry, True)
+
+    def ensure(self) -> 'CompletionIndex':
+        if self._entries is None:
+            self._reset()
+            entries = {tid: self._entry(task) for tid, task in self.manager.data["tasks"].items()}
+            self.open_ids.load(tid for tid, e in entries.items() if e[0])
+            self.closed_ids.load(tid for tid, e in entries.items() if not e[0])
+            for i, index in enumerate((self.labels, self.players, self.title_words), start=1):
+                index.load(term for e in entries.values() for term in e[i])
+            self._entries = entries
+        return self
+
+    # --- 监听者接口 ---
+
+    def on_commit(self, changes):
+        if self._entries is None:
+            return
+        for tid, _, after, _ in changes:
+            self._index(tid, after)
+
+    on_sync = on_commit
+
+    def on_reload(self):
+        self._reset()
+
+    # --- 查询 ---
+
+    def task_ids(self, prefix: str, limit: int, open_first: bool = True, exclude: Iterable[str] = ()) -> List[str]:
+        """任务 ID 补全；open_first 为 False 时已完成的任务排在前面（例如 restore）"""
+        self.ensure()
+        exclude = list(exclude)
+        first, second = (self.open_ids, self.closed_ids) if open_first else (self.closed_ids, self.open_ids)
+        result = first.complete(prefix, limit, exclude)
+        if len(result) < limit:
+            result += second.complete(prefix, limit - len(result), exclude)
+        return result
+
+    def complete(self, kind: str, prefix: str, limit: int, exclude: Iterable[str] = ()) -> List[str]:
+        """kind: labels / players / title_words"""
+        self.ensure()
+        return getattr(self, kind).complete(prefix, limit, exclude)
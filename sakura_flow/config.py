@@ -0,0 +1,83 @@
+import json
+import os
+from typing import Dict, Any
+
+# 插件配置，MCDR 插件与 CLI 共用同一份文件: <MCDR 根目录>/config/sakura_flow/config.json
+# 只依赖标准库，CLI 可直接读取
+DEFAULT_CONFIG: Dict[str, Any] = {
+    # MCDR 插件是否同时托管本地守护进程套接字，使外部 CLI 共享插件的内存状态与写入路径
+    # 同时作为协调者：其他 MCDR 实例通过该套接字读写同一份看板
+    "serve_socket": False,
+    # 发现正在运行的协调者（守护进程）时，写操作交给它执行并订阅其变更通知；不存在时直接读写文件
+    "use_coordinator": True,
+    # 数据目录，留空为 <MCDR 根目录>/sf_tasks；多个服务器共享看板时指向同一目录
+    "data_dir": "",
+    # 单条命令耗时超过该阈值（毫秒）时输出慢命令警告
+    "slow_command_threshold_ms": 500,
+    # 每条命令保留用于计算 p50/p95/p99 的最近调用次数
+    "stats_window": 1000,
+    # 获取 tasks.json 锁的超时时间（秒）
+    "lock_timeout": 5,
+    # 持有锁的进程已不存在（同一主机）时自动打破残留的锁
+    "break_stale_locks": True,
+    # 笔记保留策略（compact 指令使用）：早于该天数的笔记移入压缩归档，0 为不按时间归档
+    "note_retention_days": 0,
+    # 每个任务在主数据文件中保留的最新笔记条数，超出部分移入压缩归档，0 为不限
+    "note_retention_keep": 20,
+    # 变更历史中每个任务每隔多少条增量写入一次完整快照，越小回溯越快、历史文件越大
+    "history_keyframe_interval": 16,
+    # 长驻进程每次向 ID 序列文件预留的任务 ID 数；大于 1 可减少多进程同时新建任务时的争用，但 ID 可能不连续
+    "id_block_size": 1,
+    # 长驻进程（插件、守护进程）为已加载看板生成备份的间隔（分钟），0 为不定时备份；数据未变化时不产生新备份
+    "backup_interval_minutes": 60,
+    # 每个看板保留的备份代数
+    "backup_keep": 24,
+    # MCDR 插件在任务到达提醒时间（remind）与截止时间（due）时通知协作者，没有协作者时全服广播
+    "due_reminders": True,
+}
+
+
+def config_path_for_root(mcdr_root: str) -> str:
+    return os.path.join(mcdr_root, 'config', 'sakura_flow', 'config.json')
+
+
+def data_path_for(config: Dict[str, Any], mcdr_root: str) -> str:
+    """默认看板的数据文件路径"""
+    data_dir = config["data_dir"] or os.path.join(mcdr_root, 'sf_tasks')
+    return os.path.join(os.path.abspath(data_dir), 'tasks.json')
+
+
+def load_config(path: str, write_default: bool = False) -> Dict[str, Any]:
+    """
+    读取配置并以默认值补全缺失项
+    :param path: 配置文件路径
+    :param write_default: 配置文件不存在或缺项时是否写回补全后的配置
+    """
+    config = dict(DEFAULT_CONFIG)
+    loaded = {}
+    if os.path.exists(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                loaded = json.load(f)
+        except (json.JSONDecodeError, IOError):
+            loaded = {}
+    if isinstance(loaded, dict):
+        config.update({k: v for k, v in loaded.items() if k in DEFAULT_CONFIG})
+
+    if write_default and set(loaded) != set(config):
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(config, f, indent=4, ensure_ascii=False)
+        except IOError:
+            pass
+    return config
+
+
+def configure_manager(manager, config: Dict[str, Any]):
+    """将配置中的存储相关项套用到 TodoManager（每个看板加载时调用）"""
+    manager.file_lock.configure(timeout=config["lock_timeout"], break_stale=config["break_stale_locks"])
+    manager.note_retention_days, manager.note_retention_keep = config["note_retention_days"], config["note_retention_keep"]
+    manager.history.keyframe_interval = config["history_keyframe_interval"]
+    manager.ids.block_size = max(1, config["id_block_size"])
+    manager.backups.keep = config["backup_keep"]
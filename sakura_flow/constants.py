@@ -1,5 +1,3 @@
-from mcdreforged.api.all import RColor, RText
-
 from .enums import Priority
 
 COMMAND_PREFIX = "!!todo"
@@ -23,7 +21,10 @@ TASK_PROPERTIES = {
     'description': ['desc', 'description'],
     'status': ['stat', 's', 'status'],
     'tier': ['tier', 't'],
-    'priority': ['prio', 'p', 'priority']
+    'priority': ['prio', 'p', 'priority'],
+    'due': ['due', 'deadline'],
+    'remind': ['remind', 'reminder'],
+    'parent': ['parent', 'up']
 }
 
 LIST_PROPERTIES = {
@@ -41,34 +42,25 @@ GT_TIERS = [
     'UV', 'UHV', 'UEV', 'UIV', 'UXV', 'OpV', 'MAX'
 ]
 
+# 颜色以 RColor 属性名保存，渲染时再解析，保证核心模块不依赖 MCDR
 TIER_COLORS = {
-    'ULV': RColor.dark_gray,
-    'LV': RColor.gray,
-    'MV': RColor.aqua,
-    'HV': RColor.gold,
-    'EV': RColor.dark_purple,
-    'IV': RColor.blue,
-    'LuV': RColor.light_purple,
-    'ZPM': RColor.red,
-    'UV': RColor.dark_aqua,
-    'UHV': RColor.dark_red,
-    'UEV': RColor.green,
-    'UIV': RColor.dark_green,
-    'UXV': RColor.yellow,
-    'OpV': RColor.blue,
-    'MAX': RColor.red
+    'ULV': 'dark_gray',
+    'LV': 'gray',
+    'MV': 'aqua',
+    'HV': 'gold',
+    'EV': 'dark_purple',
+    'IV': 'blue',
+    'LuV': 'light_purple',
+    'ZPM': 'red',
+    'UV': 'dark_aqua',
+    'UHV': 'dark_red',
+    'UEV': 'green',
+    'UIV': 'dark_green',
+    'UXV': 'yellow',
+    'OpV': 'blue',
+    'MAX': 'red'
 }
 
 # --- Priority Configuration ---
 # 保持向后兼容，虽然推荐使用 Priority 枚举
 PRIORITIES = [p.value for p in Priority]
-
-# --- UI Formatting ---
-LIST_ITEM_SEPERATOR = RText(", ", color=RColor.gray)
-COLON = RText(": ", color=RColor.gray)
-ITEMIZE_PREFIX = [
-    RText("• ", color=RColor.gray),
-    RText("- ", color=RColor.gray),
-    RText("* ", color=RColor.gray),
-    RText("· ", color=RColor.gray)
-]
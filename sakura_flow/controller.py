@@ -1,9 +1,48 @@
+import heapq
+import itertools
 import time
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterable, Iterator, List, Tuple, Callable
 
+from .analytics import BoardAnalytics
+from .assignments import AssignmentIndex
+from .completion import CompletionIndex
+from .deadlines import DeadlineIndex, DEADLINE_FIELDS, TIME_FORMAT, CLEAR_VALUES, parse_deadline
 from .constants import PROP_ALIASES, LIST_PROP_ALIASES
 from .enums import Status, Tier, Priority
+from .fuzzy import FuzzyIndex, FUZZY_FIELDS
+from .hierarchy import SubtaskIndex, parent_chain
 from .manager import TodoManager
+from .views import ViewIndex
+from .metrics import metrics
+
+
+def _enum_rank(enum_cls) -> Callable[[str], int]:
+    """枚举值按定义顺序排名，未知值排在最后"""
+    order = {member.value: i for i, member in enumerate(enum_cls)}
+    return lambda value: order.get(value, len(order))
+
+
+_tier_rank = _enum_rank(Tier)
+_priority_rank = _enum_rank(Priority)
+_status_rank = _enum_rank(Status)
+
+
+def _id_key(tid: str) -> Tuple[str, int, int, str]:
+    """任务 ID 按看板名、再按数值排序，兼容跨看板查询使用的 "<看板>:<ID>" 形式"""
+    board, _, local = tid.rpartition(':')
+    return (board, 0, int(local), '') if local.isdigit() else (board, 1, 0, local)
+
+
+# 可用排序键: 名称 -> (tid, task) -> 可比较的键
+SORT_KEYS: Dict[str, Callable[[str, Dict[str, Any]], Any]] = {
+    'id': lambda tid, task: _id_key(tid),
+    'title': lambda tid, task: task.get('title', '').lower(),
+    'status': lambda tid, task: _status_rank(task.get('status')),
+    'tier': lambda tid, task: _tier_rank(task.get('tier')),
+    'priority': lambda tid, task: _priority_rank(task.get('priority')),
+    'created': lambda tid, task: task.get('created_at', ''),
+    'updated': lambda tid, task: task.get('last_updated', ''),
+}
 
 
 class SearchCache:
@@ -21,21 +60,75 @@ class SearchCache:
     def get(self, key: str) -> Optional[Dict[str, Any]]:
         entry = self.cache.get(key)
         if not entry:
+            metrics.incr("cache_misses")
             return None
         
         if time.time() - entry['timestamp'] > self.ttl:
             del self.cache[key]
+            metrics.incr("cache_misses")
             return None
             
+        metrics.incr("cache_hits")
         return entry
 
 class TodoController:
     def __init__(self, manager: TodoManager):
         self.manager = manager
         self.search_cache = SearchCache()
+        # 派生索引注册表 {名称: 索引对象}，供内存诊断等统一遍历
+        self.indexes: Dict[str, Any] = {}
+
+    def _derived(self, name: str, factory: Callable[[TodoManager], Any]) -> Any:
+        """获取派生索引，首次使用时创建并注册为变更监听者"""
+        index = self.indexes.get(name)
+        if index is None:
+            index = self.indexes[name] = factory(self.manager)
+            self.manager.listeners.append(index)
+        return index
+
+    @property
+    def assignments(self) -> AssignmentIndex:
+        return self._derived("assignments", AssignmentIndex)
+
+    @property
+    def completion(self) -> CompletionIndex:
+        return self._derived("completion", CompletionIndex)
+
+    @property
+    def fuzzy(self) -> FuzzyIndex:
+        return self._derived("fuzzy", FuzzyIndex)
+
+    @property
+    def analytics(self) -> BoardAnalytics:
+        return self._derived("analytics", BoardAnalytics)
+
+    @property
+    def views(self) -> ViewIndex:
+        return self._derived("views", lambda manager: ViewIndex(manager, self.task_matches))
+
+    @property
+    def deadlines(self) -> DeadlineIndex:
+        return self._derived("deadlines", DeadlineIndex)
+
+    @property
+    def subtasks(self) -> SubtaskIndex:
+        return self._derived("subtasks", SubtaskIndex)
+
+    @property
+    def rollups(self) -> Optional[SubtaskIndex]:
+        """
+        用于显示子任务汇总的索引；只读快照中返回 None
+        构建子任务索引需要读取每个任务的 parent，会解码整个看板，只读命令因此不显示汇总
+        """
+        return None if self.manager.read_only else self.subtasks
 
-    def add_task(self, title: str, creator: str) -> str:
-        return self.manager.add_task(title, creator)
+    def add_task(self, title: str, creator: str, parent: Optional[str] = None) -> Optional[str]:
+        """
+        :param parent: 父任务 ID；父任务不存在时不创建任务并返回 None
+        """
+        if parent and parent not in self.manager.data["tasks"]:
+            return None
+        return self.manager.add_task(title, creator, parent)
 
     def get_task(self, task_id: str) -> Optional[Dict[str, Any]]:
         return self.manager.data["tasks"].get(task_id)
@@ -50,6 +143,81 @@ class TodoController:
     def get_archived_tasks(self) -> Dict[str, Dict[str, Any]]:
         return self.search_tasks({'status': 'Done'})
 
+    @staticmethod
+    def _check_exact(field_val: str, target_val: str) -> bool:
+        """精确匹配，支持 ! 取反"""
+        if target_val.startswith('!'):
+            return field_val.lower() != target_val[1:].lower()
+        return field_val.lower() == target_val.lower()
+
+    @staticmethod
+    def _check_contains(field_list: List[str], target_val: str) -> bool:
+        """列表包含匹配，支持 ! 取反"""
+        field_list_lower = [x.lower() for x in field_list]
+        if target_val.startswith('!'):
+            return target_val[1:].lower() not in field_list_lower
+        return target_val.lower() in field_list_lower
+
+    @classmethod
+    def task_matches(cls, task: Dict[str, Any], criteria: Dict[str, str]) -> bool:
+        """判断单个任务是否满足搜索条件（条件格式见 search_tasks）"""
+        # Title (Fuzzy)
+        if 'title' in criteria and criteria['title'].lower() not in task['title'].lower():
+            return False
+        if 'status' in criteria and not cls._check_exact(task['status'], criteria['status']):
+            return False
+        if 'tier' in criteria and not cls._check_exact(task.get('tier', ''), criteria['tier']):
+            return False
+        if 'priority' in criteria and not cls._check_exact(task.get('priority', ''), criteria['priority']):
+            return False
+        if 'creator' in criteria and not cls._check_exact(task.get('creator', ''), criteria['creator']):
+            return False
+        if 'collaborator' in criteria and not cls._check_contains(task.get('collaborators', []), criteria['collaborator']):
+            return False
+        if 'label' in criteria and not cls._check_contains(task.get('labels', []), criteria['label']):
+            return False
+        return True
+
+    def iter_tasks(self, criteria: Dict[str, str],
+                   tasks: Optional[Dict[str, Dict[str, Any]]] = None) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        按存储顺序逐个产出匹配的任务，调用方可随时停止迭代
+        :param tasks: 要查询的任务集合，默认为当前数据（例如传入 tasks_at 回溯出的历史状态）
+        """
+        for tid, task in (self.manager.data["tasks"] if tasks is None else tasks).items():
+            if self.task_matches(task, criteria):
+                yield tid, task
+
+    def select_tasks(self, criteria: Dict[str, str], sort: Optional[str] = None, reverse: bool = False,
+                     offset: int = 0, limit: Optional[int] = None,
+                     tasks: Optional[Dict[str, Dict[str, Any]]] = None) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        带排序与分页的查询
+        未指定排序时按存储顺序流式产出，取满 offset + limit 条后立即停止扫描；
+        指定排序且有 limit 时使用堆只保留前 offset + limit 条，避免对全部结果排序
+        :param sort: SORT_KEYS 中的键
+        """
+        matches = self.iter_tasks(criteria, tasks)
+        stop = offset + limit if limit is not None else None
+
+        if sort is None:
+            if reverse:
+                matches = reversed(list(matches))
+            return itertools.islice(matches, offset, stop)
+
+        key_func = SORT_KEYS[sort]
+
+        def key(item):
+            return key_func(item[0], item[1])
+
+        if stop is None:
+            ordered = sorted(matches, key=key, reverse=reverse)
+        elif reverse:
+            ordered = heapq.nlargest(stop, matches, key=key)
+        else:
+            ordered = heapq.nsmallest(stop, matches, key=key)
+        return itertools.islice(ordered, offset, None)
+
     def search_tasks(self, criteria: Dict[str, str], cache_key: str = None) -> Dict[str, Dict[str, Any]]:
         """
         根据条件搜索任务
@@ -63,59 +231,7 @@ class TodoController:
             'label': 'tag' or '!tag'
         }
         """
-        result = {}
-        for tid, task in self.manager.data["tasks"].items():
-            match = True
-            
-            # Title (Fuzzy)
-            if 'title' in criteria and criteria['title'].lower() not in task['title'].lower():
-                match = False
-            
-            # Helper for exact match with negation
-            def check_exact(field_val, target_val):
-                if target_val.startswith('!'):
-                    return field_val.lower() != target_val[1:].lower()
-                return field_val.lower() == target_val.lower()
-
-            # Helper for list contains with negation
-            def check_contains(field_list, target_val):
-                field_list_lower = [x.lower() for x in field_list]
-                if target_val.startswith('!'):
-                    return target_val[1:].lower() not in field_list_lower
-                return target_val.lower() in field_list_lower
-
-            # Status
-            if match and 'status' in criteria:
-                if not check_exact(task['status'], criteria['status']):
-                    match = False
-
-            # Tier
-            if match and 'tier' in criteria:
-                if not check_exact(task.get('tier', ''), criteria['tier']):
-                    match = False
-
-            # Priority
-            if match and 'priority' in criteria:
-                if not check_exact(task.get('priority', ''), criteria['priority']):
-                    match = False
-
-            # Creator
-            if match and 'creator' in criteria:
-                if not check_exact(task.get('creator', ''), criteria['creator']):
-                    match = False
-
-            # Collaborator
-            if match and 'collaborator' in criteria:
-                if not check_contains(task.get('collaborators', []), criteria['collaborator']):
-                    match = False
-
-            # Label
-            if match and 'label' in criteria:
-                if not check_contains(task.get('labels', []), criteria['label']):
-                    match = False
-
-            if match:
-                result[tid] = task
+        result = dict(self.iter_tasks(criteria))
         
         # Update cache if key provided
         if cache_key:
@@ -125,6 +241,48 @@ class TodoController:
 
         return result
 
+    def fuzzy_search(self, criteria: Dict[str, str],
+                     fields: Optional[Iterable[str]] = None) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, List[str]]]:
+        """
+        容错搜索：fields 中的条件（标题、标签、创建者、协作者）按编辑距离近似匹配，其余条件仍精确匹配
+        :param fields: 近似匹配的字段，默认为条件中所有支持近似匹配且未取反的字段
+        :return: (按匹配程度排序的结果, {字段: "你是不是要找"的候选词})
+        """
+        if fields is None:
+            fields = [f for f in FUZZY_FIELDS if f in criteria and not criteria[f].startswith('!')]
+        fields = [f for f in fields if criteria.get(f)]
+        exact = {k: v for k, v in criteria.items() if k not in fields}
+        if not fields:
+            return dict(self.iter_tasks(exact)), {}
+        ranked, suggestions = self.fuzzy.search(self.iter_tasks(exact), criteria, fields)
+        return dict(ranked), suggestions
+
+    def list_views(self) -> Dict[str, Dict[str, Any]]:
+        return self.manager.data.get("views", {})
+
+    def save_view(self, name: str, query: str, criteria: Dict[str, str], creator: str):
+        self.manager.save_view(name, query, criteria, creator)
+
+    def delete_view(self, name: str) -> bool:
+        return self.manager.delete_view(name)
+
+    def run_view(self, name: str) -> Optional[Dict[str, Dict[str, Any]]]:
+        """已保存视图的结果（由物化结果直接给出，不扫描看板）；视图不存在时返回 None"""
+        return self.views.results(name)
+
+    def report(self, days: int = 7, weeks: int = 4, top: int = 5) -> Dict[str, Any]:
+        """看板统计报告（由增量维护的聚合直接生成，见 BoardAnalytics.report）"""
+        return self.analytics.report(days=days, weeks=weeks, top=top)
+
+    def upcoming_deadlines(self, days: int = 7) -> List[Tuple[str, str]]:
+        """未来 days 天内到期（含已过期）的未完成任务 [(截止时间, 任务ID)]，按截止时间排序"""
+        until = time.strftime(TIME_FORMAT, time.localtime(time.time() + days * 86400))
+        return self.deadlines.upcoming(until)
+
+    def subtask_tree(self, task_id: str, max_depth: Optional[int] = None) -> List[Tuple[int, str]]:
+        """以 task_id 为根的子任务树 [(深度, 任务ID)]，先序排列"""
+        return self.subtasks.tree(task_id, max_depth)
+
     def get_cached_search(self, cache_key: str) -> Optional[Dict[str, Any]]:
         entry = self.search_cache.get(cache_key)
         return entry['results'] if entry else None
@@ -135,6 +293,43 @@ class TodoController:
     def add_note(self, task_id: str, content: str, author: str) -> bool:
         return self.manager.add_note(task_id, content, author)
 
+    def get_archived_notes(self, task_id: str) -> List[Dict[str, Any]]:
+        """按需解压任务的归档笔记，仅在任务确有归档时读取文件"""
+        task = self.get_task(task_id)
+        if not task or not task.get("archived_notes"):
+            return []
+        return self.manager.note_archive.read(task_id)
+
+    def get_task_history(self, task_id: str) -> List[Dict[str, Any]]:
+        return self.manager.history.changes(task_id)
+
+    def task_at(self, task_id: str, as_of: str) -> Optional[Dict[str, Any]]:
+        """回溯任务在 as_of 时刻（"%Y-%m-%d %H:%M:%S"）的状态"""
+        return self.manager.history.state_at(task_id, as_of, self.get_task(task_id))
+
+    def tasks_at(self, as_of: str) -> Dict[str, Dict[str, Any]]:
+        """回溯整个看板在 as_of 时刻的任务集合"""
+        history = self.manager.history
+        ids = dict.fromkeys(list(self.manager.data["tasks"]) + history.task_ids())
+        result = {}
+        for tid in ids:
+            task = history.state_at(tid, as_of, self.get_task(tid))
+            if task is not None:
+                result[tid] = task
+        return result
+
+    def compact_notes(self, max_age_days: Optional[int] = None, keep_latest: Optional[int] = None) -> Dict[str, int]:
+        return self.manager.compact_notes(max_age_days, keep_latest)
+
+    def list_backups(self) -> List[Dict[str, Any]]:
+        return self.manager.backups.list()
+
+    def take_backup(self) -> Optional[str]:
+        return self.manager.take_backup()
+
+    def restore_backup(self, name: str, editor: str) -> bool:
+        return self.manager.restore_backup(name, editor)
+
     def set_property(self, task_id: str, prop_alias: str, value: str, editor: str) -> tuple[bool, Any, Optional[str]]:
         """
         设置属性
@@ -164,6 +359,21 @@ class TodoController:
                 return False, None, 'sakuraflow.msg.invalid_status'
             processed_val = validated
 
+        elif real_prop in DEADLINE_FIELDS:
+            try:
+                processed_val = parse_deadline(value)
+            except ValueError:
+                return False, None, 'sakuraflow.msg.invalid_time'
+
+        elif real_prop == "parent":
+            processed_val = value.strip().lstrip('#')
+            if processed_val.lower() in CLEAR_VALUES:
+                processed_val = ""
+            elif processed_val not in self.manager.data["tasks"]:
+                return False, None, 'sakuraflow.msg.parent_not_found'
+            elif processed_val == task_id or task_id in parent_chain(self.manager.data["tasks"], processed_val):
+                return False, None, 'sakuraflow.msg.parent_cycle'
+
         success = self.manager.update_task(task_id, real_prop, processed_val, editor)
         return success, processed_val, None
 
@@ -194,6 +404,13 @@ class TodoController:
         success = self.manager.remove_item(task_id, real_prop, value, editor)
         return success, None
 
+    def import_tasks(self, rows: Iterable[Dict[str, Any]], id_remap: bool = False) -> tuple[int, int]:
+        """
+        批量导入任务（单个事务）
+        Returns: (imported, skipped)
+        """
+        return self.manager.import_tasks(rows, id_remap)
+
     def set_default_tier(self, tier_val: str) -> bool:
         validated = Tier.validate(tier_val)
         if validated:
@@ -0,0 +1,277 @@
+import json
+import os
+import socket
+import threading
+from collections import deque
+from typing import Dict, Any, Optional, Deque, Tuple, Callable
+
+from .controller import TodoController
+from .enums import Status
+from .manager import TodoManager
+
+# 可通过协调者远程执行的写操作，读操作始终使用本地缓存
+REMOTE_METHODS = ("add_task", "update_status", "add_note", "set_property", "append_list_property",
+                  "remove_list_property", "set_default_tier", "import_tasks", "compact_notes",
+                  "take_backup", "restore_backup", "save_view", "delete_view")
+
+
+def encode_call(method: str, args: tuple) -> list:
+    """将调用参数转换为可 JSON 序列化的形式"""
+    args = list(args)
+    if method == "update_status":
+        args[1] = args[1].value
+    elif method == "import_tasks":
+        args[0] = list(args[0])
+    return args
+
+
+def decode_call(method: str, args: list) -> list:
+    if method == "update_status":
+        args[1] = Status(args[1])
+    return args
+
+
+class CoordinatorCallError(RuntimeError):
+    """请求已发给协调者但没有收到结果：协调者可能已经提交，不能在本地重新执行"""
+
+
+class CoordinatorClient:
+    """
+    连接到协调者（常驻进程）的客户端
+    写操作通过套接字交给协调者执行；另开一条订阅连接接收变更通知，
+    通知先在后台线程中排队，由调用方线程在访问看板时应用到本地缓存，避免与正在进行的遍历冲突
+    协调者不可用时 connected 变为 False，调用方应回退到直接读写文件
+    """
+    def __init__(self, socket_path: str, timeout: float = 10.0, logger: Optional[Callable[[str], None]] = None):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self.logger = logger
+        self.connected = False
+        # 每个看板待应用的事件与已收到的最大序号
+        self._events: Dict[str, Deque[Dict[str, Any]]] = {}
+        self._received: Dict[str, int] = {}
+        self._cond = threading.Condition()
+        # 本进程已加载的看板，只为这些看板排队通知
+        self._tracked = set()
+        self._sock: Optional[socket.socket] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def connect(self) -> bool:
+        """建立订阅连接；协调者不存在时返回 False"""
+        if not hasattr(socket, "AF_UNIX") or not os.path.exists(self.socket_path):
+            return False
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(self.socket_path)
+            sock.sendall(b'{"subscribe": true}\n')
+            reader = sock.makefile('r', encoding='utf-8')
+            hello = json.loads(reader.readline() or "null")
+        except (OSError, ValueError):
+            sock.close()
+            return False
+        if not isinstance(hello, dict) or hello.get("event") != "hello":
+            sock.close()
+            return False
+        with self._cond:
+            self._received.update(hello.get("seq", {}))
+        self._sock = sock
+        self.connected = True
+        self._thread = threading.Thread(target=self._listen, args=(sock, reader), name="SakuraFlow-Subscriber",
+                                        daemon=True)
+        self._thread.start()
+        return True
+
+    def reconnect(self) -> bool:
+        """
+        订阅连接断开后重新连接（例如协调者重启）
+        断开期间错过的提交无法补发：每个已加载的看板在下次访问时先从文件刷新，再应用新连接上收到的通知
+        """
+        self.close()
+        if not self.connect():
+            return False
+        if self.logger is not None:
+            self.logger(f"Reconnected to the coordinator at {self.socket_path}")
+        with self._cond:
+            for board in self._tracked:
+                self._events.setdefault(board, deque()).appendleft({"event": "refresh"})
+        return True
+
+    def close(self):
+        self.connected = False
+        if self._sock is not None:
+            try:
+                self._sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self._sock.close()
+            self._sock = None
+
+    def _listen(self, sock: socket.socket, reader):
+        try:
+            for line in reader:
+                event = json.loads(line)
+                board = event.get("board")
+                with self._cond:
+                    if board in self._tracked:
+                        self._events.setdefault(board, deque()).append(event)
+                    self._received[board] = max(self._received.get(board, 0), event.get("seq", 0))
+                    self._cond.notify_all()
+        except (OSError, ValueError):
+            pass
+        with self._cond:
+            # 已被 close 或 reconnect 替换的旧连接退出时不影响当前连接的状态
+            if self._sock is sock:
+                if self.connected and self.logger is not None:
+                    self.logger("Lost connection to the coordinator, falling back to direct file access")
+                self.connected = False
+            self._cond.notify_all()
+
+    def call(self, board: str, method: str, args: tuple) -> Tuple[Any, int]:
+        """
+        在协调者上执行一次写操作
+        :return: (返回值, 该操作提交后的看板序号)
+        :raises OSError: 无法连接协调者，请求尚未发出
+        :raises CoordinatorCallError: 请求发出后连接中断或超时，结果未知
+        :raises ValueError: 协调者上的参数校验失败（与本地执行时抛出的异常一致）
+        :raises RuntimeError: 协调者执行失败
+        """
+        request = {"call": method, "board": board, "args": encode_call(method, args)}
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        with sock:
+            sock.connect(self.socket_path)
+            try:
+                sock.sendall((json.dumps(request, ensure_ascii=False) + "\n").encode('utf-8'))
+                with sock.makefile('r', encoding='utf-8') as reader:
+                    line = reader.readline()
+            except OSError as e:
+                raise CoordinatorCallError(f"No reply from the coordinator for {method}: {e}") from e
+        if not line:
+            raise CoordinatorCallError(f"Coordinator closed the connection before replying to {method}")
+        response = json.loads(line)
+        if "error" in response:
+            if response.get("kind") == "value":
+                raise ValueError(response["error"])
+            raise RuntimeError(response["error"])
+        result = response.get("result")
+        return tuple(result) if isinstance(result, list) else result, response.get("seq", 0)
+
+    def wait_for(self, board: str, seq: int) -> bool:
+        """等待订阅连接收到序号 seq 的通知，保证写后立即读能看到自己的修改"""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._received.get(board, 0) >= seq or not self.connected,
+                                       timeout=self.timeout) and self.connected
+
+    def track(self, board: str):
+        """
+        在加载看板之前调用：此后该看板的通知才会排队
+        加载读到的文件已包含之前的所有提交，之后到达的通知按顺序重复应用也是幂等的
+        """
+        with self._cond:
+            self._tracked.add(board)
+            self._events.pop(board, None)
+
+    def apply_pending(self, board: str, controller: TodoController):
+        """在调用方线程中将排队的变更通知应用到看板的本地缓存"""
+        with self._cond:
+            events = self._events.pop(board, None)
+        manager = controller.manager
+        if not self.connected:
+            # 已回退到直接读写文件，以文件为准（未变化时只需一次 stat）
+            manager.refresh()
+        for event in events or ():
+            if event["event"] == "reload":
+                manager.load()
+                continue
+            if event["event"] == "refresh":
+                # 重新连接后，以文件为准补上断开期间错过的提交
+                manager.refresh()
+                continue
+            tasks = manager.data["tasks"]
+            changes = []
+            for tid, task in event["tasks"].items():
+                before = tasks.pop(tid, None) if task is None else tasks.get(tid)
+                if task is not None:
+                    tasks[tid] = task
+                changes.append((tid, before, task, (task or {}).get("last_editor", "")))
+            manager.data["next_id"] = event["next_id"]
+            manager.data["default_tier"] = event["default_tier"]
+            manager.data["views"] = event.get("views", {})
+            # 派生索引随之更新；历史记录由协调者写入，不监听 on_sync
+            manager._notify("on_sync", changes)
+
+
+class CoordinatedController(TodoController):
+    """
+    协调者模式下的控制器：读取使用由变更通知维护的本地缓存，写操作交给协调者执行
+    协调者不可用时直接在本进程中执行（即原有的文件锁模式）
+    """
+    def __init__(self, manager: TodoManager, client: CoordinatorClient, board: str):
+        super().__init__(manager)
+        self.client = client
+        self.board = board
+
+    def _remote(self, method: str, *args):
+        # 订阅连接已断开时先尝试重新连接一次；连接协调者失败（请求尚未发出，重试不会重复执行）时重新连接后重试一次，
+        # 仍失败则在本进程中执行。请求发出后失败时协调者可能已经提交，此时以文件为准重新加载并抛出异常，不在本地重复执行
+        if not self.client.connected:
+            self.client.reconnect()
+        for retry in (True, False):
+            if not self.client.connected:
+                break
+            try:
+                result, seq = self.client.call(self.board, method, args)
+            except CoordinatorCallError:
+                self.client.connected = False
+                self.manager.load()
+                raise
+            except OSError:
+                self.client.connected = False
+                if retry and self.client.reconnect():
+                    continue
+                break
+            if not self.client.wait_for(self.board, seq):
+                self.manager.load()
+            self.client.apply_pending(self.board, self)
+            return result
+        return getattr(TodoController, method)(self, *args)
+
+    def add_task(self, title, creator, parent=None):
+        return self._remote("add_task", title, creator, parent)
+
+    def update_status(self, task_id, status, editor):
+        return self._remote("update_status", task_id, status, editor)
+
+    def add_note(self, task_id, content, author):
+        return self._remote("add_note", task_id, content, author)
+
+    def set_property(self, task_id, prop_alias, value, editor):
+        return self._remote("set_property", task_id, prop_alias, value, editor)
+
+    def append_list_property(self, task_id, list_alias, value, editor):
+        return self._remote("append_list_property", task_id, list_alias, value, editor)
+
+    def remove_list_property(self, task_id, list_alias, value, editor):
+        return self._remote("remove_list_property", task_id, list_alias, value, editor)
+
+    def set_default_tier(self, tier_val):
+        return self._remote("set_default_tier", tier_val)
+
+    def import_tasks(self, rows, id_remap=False):
+        # 先物化为列表，远程调用失败回退到本地时仍可再次读取
+        return self._remote("import_tasks", list(rows), id_remap)
+
+    def compact_notes(self, max_age_days=None, keep_latest=None):
+        return self._remote("compact_notes", max_age_days, keep_latest)
+
+    def take_backup(self):
+        return self._remote("take_backup")
+
+    def restore_backup(self, name, editor):
+        return self._remote("restore_backup", name, editor)
+
+    def save_view(self, name, query, criteria, creator):
+        return self._remote("save_view", name, query, criteria, creator)
+
+    def delete_view(self, name):
+        return self._remote("delete_view", name)
@@ -0,0 +1,287 @@
+import io
+import json
+import os
+import queue
+import socket
+import socketserver
+import threading
+from typing import Optional, List, TextIO, Dict, Any, Callable
+
+from .cli_entry import (register_cli_commands, handle_cli_command, CommandArgumentParser, CommandArgumentError,
+                        LOCAL_COMMANDS)
+from .boards import BoardRegistry, ALL_BOARDS, DEFAULT_BOARD
+from .controller import TodoController
+from .coordinator import REMOTE_METHODS, decode_call
+
+SOCKET_NAME = "sakura_flow.sock"
+# 启动守护进程（协调者）的 CLI 命令
+SERVE_COMMANDS = ("serve", "coordinator")
+
+
+def is_supported() -> bool:
+    return hasattr(socket, "AF_UNIX")
+
+
+def default_socket_path(data_path: str) -> str:
+    """守护进程套接字与 tasks.json 位于同一目录，插件与 CLI 据此找到彼此"""
+    return os.path.join(os.path.dirname(os.path.abspath(data_path)), SOCKET_NAME)
+
+
+def forward(socket_path: str, argv: List[str], out: TextIO, timeout: float = 30.0) -> bool:
+    """
+    尝试将 CLI 调用转发给正在运行的守护进程
+    协议：客户端发送一行 JSON 请求 {"argv": [...]}，服务端以 UTF-8 文本流回输出并关闭连接
+    :return: 守护进程不可用时返回 False，调用方应回退到直接读写文件
+    """
+    if not is_supported() or not os.path.exists(socket_path):
+        return False
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(socket_path)
+    except OSError:
+        sock.close()
+        return False
+
+    with sock:
+        sock.sendall((json.dumps({"argv": argv}) + "\n").encode('utf-8'))
+        with sock.makefile('r', encoding='utf-8', newline='') as reader:
+            for chunk in iter(lambda: reader.read(8192), ''):
+                out.write(chunk)
+    out.flush()
+    return True
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    server: '_UnixServer'
+
+    def handle(self):
+        """
+        三种请求：
+        {"argv": [...]}  执行一条 CLI 命令，以文本流回输出
+        {"call": 方法, "board": 看板, "args": [...]}  协调者模式下的写操作，回复一行 JSON {"result", "seq"} 或 {"error"}
+        {"subscribe": true}  订阅变更通知，连接保持打开，每行一条 JSON 事件
+        """
+        line = self.rfile.readline()
+        out = _SocketWriter(self.wfile)
+        todo_daemon = self.server.todo_daemon
+        request = None
+        try:
+            request = json.loads(line.decode('utf-8'))
+            if request.get("subscribe"):
+                todo_daemon.stream_events(out)
+                return
+            if "call" in request:
+                out.write(json.dumps(todo_daemon.call(request), ensure_ascii=False) + "\n")
+            else:
+                todo_daemon.execute(request.get("argv", []), out)
+        except (BrokenPipeError, ConnectionResetError):
+            return
+        except Exception as e:
+            if isinstance(request, dict) and "call" in request:
+                # 校验失败（ValueError）单独标记，客户端据此重新抛出 ValueError，与本地执行时一致
+                reply = {"error": str(e), "kind": "value" if isinstance(e, ValueError) else "internal"}
+                out.write(json.dumps(reply, ensure_ascii=False) + "\n")
+            else:
+                out.write(f"Error: {e}\n")
+        out.flush()
+
+
+class _SocketWriter:
+    """将文本输出编码后写入套接字，供 handle_cli_command 的 print(file=...) 使用"""
+    def __init__(self, wfile):
+        self.wfile = wfile
+
+    def write(self, text: str) -> int:
+        self.wfile.write(text.encode('utf-8'))
+        return len(text)
+
+    def flush(self):
+        self.wfile.flush()
+
+
+class _BoardFeed:
+    """挂在看板 TodoManager 上的监听者，将提交与重新加载转发为变更通知"""
+    def __init__(self, todo_daemon: 'TodoDaemon', board: str, controller: TodoController):
+        self.todo_daemon = todo_daemon
+        self.board = board
+        self.manager = controller.manager
+
+    def on_commit(self, changes):
+        self.todo_daemon.publish(self.board, {
+            "event": "commit",
+            "tasks": {tid: after for tid, _, after, _ in changes},
+            "next_id": self.manager.data.get("next_id"),
+            "default_tier": self.manager.data.get("default_tier"),
+            "views": self.manager.data.get("views", {}),
+        })
+
+    def on_reload(self):
+        self.todo_daemon.publish(self.board, {"event": "reload"})
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    todo_daemon: 'TodoDaemon'
+
+
+class TodoDaemon:
+    """
+    常驻的看板注册表，通过 Unix 域套接字为 CLI 调用提供服务
+    既可由 `__main__.py serve` 独立运行，也可由 MCDR 插件托管以共享插件的内存状态
+    """
+    def __init__(self, boards: BoardRegistry, socket_path: str,
+                 run_in_host: Optional[Callable[[Callable[[], Any]], Any]] = None):
+        """
+        :param run_in_host: 由插件托管时，插件指令在 MCDR 的任务执行线程中读写同一个看板注册表；
+                            run_in_host(fn) 在该线程中执行 fn 并返回其结果，守护进程的命令与调用都经由它执行，
+                            与插件指令（包括其中的事务与重新加载）串行；独立运行时为 None
+        """
+        self.boards = boards
+        self.socket_path = socket_path
+        self.run_in_host = run_in_host
+        self.parser = CommandArgumentParser(prog="sakura_flow")
+        register_cli_commands(self.parser)
+        # 同一看板的命令串行执行，避免多个连接同时修改内存中的数据；不同看板互不阻塞
+        self._exec_locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        self._server: Optional[_UnixServer] = None
+        self._thread: Optional[threading.Thread] = None
+        # 变更通知：每个订阅连接一个队列，每个看板一个递增序号
+        self._subscribers: List[queue.Queue] = []
+        self._seq: Dict[str, int] = {}
+        self._hub_lock = threading.Lock()
+
+    def execute(self, argv: List[str], out: TextIO):
+        if self.run_in_host is None:
+            self._execute(argv, out)
+            return
+        # 在宿主线程中执行时先缓冲输出，不让较慢的客户端阻塞宿主线程
+        buffer = io.StringIO()
+        self.run_in_host(lambda: self._execute(argv, buffer))
+        out.write(buffer.getvalue())
+
+    def _execute(self, argv: List[str], out: TextIO):
+        try:
+            args = self.parser.parse_args(argv)
+        except CommandArgumentError as e:
+            out.write(f"Error: {e}\n")
+            return
+        if args.command in LOCAL_COMMANDS:
+            out.write(f"Error: '{args.command}' cannot be forwarded to the daemon\n")
+            return
+        if args.board == ALL_BOARDS:
+            # 跨看板查询只读，逐个看板刷新后执行
+            for name in self.boards.names():
+                with self._exec_lock(name):
+                    self.boards.get(name).manager.refresh()
+            handle_cli_command(args, self.boards.get(), out, self.boards)
+            return
+        try:
+            controller = self.boards.get(args.board)
+        except ValueError as e:
+            out.write(f"Error: {e}\n")
+            return
+        with self._exec_lock(args.board or DEFAULT_BOARD):
+            # 其他进程（例如未托管套接字的插件）可能修改了文件，读取前按需刷新
+            controller.manager.refresh()
+            handle_cli_command(args, controller, out, self.boards)
+
+    def _exec_lock(self, board: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._exec_locks.setdefault(board, threading.Lock())
+
+    def call(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """执行协调者客户端转发的写操作，返回结果及该看板当前的通知序号"""
+        if self.run_in_host is not None:
+            return self.run_in_host(lambda: self._call(request))
+        return self._call(request)
+
+    def _call(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        method, board = request["call"], request.get("board") or DEFAULT_BOARD
+        if method not in REMOTE_METHODS:
+            return {"error": f"Unsupported call '{method}'"}
+        controller = self.boards.get(board)
+        with self._exec_lock(board):
+            controller.manager.refresh()
+            result = getattr(controller, method)(*decode_call(method, list(request.get("args", []))))
+            with self._hub_lock:
+                seq = self._seq.get(board, 0)
+        return {"result": result, "seq": seq}
+
+    def _watch_board(self, name: str, controller: TodoController):
+        controller.manager.listeners.append(_BoardFeed(self, name, controller))
+
+    def publish(self, board: str, event: Dict[str, Any]):
+        """向所有订阅者广播一条变更通知；在提交事务的线程中调用，序号即提交顺序"""
+        with self._hub_lock:
+            self._seq[board] = self._seq.get(board, 0) + 1
+            line = json.dumps({**event, "board": board, "seq": self._seq[board]}, ensure_ascii=False) + "\n"
+            for subscriber in self._subscribers:
+                subscriber.put(line)
+
+    def stream_events(self, out: '_SocketWriter'):
+        """在订阅连接上持续写出变更通知，直到连接断开或守护进程停止"""
+        subscriber: queue.Queue = queue.Queue()
+        with self._hub_lock:
+            self._subscribers.append(subscriber)
+            hello = json.dumps({"event": "hello", "seq": dict(self._seq)}) + "\n"
+        try:
+            out.write(hello)
+            out.flush()
+            for line in iter(subscriber.get, None):
+                out.write(line)
+                out.flush()
+        finally:
+            with self._hub_lock:
+                self._subscribers.remove(subscriber)
+
+    def _claim_socket(self):
+        """清理崩溃遗留的套接字文件；若已有守护进程在监听则报错"""
+        if not os.path.exists(self.socket_path):
+            return
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.socket_path)
+        except OSError:
+            os.remove(self.socket_path)
+        else:
+            raise RuntimeError(f"A daemon is already listening on {self.socket_path}")
+        finally:
+            probe.close()
+
+    def start(self):
+        """绑定套接字并在后台线程中提供服务"""
+        os.makedirs(os.path.dirname(self.socket_path), exist_ok=True)
+        self._claim_socket()
+        for name, controller in self.boards.loaded().items():
+            self._watch_board(name, controller)
+        self.boards.load_hooks.append(self._watch_board)
+        self._server = _UnixServer(self.socket_path, _RequestHandler)
+        self._server.todo_daemon = self
+        self._thread = threading.Thread(target=self._server.serve_forever, name="SakuraFlow-Daemon", daemon=True)
+        self._thread.start()
+
+    def serve_forever(self):
+        """前台运行，直到收到 KeyboardInterrupt"""
+        self.start()
+        try:
+            self._thread.join()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def stop(self):
+        if self._server is None:
+            return
+        with self._hub_lock:
+            for subscriber in self._subscribers:
+                subscriber.put(None)
+        self._server.shutdown()
+        self._server.server_close()
+        self._server = None
+        try:
+            os.remove(self.socket_path)
+        except OSError:
+            pass
@@ -0,0 +1,248 @@
+import heapq
+import re
+import threading
+import time
+from typing import Dict, Any, Callable, List, Optional, Tuple
+
+from .enums import Status
+from .history import normalize_timestamp
+from .manager import TodoManager
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+_DONE = Status.DONE.value
+
+# 带时间的任务属性：due 为截止时间，remind 为提前提醒的时间
+DEADLINE_FIELDS = ("due", "remind")
+# 清除 due/remind 的取值
+CLEAR_VALUES = {"", "-", "none", "clear"}
+_RELATIVE = re.compile(r"^\+(\d+)([mhdw])$")
+_UNIT_SECONDS = {"m": 60, "h": 3600, "d": 86400, "w": 7 * 86400}
+
+
+def parse_deadline(value: str, now: Optional[float] = None) -> str:
+    """
+    解析 due/remind 的取值，返回 "%Y-%m-%d %H:%M:%S"；清除时返回空字符串
+    支持 YYYY-MM-DD[ HH:MM[:SS]]（只给出日期时为当天结束）与相对当前的 +<数字><m|h|d|w>
+    :raises ValueError: 无法解析
+    """
+    value = value.strip()
+    if value.lower() in CLEAR_VALUES:
+        return ""
+    match = _RELATIVE.match(value.lower())
+    if match:
+        seconds = int(match.group(1)) * _UNIT_SECONDS[match.group(2)]
+        return time.strftime(TIME_FORMAT, time.localtime((time.time() if now is None else now) + seconds))
+    return normalize_timestamp(value)
+
+
+def to_epoch(timestamp: str) -> float:
+    return time.mktime(time.strptime(timestamp, TIME_FORMAT))
+
+
+class DeadlineIndex:
+    """
+    截止时间索引：未完成任务的 due 与 remind 时间，保存在两个最小堆中
+      _deadlines [(截止时间, 任务ID)] 供 !!todo due 按时间顺序列出（含已过期的）
+      _pending [(时间, 类型, 任务ID)] 为晚于 watermark、尚未通知的事件，由 ReminderScheduler 依次弹出
+    两个堆都采用惰性删除：任务变更时只压入新条目，弹出或遍历时跳过与 _entries 不一致的旧条目，旧条目过多时整体重建
+    索引在加载看板的线程中构建，重新加载数据文件后立即重建，之后随事务提交增量更新；调度线程只读取堆顶
+    """
+    def __init__(self, manager: TodoManager):
+        self.manager = manager
+        self._lock = threading.Lock()
+        # {任务ID: (due, remind)}，只包含至少设置了一项的未完成任务；None 表示尚未构建
+        self._entries: Optional[Dict[str, Tuple[str, str]]] = None
+        self._deadlines: List[Tuple[str, str]] = []
+        self._pending: List[Tuple[str, str, str]] = []
+        self._last_fired: Optional[Tuple[str, str, str]] = None
+        # 不晚于该时刻的事件视为已经通知过；索引创建前就已过去的时间不补发提醒
+        self.watermark = time.strftime(TIME_FORMAT)
+        # 索引变化时调用（在提交事务的线程中），用于唤醒调度线程
+        self.on_change: Optional[Callable[[], None]] = None
+
+    @staticmethod
+    def _times(task: Optional[Dict[str, Any]]) -> Tuple[str, str]:
+        if task is None or task.get("status") == _DONE:
+            return "", ""
+        return task.get("due") or "", task.get("remind") or ""
+
+    def _rebuild(self):
+        self._entries = {}
+        for tid, task in self.manager.data["tasks"].items():
+            times = self._times(task)
+            if times != ("", ""):
+                self._entries[tid] = times
+        self._rebuild_heaps()
+
+    def _rebuild_heaps(self):
+        self._deadlines = [(due, tid) for tid, (due, _) in self._entries.items() if due]
+        self._pending = [(at, kind, tid) for tid, times in self._entries.items()
+                         for kind, at in zip(DEADLINE_FIELDS, times) if at > self.watermark]
+        heapq.heapify(self._deadlines)
+        heapq.heapify(self._pending)
+
+    def _index(self, tid: str, task: Optional[Dict[str, Any]]) -> bool:
+        old, new = self._entries.get(tid, ("", "")), self._times(task)
+        if new == old:
+            return False
+        if new == ("", ""):
+            del self._entries[tid]
+        else:
+            self._entries[tid] = new
+        if new[0] and new[0] != old[0]:
+            heapq.heappush(self._deadlines, (new[0], tid))
+        for kind, at, before in zip(DEADLINE_FIELDS, new, old):
+            if at != before and at > self.watermark:
+                heapq.heappush(self._pending, (at, kind, tid))
+        return True
+
+    def _is_current(self, at: str, kind: str, tid: str) -> bool:
+        entry = self._entries.get(tid)
+        return entry is not None and entry[DEADLINE_FIELDS.index(kind)] == at
+
+    def _prune_pending(self):
+        """丢弃堆顶已失效或刚通知过的重复条目"""
+        while self._pending and (self._pending[0] == self._last_fired or not self._is_current(*self._pending[0])):
+            heapq.heappop(self._pending)
+
+    def _changed(self):
+        if self.on_change is not None:
+            self.on_change()
+
+    def ensure(self) -> 'DeadlineIndex':
+        with self._lock:
+            if self._entries is None:
+                self._rebuild()
+        return self
+
+    # --- 监听者接口 ---
+
+    def on_commit(self, changes):
+        with self._lock:
+            if self._entries is None:
+                return
+            changed = False
+            for tid, _, after, _ in changes:
+                changed = self._index(tid, after) or changed
+            if len(self._deadlines) + len(self._pending) > 4 * len(self._entries) + 64:
+                self._rebuild_heaps()
+        if changed:
+            self._changed()
+
+    on_sync = on_commit
+
+    def on_reload(self):
+        with self._lock:
+            if self._entries is None:
+                return
+            self._rebuild()
+        self._changed()
+
+    # --- 查询 ---
+
+    def upcoming(self, until: str) -> List[Tuple[str, str]]:
+        """
+        截止时间不晚于 until 的未完成任务 [(截止时间, 任务ID)]，按时间排序，包括已经过期的
+        沿堆的结构按序遍历，只访问结果本身及其子节点，不扫描全部任务
+        """
+        self.ensure()
+        result, seen = [], set()
+        with self._lock:
+            heap = self._deadlines
+            frontier = [(heap[0], 0)] if heap else []
+            while frontier:
+                (due, tid), i = heapq.heappop(frontier)
+                if due > until:
+                    break
+                if tid not in seen and self._entries.get(tid, ("", ""))[0] == due:
+                    seen.add(tid)
+                    result.append((due, tid))
+                for child in (2 * i + 1, 2 * i + 2):
+                    if child < len(heap):
+                        heapq.heappush(frontier, (heap[child], child))
+        return result
+
+    def next_pending(self) -> Optional[str]:
+        """下一个待通知事件的时间；索引尚未构建或没有待通知事件时返回 None"""
+        with self._lock:
+            if self._entries is None:
+                return None
+            self._prune_pending()
+            return self._pending[0][0] if self._pending else None
+
+    def pop_due(self, now: str) -> List[Tuple[str, str, str]]:
+        """弹出时间不晚于 now 的待通知事件 [(时间, 类型, 任务ID)]，并将 watermark 推进到 now"""
+        fired = []
+        with self._lock:
+            if self._entries is None:
+                return fired
+            self._prune_pending()
+            while self._pending and self._pending[0][0] <= now:
+                self._last_fired = heapq.heappop(self._pending)
+                fired.append(self._last_fired)
+                self._prune_pending()
+            self.watermark = max(self.watermark, now)
+        return fired
+
+
+class ReminderScheduler:
+    """
+    截止提醒：后台线程睡眠到各看板中最早的待通知事件，到时调用 notify，而不是定时扫描全部任务
+    看板的截止时间索引变化（编辑、同步或重新加载）时唤醒线程，重新计算下一次唤醒的时间
+    """
+    # 最长睡眠时间（秒），系统时钟被调整后也能在此时间内恢复
+    MAX_SLEEP = 3600.0
+
+    def __init__(self, notify: Callable[[str, Any, str, str], None], logger: Optional[Callable[[str], None]] = None):
+        """
+        :param notify: notify(看板名, 控制器, 任务ID, 类型)，类型为 "due" 或 "remind"
+        """
+        self.notify = notify
+        self.logger = logger
+        self._boards: Dict[str, Any] = {}
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def watch(self, name: str, controller):
+        """为看板调度提醒（看板加载时调用）；索引在调用者的线程中构建"""
+        index = controller.deadlines.ensure()
+        index.on_change = self._wake.set
+        self._boards[name] = controller
+        self._wake.set()
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="SakuraFlow-Reminders", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.clear()
+            self._wake.wait(self.tick())
+
+    def tick(self, now: Optional[float] = None) -> float:
+        """发出所有已到时的提醒，返回距离下一个待通知事件的秒数"""
+        now = time.time() if now is None else now
+        stamp = time.strftime(TIME_FORMAT, time.localtime(now))
+        next_at = None
+        for name, controller in list(self._boards.items()):
+            index = controller.deadlines
+            for _, kind, tid in index.pop_due(stamp):
+                try:
+                    self.notify(name, controller, tid, kind)
+                except Exception as e:
+                    if self.logger is not None:
+                        self.logger(f"Failed to send {kind} reminder for task {tid} on board {name}: {e}")
+            pending = index.next_pending()
+            if pending is not None and (next_at is None or pending < next_at):
+                next_at = pending
+        if next_at is None:
+            return self.MAX_SLEEP
+        return min(max(to_epoch(next_at) - now, 0.0), self.MAX_SLEEP)
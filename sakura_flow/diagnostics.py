@@ -0,0 +1,148 @@
+import sys
+import threading
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional, Set
+
+from .metrics import metrics
+
+LIST_FIELDS = ("labels", "collaborators", "dependencies")
+
+
+def deep_sizeof(obj: Any, seen: Optional[Set[int]] = None) -> int:
+    """
+    递归估算对象占用的内存（sys.getsizeof 之和）
+    通过 seen 共享已统计的对象，多个分区之间引用同一对象时只计一次
+    """
+    if seen is None:
+        seen = set()
+    total = 0
+    stack = [obj]
+    while stack:
+        current = stack.pop()
+        oid = id(current)
+        if oid in seen:
+            continue
+        seen.add(oid)
+        total += sys.getsizeof(current)
+        if isinstance(current, dict):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset)):
+            stack.extend(current)
+        elif hasattr(current, '__dict__'):
+            stack.append(vars(current))
+        elif hasattr(current, '__slots__'):
+            stack.extend(getattr(current, name) for name in current.__slots__ if hasattr(current, name))
+    return total
+
+
+def memory_report(controller) -> Dict[str, Any]:
+    """
+    统计 manager.data 及派生结构的内存占用，按 tasks / notes / list_properties / search_cache / indexes 分区
+    任务本体先统计笔记与列表属性，再统计其余字段，缓存与索引只计入其自身独有的对象
+    """
+    start = time.perf_counter()
+    data = controller.manager.data
+    tasks = data.get("tasks", {})
+    seen: Set[int] = set()
+
+    notes = sum(deep_sizeof(task.get("notes", []), seen) for task in tasks.values())
+    list_props = sum(deep_sizeof(task.get(field, []), seen) for task in tasks.values() for field in LIST_FIELDS)
+    task_bytes = deep_sizeof(data, seen)
+    # 缓存与索引经 .manager 等反向引用可以到达看板与其他监听者：预先标记这些对象，每个分区只计入其自身的结构
+    manager = controller.manager
+    seen.update(map(id, (controller, manager, *manager.listeners, *controller.indexes.values())))
+    cache = deep_sizeof(controller.search_cache, seen)
+    indexes = {}
+    for name, index in controller.indexes.items():
+        seen.discard(id(index))
+        indexes[name] = deep_sizeof(index, seen)
+
+    sections = {
+        "tasks": task_bytes,
+        "notes": notes,
+        "list_properties": list_props,
+        "search_cache": cache,
+        "indexes": sum(indexes.values()),
+    }
+    report = {
+        "task_count": len(tasks),
+        "note_count": sum(len(task.get("notes", [])) for task in tasks.values()),
+        "sections": sections,
+        "indexes": indexes,
+        "total": sum(sections.values()),
+        "walk_ms": round((time.perf_counter() - start) * 1000, 1),
+        "tracemalloc": None,
+    }
+    if tracemalloc.is_tracing():
+        current, peak = tracemalloc.get_traced_memory()
+        report["tracemalloc"] = {"current": current, "peak": peak}
+    report["trace"] = allocation_sampler.status()
+    return report
+
+
+class AllocationSampler:
+    """
+    在接下来的 N 条指令期间启用 tracemalloc，窗口结束时记录新增分配最多的代码位置
+    仅在诊断时临时开启，平时不产生任何开销
+    """
+    def __init__(self, frames: int = 5, top: int = 10):
+        self.frames = frames
+        self.top = top
+        self._remaining = 0
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+        self._started_tracing = False
+        self._result: Optional[List[Dict[str, Any]]] = None
+        self._lock = threading.Lock()
+        metrics.add_finish_hook(self._on_command_finished)
+
+    @property
+    def active(self) -> bool:
+        return self._remaining > 0
+
+    def start(self, commands: int):
+        """开始一个采样窗口，覆盖接下来的 commands 条指令"""
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(self.frames)
+                self._started_tracing = True
+            self._baseline = tracemalloc.take_snapshot()
+            self._remaining = max(1, commands)
+            self._result = None
+
+    def stop(self):
+        with self._lock:
+            self._finish()
+
+    def _on_command_finished(self, name: str):
+        if not self._remaining or name.endswith("debug"):
+            return
+        with self._lock:
+            self._remaining -= 1
+            if self._remaining <= 0:
+                self._finish()
+
+    def _finish(self):
+        if self._baseline is None:
+            return
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+        ])
+        stats = snapshot.compare_to(self._baseline, 'lineno')
+        self._result = [
+            {"site": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+             "size_diff": stat.size_diff, "count_diff": stat.count_diff}
+            for stat in stats[:self.top]
+        ]
+        self._baseline = None
+        self._remaining = 0
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def status(self) -> Dict[str, Any]:
+        return {"active": self.active, "remaining": self._remaining, "top": self._result}
+
+
+allocation_sampler = AllocationSampler()
@@ -1,45 +1,62 @@
 from enum import Enum
-from typing import List, Optional
+from typing import List, Optional, TYPE_CHECKING
 
-from mcdreforged.api.all import RColor, ServerInterface, RText
+if TYPE_CHECKING:
+    from mcdreforged.api.all import RColor, ServerInterface, RText
+
+
+def resolve_color(color_name: str) -> 'RColor':
+    """
+    将颜色名解析为 RColor
+    MCDR 仅在真正需要渲染富文本时才会被导入，CLI 路径因此只依赖标准库
+    """
+    from mcdreforged.api.all import RColor
+    return getattr(RColor, color_name, RColor.white)
 
 
 class BaseProperty(Enum):
     """
     支持翻译、颜色和别名的富属性枚举基类
+    颜色以 RColor 属性名保存，访问 color 时才解析为 RColor
     """
 
-    def __new__(cls, value: str, color: RColor, aliases: List[str] = None, trans_key: Optional[str] = None):
+    def __new__(cls, value: str, color_name: str, aliases: List[str] = None, trans_key: Optional[str] = None):
         obj = object.__new__(cls)
         obj._value_ = value
-        obj.color = color
+        obj.color_name = color_name
         obj.aliases = aliases if aliases else []
         obj.trans_key = trans_key
         return obj
 
-    def get_display_name(self, server: Optional[ServerInterface] = None) -> str:
+    @property
+    def color(self) -> 'RColor':
+        return resolve_color(self.color_name)
+
+    def get_display_name(self, server: Optional['ServerInterface'] = None) -> str:
         """获取显示名称（支持翻译）"""
         if server and self.trans_key:
             return server.tr(self.trans_key)
         return self.value
 
-    def to_rtext(self, server: Optional[ServerInterface] = None) -> RText:
+    def to_rtext(self, server: Optional['ServerInterface'] = None) -> 'RText':
         """获取带有颜色的富文本对象"""
+        from mcdreforged.api.all import RText
         return RText(self.get_display_name(server), color=self.color)
 
     @classmethod
-    def get_rtext(cls, value: str, server: Optional[ServerInterface] = None) -> RText:
+    def get_rtext(cls, value: str, server: Optional['ServerInterface'] = None) -> 'RText':
         """
         静态方法：根据值或别名获取对应的富文本对象
         如果找不到对应的枚举成员，则返回默认白色文本
         """
+        from mcdreforged.api.all import RText
         member = cls.from_alias(value)
         if member:
             return member.to_rtext(server)
-        return RText(value, color=RColor.white)
+        return RText(value, color=resolve_color('white'))
 
     @classmethod
-    def get_color(cls, value: str) -> RColor:
+    def get_color(cls, value: str) -> 'RColor':
         """
         静态方法：根据值或别名获取对应的颜色
         如果找不到对应的枚举成员，则返回默认白色
@@ -47,7 +64,7 @@ class BaseProperty(Enum):
         member = cls.from_alias(value)
         if member:
             return member.color
-        return RColor.white
+        return resolve_color('white')
 
     @classmethod
     def from_alias(cls, alias: str) -> Optional['BaseProperty']:
@@ -83,34 +100,34 @@ class BaseProperty(Enum):
 
 
 class Status(BaseProperty):
-    DONE = ("Done", RColor.green, ['done', 'd', 'finished', 'finish', 'complete', 'completed'], "sakuraflow.status.done")
-    IN_PROGRESS = ("In Progress", RColor.aqua, ['in progress', 'inprogress', 'ip', 'progress', 'p', 'doing'],
+    DONE = ("Done", 'green', ['done', 'd', 'finished', 'finish', 'complete', 'completed'], "sakuraflow.status.done")
+    IN_PROGRESS = ("In Progress", 'aqua', ['in progress', 'inprogress', 'ip', 'progress', 'p', 'doing'],
                    "sakuraflow.status.in_progress")
-    ON_HOLD = ("On Hold", RColor.red, ['on hold', 'onhold', 'hold', 'oh', 'h', 'pause', 'paused', 'waiting'],
+    ON_HOLD = ("On Hold", 'red', ['on hold', 'onhold', 'hold', 'oh', 'h', 'pause', 'paused', 'waiting'],
                "sakuraflow.status.on_hold")
 
 
 class Priority(BaseProperty):
-    VERY_HIGH = ("Very High", RColor.dark_red, ['veryhigh', 'vh', '0'], "sakuraflow.priority.very_high")
-    HIGH = ("High", RColor.red, ['high', 'h', '1'], "sakuraflow.priority.high")
-    MEDIUM = ("Medium", RColor.yellow, ['medium', 'med', 'm', '2'], "sakuraflow.priority.medium")
-    LOW = ("Low", RColor.green, ['low', 'l', '3'], "sakuraflow.priority.low")
-    VERY_LOW = ("Very Low", RColor.gray, ['verylow', 'vl', '4'], "sakuraflow.priority.very_low")
+    VERY_HIGH = ("Very High", 'dark_red', ['veryhigh', 'vh', '0'], "sakuraflow.priority.very_high")
+    HIGH = ("High", 'red', ['high', 'h', '1'], "sakuraflow.priority.high")
+    MEDIUM = ("Medium", 'yellow', ['medium', 'med', 'm', '2'], "sakuraflow.priority.medium")
+    LOW = ("Low", 'green', ['low', 'l', '3'], "sakuraflow.priority.low")
+    VERY_LOW = ("Very Low", 'gray', ['verylow', 'vl', '4'], "sakuraflow.priority.very_low")
 
 
 class Tier(BaseProperty):
-    ULV = ("ULV", RColor.dark_gray, ['0'])
-    LV = ("LV", RColor.gray, ['1'])
-    MV = ("MV", RColor.aqua, ['2'])
-    HV = ("HV", RColor.gold, ['3'])
-    EV = ("EV", RColor.dark_purple, ['4'])
-    IV = ("IV", RColor.blue, ['5'])
-    LuV = ("LuV", RColor.light_purple, ['6'])
-    ZPM = ("ZPM", RColor.red, ['7'])
-    UV = ("UV", RColor.dark_aqua, ['8'])
-    UHV = ("UHV", RColor.dark_red, ['9'])
-    UEV = ("UEV", RColor.green, ['10'])
-    UIV = ("UIV", RColor.dark_green, ['11'])
-    UXV = ("UXV", RColor.yellow, ['12'])
-    OpV = ("OpV", RColor.blue, ['13'])
-    MAX = ("MAX", RColor.red, ['14'])
+    ULV = ("ULV", 'dark_gray', ['0'])
+    LV = ("LV", 'gray', ['1'])
+    MV = ("MV", 'aqua', ['2'])
+    HV = ("HV", 'gold', ['3'])
+    EV = ("EV", 'dark_purple', ['4'])
+    IV = ("IV", 'blue', ['5'])
+    LuV = ("LuV", 'light_purple', ['6'])
+    ZPM = ("ZPM", 'red', ['7'])
+    UV = ("UV", 'dark_aqua', ['8'])
+    UHV = ("UHV", 'dark_red', ['9'])
+    UEV = ("UEV", 'green', ['10'])
+    UIV = ("UIV", 'dark_green', ['11'])
+    UXV = ("UXV", 'yellow', ['12'])
+    OpV = ("OpV", 'blue', ['13'])
+    MAX = ("MAX", 'red', ['14'])
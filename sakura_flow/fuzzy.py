@@ -0,0 +1,212 @@
+import re
+from typing import Dict, Any, List, Optional, Tuple, Iterable
+
+from .manager import TodoManager
+
+# 标题按连续的字母/数字/汉字切分为词
+_WORD = re.compile(r"\w+")
+
+# 支持模糊匹配的搜索字段 -> 词表
+FUZZY_FIELDS = {"title": "titles", "label": "labels", "creator": "players", "collaborator": "players"}
+
+
+def title_words(title: str) -> List[str]:
+    return _WORD.findall(title.lower())
+
+
+def edit_distance(a: str, b: str) -> int:
+    """Levenshtein 编辑距离"""
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+
+def max_edits(term: str) -> int:
+    """按词长允许的最大编辑次数"""
+    return 1 if len(term) <= 5 else 2 if len(term) <= 10 else 3
+
+
+class BKTree:
+    """
+    BK 树：按编辑距离组织的度量树，查询距离 ≤ k 的词时只需访问距离落在 [d-k, d+k] 的子树
+    """
+    def __init__(self):
+        # 节点: [词, {到子节点的距离: 子节点}]
+        self._root: Optional[list] = None
+        self.size = 0
+
+    def add(self, term: str):
+        self.size += 1
+        if self._root is None:
+            self._root = [term, {}]
+            return
+        node = self._root
+        while True:
+            d = edit_distance(term, node[0])
+            if d == 0:
+                self.size -= 1
+                return
+            child = node[1].get(d)
+            if child is None:
+                node[1][d] = [term, {}]
+                return
+            node = child
+
+    def search(self, term: str, k: int) -> List[Tuple[str, int]]:
+        result = []
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            word, children = stack.pop()
+            d = edit_distance(term, word)
+            if d <= k:
+                result.append((word, d))
+            for dist, child in children.items():
+                if d - k <= dist <= d + k:
+                    stack.append(child)
+        return result
+
+
+class Vocabulary:
+    """
+    带引用计数的词表及其 BK 树；BK 树不便删除，计数归零的词留在树中并在查询时跳过，失效词过半时重建
+    """
+    def __init__(self):
+        # 树中的每个词 -> 引用计数（0 表示已失效）
+        self.counts: Dict[str, int] = {}
+        self.tree = BKTree()
+        self.dead = 0
+
+    def add(self, term: str):
+        count = self.counts.get(term)
+        if count is None:
+            self.tree.add(term)
+        elif count == 0:
+            self.dead -= 1
+        self.counts[term] = (count or 0) + 1
+
+    def discard(self, term: str):
+        count = self.counts.get(term, 0)
+        if count <= 0:
+            return
+        self.counts[term] = count - 1
+        if count == 1:
+            self.dead += 1
+            if self.dead * 2 > len(self.counts) > 64:
+                self._rebuild()
+
+    def _rebuild(self):
+        self.counts = {term: c for term, c in self.counts.items() if c > 0}
+        self.tree = BKTree()
+        for term in self.counts:
+            self.tree.add(term)
+        self.dead = 0
+
+    def lookup(self, term: str, k: int) -> List[Tuple[str, int]]:
+        """距离 ≤ k 的现存词，按 (距离, 出现次数降序) 排列"""
+        matches = [(w, d) for w, d in self.tree.search(term, k) if self.counts.get(w, 0) > 0]
+        return sorted(matches, key=lambda m: (m[1], -self.counts[m[0]], m[0]))
+
+
+class FuzzyIndex:
+    """
+    模糊搜索索引：标题词、标签与玩家名三个词表，各自以 BK 树支持近似查询
+    查询时先在词表中找出与输入相近的词（只对词表而非每个任务计算编辑距离），再用这些词筛选任务
+    首次使用时构建，之后随事务提交增量维护
+    """
+    def __init__(self, manager: TodoManager):
+        self.manager = manager
+        self._vocabularies: Optional[Dict[str, Vocabulary]] = None
+        # 每个任务登记的词 {任务ID: {词表: 词元组}}
+        self._entries: Dict[str, Dict[str, tuple]] = {}
+
+    @staticmethod
+    def _terms(task: Dict[str, Any]) -> Dict[str, tuple]:
+        players = [task.get("creator", "")] + list(task.get("collaborators", []))
+        return {
+            "titles": tuple(dict.fromkeys(title_words(task.get("title", "")))),
+            "labels": tuple(dict.fromkeys(label.lower() for label in task.get("labels", []))),
+            "players": tuple(dict.fromkeys(p.lower() for p in players if p)),
+        }
+
+    def _index(self, tid: str, task: Optional[Dict[str, Any]]):
+        for name, terms in self._entries.pop(tid, {}).items():
+            for term in terms:
+                self._vocabularies[name].discard(term)
+        if task is not None:
+            entry = self._entries[tid] = self._terms(task)
+            for name, terms in entry.items():
+                for term in terms:
+                    self._vocabularies[name].add(term)
+
+    def _ensure(self) -> Dict[str, Vocabulary]:
+        if self._vocabularies is None:
+            self._vocabularies = {name: Vocabulary() for name in ("titles", "labels", "players")}
+            self._entries = {}
+            for tid, task in self.manager.data["tasks"].items():
+                self._index(tid, task)
+        return self._vocabularies
+
+    # --- 监听者接口 ---
+
+    def on_commit(self, changes):
+        if self._vocabularies is None:
+            return
+        for tid, _, after, _ in changes:
+            self._index(tid, after)
+
+    on_sync = on_commit
+
+    def on_reload(self):
+        self._vocabularies, self._entries = None, {}
+
+    # --- 查询 ---
+
+    def similar(self, field: str, value: str, limit: Optional[int] = None) -> List[Tuple[str, int]]:
+        """字段值的近似词 [(词, 距离)]，距离相同时常用词在前"""
+        value = value.lower()
+        matches = self._ensure()[FUZZY_FIELDS[field]].lookup(value, max_edits(value))
+        return matches[:limit] if limit is not None else matches
+
+    def search(self, candidates: Iterable[Tuple[str, Dict[str, Any]]],
+               criteria: Dict[str, str], fields: Iterable[str]) -> Tuple[List[Tuple[str, Dict[str, Any]]], Dict[str, List[str]]]:
+        """
+        对 fields 中的条件做模糊匹配，其余条件应已由调用方用于筛选 candidates
+        :return: (按总编辑距离排序的结果, {字段: 与输入不同的近似词，即"你是不是要找"})
+        """
+        wanted: Dict[str, Dict[str, int]] = {}
+        suggestions: Dict[str, List[str]] = {}
+        for field in fields:
+            matches = self.similar(field, criteria[field])
+            wanted[field] = dict(matches)
+            suggestions[field] = [w for w, d in matches if d > 0][:5]
+        title_query = criteria.get("title", "").lower()
+
+        ranked = []
+        for tid, task in candidates:
+            score = 0
+            for field, words in wanted.items():
+                if field == "title":
+                    # 精确的子串匹配同样算作命中
+                    if title_query in task.get("title", "").lower():
+                        continue
+                    values = title_words(task.get("title", ""))
+                elif field == "label":
+                    values = [v.lower() for v in task.get("labels", [])]
+                elif field == "creator":
+                    values = [task.get("creator", "").lower()]
+                else:
+                    values = [v.lower() for v in task.get("collaborators", [])]
+                distances = [words[v] for v in values if v in words]
+                if not distances:
+                    break
+                score += min(distances)
+            else:
+                ranked.append((score, tid, task))
+        ranked.sort(key=lambda r: r[0])
+        return [(tid, task) for _, tid, task in ranked], suggestions
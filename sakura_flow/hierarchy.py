@@ -0,0 +1,194 @@
+from collections import Counter
+from typing import Dict, Any, List, Optional, Tuple
+
+from .enums import Status, Priority, Tier
+from .manager import TodoManager
+
+_DONE = Status.DONE.value
+_PRIORITY_ORDER = {p.value: i for i, p in enumerate(Priority)}
+_TIER_ORDER = {t.value: i for i, t in enumerate(Tier)}
+
+
+def parent_chain(tasks: Dict[str, Dict[str, Any]], tid: str) -> List[str]:
+    """沿任务的 parent 字段向上的祖先链（由近及远），遇到不存在的任务或环时停止"""
+    chain, seen = [], {tid}
+    parent = (tasks.get(tid) or {}).get("parent")
+    while parent and parent not in seen and parent in tasks:
+        chain.append(parent)
+        seen.add(parent)
+        parent = tasks[parent].get("parent")
+    return chain
+
+
+class Rollup:
+    """
+    一组任务的汇总：总数、已完成数、未完成任务的优先级分布与全部任务的等级分布
+    分布以计数保存，撤销某个任务的贡献时无需重新统计其余任务
+    """
+    __slots__ = ("done", "total", "priorities", "tiers")
+
+    def __init__(self):
+        self.done = 0
+        self.total = 0
+        self.priorities: Counter = Counter()
+        self.tiers: Counter = Counter()
+
+    @classmethod
+    def of(cls, task: Dict[str, Any]) -> 'Rollup':
+        """单个任务自身的贡献"""
+        rollup = cls()
+        rollup.total = 1
+        if task.get("status") == _DONE:
+            rollup.done = 1
+        else:
+            rollup.priorities[task.get("priority", "Medium")] = 1
+        rollup.tiers[task.get("tier", "LV")] = 1
+        return rollup
+
+    def apply(self, other: 'Rollup', sign: int = 1):
+        self.done += sign * other.done
+        self.total += sign * other.total
+        for counter, delta in ((self.priorities, other.priorities), (self.tiers, other.tiers)):
+            for key, count in delta.items():
+                counter[key] += sign * count
+                if counter[key] <= 0:
+                    del counter[key]
+
+    def combined(self, other: Optional['Rollup']) -> 'Rollup':
+        result = Rollup()
+        result.apply(self)
+        if other is not None:
+            result.apply(other)
+        return result
+
+    def _key(self):
+        return self.done, self.total, self.priorities, self.tiers
+
+    def __eq__(self, other):
+        return isinstance(other, Rollup) and self._key() == other._key()
+
+    @property
+    def highest_priority(self) -> Optional[str]:
+        """未完成任务中最高的优先级；均已完成时为 None"""
+        return min(self.priorities, key=lambda p: _PRIORITY_ORDER.get(p, len(_PRIORITY_ORDER)), default=None)
+
+    @property
+    def max_tier(self) -> Optional[str]:
+        return max(self.tiers, key=lambda t: _TIER_ORDER.get(t, -1), default=None)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"done": self.done, "total": self.total,
+                "priority": self.highest_priority, "tier": self.max_tier}
+
+
+class SubtaskIndex:
+    """
+    子任务索引：由任务的 parent 字段得到的子任务表，以及每个祖先的后代汇总（见 Rollup）
+    任务的状态、优先级、等级或父任务变化时，只沿其祖先链撤销旧贡献、加上新贡献，不遍历任何子树；
+    移动任务时以该任务自身的汇总代表整棵子树，同样只需经过新旧两条祖先链
+    父任务不存在（尚未导入或已被删除）时子任务照常登记在该 ID 下，父任务出现后其汇总随之生效
+    首次查询时才全量构建，数据文件被重新解析后丢弃，下次查询时重建
+    """
+    def __init__(self, manager: TodoManager):
+        self.manager = manager
+        # {父任务ID: {子任务ID: None}}（有序集合）；None 表示尚未构建
+        self._children: Optional[Dict[str, Dict[str, None]]] = None
+        self._parent: Dict[str, str] = {}
+        # 任务自身当前计入祖先汇总的贡献，用于更新时撤销
+        self._own: Dict[str, Rollup] = {}
+        # {任务ID: 全部后代的汇总}，只保存有后代的任务
+        self._rollups: Dict[str, Rollup] = {}
+
+    def _path(self, tid: str) -> List[str]:
+        """按索引记录的 parent 得到的祖先链；出现环时停止"""
+        chain, seen = [], {tid}
+        parent = self._parent.get(tid)
+        while parent and parent not in seen:
+            chain.append(parent)
+            seen.add(parent)
+            parent = self._parent.get(parent)
+        return chain
+
+    def _spread(self, tid: str, subtree: Rollup, sign: int):
+        for ancestor in self._path(tid):
+            rollup = self._rollups.setdefault(ancestor, Rollup())
+            rollup.apply(subtree, sign)
+            if rollup.total <= 0:
+                del self._rollups[ancestor]
+
+    def _index(self, tid: str, task: Optional[Dict[str, Any]]):
+        old_own, old_parent = self._own.get(tid), self._parent.get(tid, "")
+        new_own = Rollup.of(task) if task is not None else None
+        new_parent = (task or {}).get("parent") or ""
+        if new_own == old_own and new_parent == old_parent:
+            return
+        below = self._rollups.get(tid)
+        if old_own is not None:
+            self._spread(tid, old_own.combined(below), -1)
+        if new_parent != old_parent:
+            if old_parent:
+                siblings = self._children[old_parent]
+                siblings.pop(tid, None)
+                if not siblings:
+                    del self._children[old_parent]
+                del self._parent[tid]
+            if new_parent:
+                self._children.setdefault(new_parent, {})[tid] = None
+                self._parent[tid] = new_parent
+        if new_own is None:
+            self._own.pop(tid, None)
+            return
+        self._own[tid] = new_own
+        self._spread(tid, new_own.combined(below), 1)
+
+    def _ensure(self) -> Dict[str, Dict[str, None]]:
+        if self._children is None:
+            self._children, self._parent, self._own, self._rollups = {}, {}, {}, {}
+            for tid, task in self.manager.data["tasks"].items():
+                self._index(tid, task)
+        return self._children
+
+    # --- 监听者接口 ---
+
+    def on_commit(self, changes):
+        if self._children is None:
+            return
+        for tid, _, after, _ in changes:
+            self._index(tid, after)
+
+    on_sync = on_commit
+
+    def on_reload(self):
+        self._children, self._parent, self._own, self._rollups = None, {}, {}, {}
+
+    # --- 查询 ---
+
+    def children(self, tid: str) -> List[str]:
+        """直接子任务 ID，按 ID 排序"""
+        return sorted(self._ensure().get(tid, ()),
+                      key=lambda t: (0, int(t), "") if t.isdigit() else (1, 0, t))
+
+    def rollup(self, tid: str) -> Optional[Rollup]:
+        """任务全部后代的汇总；没有子任务时返回 None"""
+        self._ensure()
+        return self._rollups.get(tid)
+
+    def progress(self, tid: str) -> Optional[Tuple[int, int]]:
+        """(已完成的后代数, 后代总数)；没有子任务时返回 None"""
+        rollup = self.rollup(tid)
+        return (rollup.done, rollup.total) if rollup is not None else None
+
+    def tree(self, tid: str, max_depth: Optional[int] = None) -> List[Tuple[int, str]]:
+        """以 tid 为根的子树 [(深度, 任务ID)]，先序排列，根的深度为 0"""
+        self._ensure()
+        result, seen = [], set()
+        stack = [(0, tid)]
+        while stack:
+            depth, current = stack.pop()
+            if current in seen:
+                continue
+            seen.add(current)
+            result.append((depth, current))
+            if max_depth is None or depth < max_depth:
+                stack.extend((depth + 1, child) for child in reversed(self.children(current)))
+        return result
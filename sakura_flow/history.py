@@ -0,0 +1,233 @@
+import json
+import os
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+# 仅记录在 delta 中、展示历史时忽略的元数据字段
+META_FIELDS = ("last_updated", "last_editor", "completed_at")
+
+
+def diff_task(before: Dict[str, Any], after: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    计算字段级增量：d 为被替换的字段，a 为列表末尾追加的元素（例如笔记），u 为被删除的字段
+    """
+    delta: Dict[str, Any] = {}
+    for key, value in after.items():
+        if key in before and before[key] == value:
+            continue
+        old = before.get(key)
+        if isinstance(old, list) and isinstance(value, list) and len(value) > len(old) and value[:len(old)] == old:
+            delta.setdefault("a", {})[key] = value[len(old):]
+        else:
+            delta.setdefault("d", {})[key] = value
+    removed = [key for key in before if key not in after]
+    if removed:
+        delta["u"] = removed
+    return delta
+
+
+def apply_delta(state: Dict[str, Any], record: Dict[str, Any]) -> Dict[str, Any]:
+    """将一条历史记录应用到任务状态上，返回新状态（不修改传入的对象）"""
+    if "s" in record:
+        return record["s"]
+    state = dict(state)
+    state.update(record.get("d", {}))
+    for key, items in record.get("a", {}).items():
+        state[key] = list(state.get(key, [])) + items
+    for key in record.get("u", []):
+        state.pop(key, None)
+    return state
+
+
+def normalize_timestamp(value: str) -> str:
+    """
+    将 --as-of 参数规范为与任务时间戳相同的 "%Y-%m-%d %H:%M:%S" 格式，便于按字典序比较
+    只给出日期时视为当天结束，只给到分钟时视为该分钟结束
+    """
+    value = value.strip().replace("T", " ")
+    for fmt, suffix in (("%Y-%m-%d %H:%M:%S", ""), ("%Y-%m-%d %H:%M", ":59"), ("%Y-%m-%d", " 23:59:59")):
+        try:
+            time.strptime(value, fmt)
+        except ValueError:
+            continue
+        return value + suffix
+    raise ValueError(f"Invalid timestamp '{value}', expected YYYY-MM-DD[ HH:MM[:SS]]")
+
+
+class HistoryStore:
+    """
+    追加写的任务变更历史：<数据文件>.history 每行一条记录，每个任务每隔 keyframe_interval 条增量写入一次完整快照（关键帧）
+    <数据文件>.history.idx 每行记录 "任务ID\\t时间\\t偏移\\t类型"，按需读取并增量同步，
+    回溯某一时刻的状态时只需从最近的关键帧开始应用增量，无需从头重放
+    """
+    def __init__(self, data_path: str, keyframe_interval: int = 16):
+        self.path = data_path + ".history"
+        self.index_path = data_path + ".history.idx"
+        self.keyframe_interval = keyframe_interval
+        # {任务ID: [(时间, 偏移, 是否关键帧), ...]}，按写入顺序排列
+        self._index: Dict[str, List[Tuple[str, int, bool]]] = {}
+        self._index_pos = 0
+
+    def _sync_index(self):
+        """读取索引文件中本进程尚未见过的部分（可能由其他进程追加）"""
+        try:
+            size = os.path.getsize(self.index_path)
+        except OSError:
+            self._index, self._index_pos = {}, 0
+            return
+        if size < self._index_pos:
+            self._index, self._index_pos = {}, 0
+        if size == self._index_pos:
+            return
+        with open(self.index_path, 'rb') as f:
+            f.seek(self._index_pos)
+            chunk = f.read()
+        # 只消费完整的行，写入中途的半行留待下次读取
+        end = chunk.rfind(b"\n") + 1
+        for line in chunk[:end].decode('utf-8').splitlines():
+            tid, ts, offset, kind = line.split("\t")
+            self._index.setdefault(tid, []).append((ts, int(offset), kind == "k"))
+        self._index_pos += end
+
+    def _deltas_since_keyframe(self, tid: str) -> int:
+        count = 0
+        for _, _, is_key in reversed(self._index.get(tid, [])):
+            if is_key:
+                return count
+            count += 1
+        return count
+
+    def record(self, changes: List[Tuple[str, Optional[Dict[str, Any]], Optional[Dict[str, Any]], str]]):
+        """
+        追加一批变更，应在持有数据文件锁时调用以保证多进程写入顺序
+        :param changes: [(任务ID, 修改前, 修改后, 编辑者)]，修改前为 None 表示新建
+        """
+        if not changes:
+            return
+        self._sync_index()
+        now = time.strftime("%Y-%m-%d %H:%M:%S")
+        records: List[Tuple[str, str, bool, Dict[str, Any]]] = []
+        pending: Dict[str, int] = {}
+
+        for tid, before, after, editor in changes:
+            entries = self._index.get(tid)
+            if before is not None and not entries and tid not in pending:
+                # 历史启用前已存在的任务：先以修改前的状态补一个关键帧
+                ts = before.get("last_updated") or before.get("created_at") or now
+                records.append((tid, ts, True, {"t": ts, "e": before.get("last_editor"), "s": before}))
+                pending[tid] = 0
+            ts = (after or {}).get("last_updated") or now
+            since_key = pending.get(tid, self._deltas_since_keyframe(tid) if entries else 0)
+            if before is None or after is None or since_key + 1 >= self.keyframe_interval:
+                record = {"t": ts, "e": editor, "s": after}
+                if before is None:
+                    record["c"] = 1
+                records.append((tid, ts, True, record))
+                pending[tid] = 0
+            else:
+                delta = diff_task(before, after)
+                if not delta:
+                    continue
+                records.append((tid, ts, False, {"t": ts, "e": editor, **delta}))
+                pending[tid] = since_key + 1
+
+        if not records:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, 'ab') as f:
+            offset = f.tell()
+            lines, index_lines = [], []
+            for tid, ts, is_key, record in records:
+                line = (json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n").encode('utf-8')
+                lines.append(line)
+                index_lines.append(f"{tid}\t{ts}\t{offset}\t{'k' if is_key else 'd'}\n")
+                offset += len(line)
+            f.write(b"".join(lines))
+        with open(self.index_path, 'a', encoding='utf-8') as f:
+            f.write("".join(index_lines))
+        self._sync_index()
+
+    def on_commit(self, changes):
+        """作为 TodoManager 的变更监听者，在事务提交后记录本次变更"""
+        self.record(changes)
+
+    def _read_records(self, offsets: List[int]) -> List[Dict[str, Any]]:
+        """读取给定偏移处的记录；历史文件不存在（历史启用前创建、从未修改过的看板）时返回空列表"""
+        if not offsets:
+            return []
+        records = []
+        try:
+            f = open(self.path, 'rb')
+        except FileNotFoundError:
+            return []
+        with f:
+            for offset in offsets:
+                f.seek(offset)
+                records.append(json.loads(f.readline()))
+        return records
+
+    def has_history(self, tid: str) -> bool:
+        self._sync_index()
+        return bool(self._index.get(tid))
+
+    def state_at(self, tid: str, as_of: str, current: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """
+        回溯任务在 as_of 时刻的状态；该时刻任务尚不存在时返回 None
+        :param current: 当前状态，用于没有任何历史记录（历史启用后从未修改）的任务
+        """
+        self._sync_index()
+        entries = self._index.get(tid)
+        if not entries:
+            if current is not None and current.get("created_at", "") <= as_of:
+                return current
+            return None
+
+        last = -1
+        for i, (ts, _, _) in enumerate(entries):
+            if ts <= as_of:
+                last = i
+        if last < 0:
+            # 早于第一条记录：若首条不是新建记录，以最早的关键帧近似
+            first = self._read_records([entries[0][1]])[0]
+            if "c" not in first and (first["s"] or {}).get("created_at", "") <= as_of:
+                return first["s"]
+            return None
+
+        start = last
+        while not entries[start][2]:
+            start -= 1
+        state: Optional[Dict[str, Any]] = None
+        for record in self._read_records([offset for _, offset, _ in entries[start:last + 1]]):
+            state = apply_delta(state, record)
+        return state
+
+    def task_ids(self) -> List[str]:
+        self._sync_index()
+        return list(self._index)
+
+    def changes(self, tid: str) -> List[Dict[str, Any]]:
+        """
+        按时间顺序列出任务的每次变更
+        :return: [{"time", "editor", "created", "changes": [(字段, 旧值, 新值)]}]
+        """
+        self._sync_index()
+        entries = self._index.get(tid, [])
+        result = []
+        state: Optional[Dict[str, Any]] = None
+        for i, record in enumerate(self._read_records([offset for _, offset, _ in entries])):
+            new_state = apply_delta(state, record)
+            if i == 0 and "c" not in record:
+                # 历史启用前的基线关键帧，不是一次变更
+                state = new_state
+                continue
+            old_state = state or {}
+            fields = [key for key in (new_state or {}) if key not in META_FIELDS and old_state.get(key) != new_state[key]]
+            fields += [key for key in old_state if key not in META_FIELDS and key not in (new_state or {})]
+            result.append({
+                "time": record["t"],
+                "editor": record.get("e"),
+                "created": "c" in record,
+                "changes": [(key, old_state.get(key), (new_state or {}).get(key)) for key in fields],
+            })
+            state = new_state
+        return result
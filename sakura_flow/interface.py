@@ -1,9 +1,15 @@
+import time
+from typing import Optional
+
 from mcdreforged.api.all import RTextBase, RText, RColor, RTextList, ServerInterface, CommandSource, RAction, RStyle
 
-from . import TodoManager
-from .constants import COMMAND_PREFIX, PAGE_SIZE, TASK_PROPERTIES, LIST_PROPERTIES, COLON
+from .manager import TodoManager
+from .constants import COMMAND_PREFIX, PAGE_SIZE, TASK_PROPERTIES, LIST_PROPERTIES
+from .deadlines import TIME_FORMAT
+from .hierarchy import Rollup, SubtaskIndex
 from .enums import Status, Tier, Priority
-from .utils import Utils, ItemizeBuilder
+from .utils import Utils, ItemizeBuilder, COLON
+from .metrics import PHASES
 
 
 class UI:
@@ -26,8 +32,12 @@ class UI:
         return line + ("\n" if newline else "")
 
     @staticmethod
-    def create_hover_info(tid: str, task: dict, tasks_db: dict, server: ServerInterface) -> RTextBase:
-        """通用的任务悬浮矩阵生成器"""
+    def create_hover_info(tid: str, task: dict, tasks_db: dict, server: ServerInterface,
+                          rollup: Optional[Rollup] = None) -> RTextBase:
+        """
+        通用的任务悬浮矩阵生成器
+        :param rollup: 任务全部后代的汇总（见 SubtaskIndex.rollup），给出时显示子任务进度
+        """
         dep_display = []
         for d_id in task.get("dependencies", []):
             d_task = tasks_db.get(str(d_id))
@@ -57,6 +67,7 @@ class UI:
             Utils.list_to_rtext(dep_display) if dep_display else RText(server.tr('sakuraflow.common.none'),
                                                                        color=RColor.gray),
             "\n",
+            UI._render_rollup(rollup, server) if rollup is not None else "",
             RText("-" * 25 + "\n"),
             RText(
                 f"{server.tr('sakuraflow.ui.hover.latest_progress')}: {task['notes'][-1]['content'] if task.get('notes') else server.tr('sakuraflow.ui.hover.waiting_record')}",
@@ -64,10 +75,32 @@ class UI:
         )
 
     @staticmethod
-    def render_task_line(tid: str, task: dict, tasks_db: dict, server: ServerInterface, source: CommandSource) -> RTextBase:
-        """渲染清单行"""
+    def _render_progress(rollup: Rollup, server: ServerInterface) -> RTextBase:
+        """子任务进度 "已完成/总数"，全部完成时为绿色"""
+        return RText(server.tr('sakuraflow.tree.progress', rollup.done, rollup.total),
+                     color=RColor.green if rollup.done == rollup.total else RColor.aqua)
+
+    @staticmethod
+    def _render_rollup(rollup: Rollup, server: ServerInterface) -> RTextBase:
+        """悬浮信息中的子任务汇总行：进度、未完成子任务的最高优先级与全部子任务的最高等级"""
+        text = RTextList(RText(f"{server.tr('sakuraflow.common.subtasks')}: ", color=RColor.gray),
+                         UI._render_progress(rollup, server))
+        if rollup.highest_priority:
+            text.append(RText(" · ", color=RColor.gray), Priority.get_rtext(rollup.highest_priority, server))
+        if rollup.max_tier:
+            text.append(RText(" · ", color=RColor.gray), Tier.get_rtext(rollup.max_tier))
+        text.append("\n")
+        return text
+
+    @staticmethod
+    def render_task_line(tid: str, task: dict, tasks_db: dict, server: ServerInterface, source: CommandSource,
+                         rollup: Optional[Rollup] = None) -> RTextBase:
+        """
+        渲染清单行
+        :param rollup: 任务全部后代的汇总，给出时在标题后显示子任务进度
+        """
         is_done = task.get("status") == Status.DONE.value
-        hover_info = UI.create_hover_info(tid, task, tasks_db, server)
+        hover_info = UI.create_hover_info(tid, task, tasks_db, server, rollup)
 
         status_str = task.get("status", "Unknown")
         status_text = Status.get_rtext(status_str, server)
@@ -97,7 +130,9 @@ class UI:
             RText(f"[#{tid}] ", color=RColor.green).c(RAction.suggest_command, f"{COMMAND_PREFIX} info {tid}").h(hover_info),
             RText("[", color=status_color), status_text, RText("] ", color=status_color).h(hover_info),
             " ", btns, " ",
-            RText(task['title']).c(RAction.suggest_command, f"{COMMAND_PREFIX} info {tid}").h(hover_info)
+            RText(task['title']).c(RAction.suggest_command, f"{COMMAND_PREFIX} info {tid}").h(hover_info),
+            RTextList(" ", UI._render_progress(rollup, server).h(hover_info)
+                      .c(RAction.run_command, f"{COMMAND_PREFIX} tree {tid}")) if rollup is not None else ""
         )
 
     @staticmethod
@@ -129,9 +164,12 @@ class UI:
         return RTextList(label_component, value_component, "\n")
 
     @staticmethod
-    def render_task_info(tid: str, task: dict, tasks_db: dict, server: ServerInterface) -> RTextBase:
+    def render_task_info(tid: str, task: dict, tasks_db: dict, server: ServerInterface,
+                         archived_notes: Optional[list] = None, rollup: Optional[Rollup] = None) -> RTextBase:
         """
         渲染详细的任务信息界面 (已通过 _render_info_row 重构)
+        :param archived_notes: 已解压的归档笔记；为 None 时只显示归档条数与查看按钮
+        :param rollup: 任务全部后代的汇总；给出时显示子任务进度，点击查看子任务树
         """
         # 依赖列表特殊渲染逻辑
         deps = task.get("dependencies", [])
@@ -159,6 +197,18 @@ class UI:
 
         # 日志内容构建
         notes_content = []
+        archived_count = task.get("archived_notes", 0)
+        if archived_notes:
+            for n in archived_notes:
+                notes_content.append(RText(f" [{n['time']}] {n['author']}: {n['content']}\n", color=RColor.dark_gray))
+        elif archived_count:
+            notes_content.append(RTextList(
+                RText(f" {server.tr('sakuraflow.ui.info.archived_notes', archived_count)} ", color=RColor.dark_gray),
+                Utils.create_button(server.tr('sakuraflow.action.show_all'), RColor.aqua,
+                                    server.tr('sakuraflow.action.show_all_hover'),
+                                    f"{COMMAND_PREFIX} info {tid} all", RAction.run_command),
+                "\n"
+            ))
         if task.get("notes"):
             for n in task["notes"]:
                 notes_content.append(RTextList(
@@ -167,7 +217,7 @@ class UI:
                     COLON,
                     RText(f"{n['content']}\n")
                 ))
-        else:
+        elif not archived_count:
             notes_content.append(RText(f" {server.tr('sakuraflow.ui.info.no_records')}\n", color=RColor.dark_gray))
 
         collabs = task.get('collaborators', [])
@@ -177,6 +227,34 @@ class UI:
         if not description:
             description = server.tr('sakuraflow.ui.info.no_desc')
 
+        # 截止时间：未设置为灰色，未完成且已过期为红色；提醒时间只在设置后显示
+        due = task.get('due', '')
+        overdue = due and due <= time.strftime(TIME_FORMAT) and task['status'] != Status.DONE.value
+        deadline_rows = [UI._render_info_row(tid, server.tr('sakuraflow.prop.due'),
+                                             due or server.tr('sakuraflow.common.none'), "due", server,
+                                             value_color=RColor.red if overdue else RColor.yellow if due else RColor.gray)]
+        if task.get('remind'):
+            deadline_rows.append(UI._render_info_row(tid, server.tr('sakuraflow.prop.remind'), task['remind'],
+                                                     "remind", server))
+
+        # 父任务只在设置后显示；有子任务时显示汇总进度
+        hierarchy_rows = []
+        parent = task.get('parent')
+        if parent:
+            parent_task = tasks_db.get(parent)
+            parent_val = RText(f"#{parent}" + (f" {parent_task['title']}" if parent_task else ""), color=RColor.aqua)
+            if parent_task:
+                parent_val.h(UI.create_hover_info(parent, parent_task, tasks_db, server))
+            hierarchy_rows.append(UI._render_info_row(tid, server.tr('sakuraflow.prop.parent'), parent_val,
+                                                      "parent", server))
+        if rollup is not None:
+            hierarchy_rows.append(RTextList(
+                RText(f"{server.tr('sakuraflow.common.subtasks')}: ", color=RColor.gray),
+                UI._render_progress(rollup, server).h(server.tr('sakuraflow.tree.hover'))
+                .c(RAction.run_command, f"{COMMAND_PREFIX} tree {tid}"),
+                "\n"
+            ))
+
         return RTextList(
             UI.make_dividing_line(server.tr('sakuraflow.ui.info.header', tid)),
             UI._render_info_row(tid, server.tr('sakuraflow.common.title'), task['title'], "title", server),
@@ -188,6 +266,8 @@ class UI:
                                 "tier", server, value_color=Tier.get_color(task['tier'])),
             UI._render_info_row(tid, server.tr('sakuraflow.common.priority'), Priority.get_rtext(task['priority'], server),
                                 "priority", server, value_color=Priority.get_color(task['priority'])),
+            *deadline_rows,
+            *hierarchy_rows,
             UI._render_info_row(tid, server.tr('sakuraflow.common.collaborators'), collab_val, "collaborators", server,
                                 is_list=True),
             UI._render_info_row(tid, server.tr('sakuraflow.common.dependencies'), dep_list, "dependency", server,
@@ -274,7 +354,7 @@ class UI:
             help_line("list", server.tr('sakuraflow.help.list'), usage="", abbr="l"),
             help_line("archive", server.tr('sakuraflow.help.archive'), usage="", abbr="ar"),
             help_line("search", server.tr('sakuraflow.help.search'), usage="<query>", abbr="find"),
-            help_line("add", server.tr('sakuraflow.help.add'), usage="<title>", abbr="a"),
+            help_line("add", server.tr('sakuraflow.help.add'), usage="[--parent <id>] <title>", abbr="a"),
             help_line("info", server.tr('sakuraflow.help.info'), usage="<id>", abbr="i"),
             help_line("note", server.tr('sakuraflow.help.note'), usage="<id> <content>", abbr="n"),
             help_line("set", server.tr('sakuraflow.help.set'), usage="<id> <prop> <value>", full_desc=properties_info,
@@ -289,6 +369,13 @@ class UI:
             help_line("resume", server.tr('sakuraflow.help.resume'), usage="<id>"),
             help_line("complete", server.tr('sakuraflow.help.complete'), usage="<id>"),
             help_line("restore", server.tr('sakuraflow.help.restore'), usage="<id>"),
+            help_line("mine", server.tr('sakuraflow.help.mine'), usage=""),
+            help_line("history", server.tr('sakuraflow.help.history'), usage="<id>"),
+            help_line("board", server.tr('sakuraflow.help.board'), usage="[list|use <name>]"),
+            help_line("report", server.tr('sakuraflow.help.report'), usage=""),
+            help_line("due", server.tr('sakuraflow.help.due'), usage="[days]"),
+            help_line("tree", server.tr('sakuraflow.help.tree'), usage="<id>"),
+            help_line("view", server.tr('sakuraflow.help.view'), usage="[list|save <name> <query>|run <name>|delete <name>]"),
 
             UI.make_dividing_line(newline=False)
         )
@@ -314,12 +401,13 @@ class UI:
 
     @staticmethod
     def render_paged_list(source: CommandSource, tasks: dict, manager: TodoManager, header_key: str, empty_key: str, 
-                          input_page: int = 1, cmd_prefix: str = "list"):
+                          input_page: int = 1, cmd_prefix: str = "list", subtasks: Optional[SubtaskIndex] = None):
         """
         渲染分页列表
         :param tasks: 要渲染的任务字典 {tid: task_data}
         :param manager: TodoManager 实例，用于查找依赖任务信息
         :param cmd_prefix: 翻页命令的前缀，例如 "search"
+        :param subtasks: 子任务索引，给出时为有子任务的任务显示汇总进度
         """
         server = source.get_server()
         page_size = PAGE_SIZE
@@ -350,7 +438,8 @@ class UI:
         source.reply(UI.make_dividing_line(server.tr(header_key), newline=False))
 
         for tid, task in filtered_tasks[start_index:end_index]:
-            source.reply(UI.render_task_line(tid, task, manager.data["tasks"], server, source))
+            rollup = subtasks.rollup(tid) if subtasks is not None else None
+            source.reply(UI.render_task_line(tid, task, manager.data["tasks"], server, source, rollup))
 
         # 底部显示页码和翻页按钮
         footer = RTextList()
@@ -372,3 +461,326 @@ class UI:
             footer.append(RText("[>>]", color=RColor.gray))
 
         source.reply(UI.make_dividing_line(footer, newline=False))
+
+    @staticmethod
+    def render_report(server: ServerInterface, report: dict) -> list:
+        """
+        渲染看板统计报告，每个分组一行
+        :param report: TodoController.report() 的返回值
+        """
+        lines = [UI.make_dividing_line(server.tr('sakuraflow.report.header'), newline=False),
+                 RText(server.tr('sakuraflow.report.summary', report['total'], report['open']), color=RColor.gold)]
+        median = report['median_hours_to_done']
+        lines.append(RText(server.tr('sakuraflow.report.median', median) if median is not None
+                           else server.tr('sakuraflow.report.median_none'), color=RColor.gray))
+        sections = ["status", "tier", "priority", "creator", "label", "busiest_collaborators",
+                    "completed_per_day", "completed_per_week"]
+        for key in sections:
+            items = [RTextList(RText(name, color=RColor.gray), COLON, RText(str(count)))
+                     for name, count in report[key].items()]
+            lines.append(RTextList(RText(f"{server.tr(f'sakuraflow.report.section.{key}')}: ", color=RColor.aqua),
+                                   Utils.list_to_rtext(items) if items else RText("-", color=RColor.gray)))
+        lines.append(UI.make_dividing_line(newline=False))
+        return lines
+
+    @staticmethod
+    def render_stats(server: ServerInterface, snapshot: dict) -> list:
+        """
+        渲染性能统计页：每条指令一行 (调用次数与 p50/p95/p99)，悬浮显示各阶段耗时中位数
+        :param snapshot: Metrics.snapshot() 的返回值
+        """
+        lines = [UI.make_dividing_line(server.tr('sakuraflow.stats.header'), newline=False)]
+        commands = snapshot["commands"]
+        if not commands:
+            lines.append(RText(server.tr('sakuraflow.stats.empty'), color=RColor.gray))
+
+        for name, entry in commands.items():
+            total = entry["total"]
+            hover = RTextList(RText(f"{server.tr('sakuraflow.stats.phases')}\n", color=RColor.yellow))
+            for phase in PHASES:
+                hover.append(RText(f"{server.tr(f'sakuraflow.stats.phase.{phase}')}: ", color=RColor.gray),
+                             f"{entry['phases'][phase]:.2f} ms\n")
+            p99_color = RColor.red if total['p99'] >= 500 else RColor.yellow if total['p99'] >= 100 else RColor.green
+            lines.append(RTextList(
+                RText(f"{name:<12}", color=RColor.aqua),
+                RText(f" ×{entry['calls']} ", color=RColor.gray),
+                RText(f" p50 {total['p50']:.1f}ms", color=RColor.white),
+                RText(f" p95 {total['p95']:.1f}ms", color=RColor.white),
+                RText(f" p99 {total['p99']:.1f}ms", color=p99_color)
+            ).h(hover))
+
+        counters = snapshot["counters"]
+        counter_items = [RTextList(RText(k, color=RColor.gray), COLON, RText(str(v))) for k, v in sorted(counters.items())]
+        lines.append(RTextList(RText(f"{server.tr('sakuraflow.stats.counters')}: ", color=RColor.gold),
+                               Utils.list_to_rtext(counter_items)))
+        lines.append(UI.make_dividing_line(newline=False))
+        return lines
+
+    @staticmethod
+    def render_lock_report(server: ServerInterface, report: dict) -> RTextBase:
+        """
+        渲染锁竞争诊断
+        :param report: FileLock.diagnose() 的返回值
+        """
+        holder = report["holder"]
+        if holder:
+            holder_color = RColor.red if holder["stale"] else RColor.yellow
+            holder_text = RText(server.tr('sakuraflow.debug.lock.holder_info', holder.get('pid'), holder.get('role'),
+                                          holder.get('command') or '-', f"{holder['held_for']:.1f}"), color=holder_color)
+            if holder["stale"]:
+                holder_text = RTextList(holder_text, RText(f" {server.tr('sakuraflow.debug.lock.stale')}", color=RColor.red))
+        else:
+            holder_text = RText(server.tr('sakuraflow.debug.lock.free'), color=RColor.green)
+
+        def dist_line(label_key: str, d: dict) -> RTextList:
+            return RTextList(
+                RText(f"{server.tr(label_key)}: ", color=RColor.gray),
+                f"n={d['count']} p50={d['p50']:.1f}ms p95={d['p95']:.1f}ms p99={d['p99']:.1f}ms max={d['max']:.1f}ms\n"
+            )
+
+        counter_items = [RTextList(RText(k, color=RColor.gray), COLON, RText(str(v))) for k, v in report["counters"].items()]
+        proc = report["process"]
+        return RTextList(
+            UI.make_dividing_line(server.tr('sakuraflow.debug.lock.header')),
+            RText(f"{server.tr('sakuraflow.debug.lock.holder')}: ", color=RColor.gray), holder_text, "\n",
+            RText(f"{server.tr('sakuraflow.debug.lock.process')}: ", color=RColor.gray),
+            f"pid {proc['pid']} [{proc['role']}]\n",
+            dist_line('sakuraflow.debug.lock.wait', report["wait_ms"]),
+            dist_line('sakuraflow.debug.lock.hold', report["hold_ms"]),
+            RText(f"{server.tr('sakuraflow.stats.counters')}: ", color=RColor.gray), Utils.list_to_rtext(counter_items), "\n",
+            UI.make_dividing_line(newline=False)
+        )
+
+    @staticmethod
+    def render_memory_report(server: ServerInterface, report: dict) -> RTextBase:
+        """
+        渲染内存占用报告，附带最近一次分配采样的结果
+        :param report: diagnostics.memory_report() 的返回值
+        """
+        def size_text(n: int) -> str:
+            return f"{n / 1024:.1f} KiB" if n < 1024 * 1024 else f"{n / 1024 / 1024:.2f} MiB"
+
+        text = RTextList(
+            UI.make_dividing_line(server.tr('sakuraflow.debug.memory.header')),
+            RText(server.tr('sakuraflow.debug.memory.summary', report["task_count"], report["note_count"],
+                            report["walk_ms"]), color=RColor.gray), "\n"
+        )
+        for section, size in report["sections"].items():
+            line = RTextList(RText(f"{server.tr(f'sakuraflow.debug.memory.section.{section}')}: ", color=RColor.gray),
+                             size_text(size))
+            if section == "indexes" and report["indexes"]:
+                line.h("\n".join(f"{name}: {size_text(n)}" for name, n in report["indexes"].items()))
+            text.append(line, "\n")
+        text.append(RText(f"{server.tr('sakuraflow.debug.memory.total')}: ", color=RColor.gold),
+                    size_text(report["total"]), "\n")
+
+        if report["tracemalloc"]:
+            traced = report["tracemalloc"]
+            text.append(RText(f"{server.tr('sakuraflow.debug.memory.traced')}: ", color=RColor.gray),
+                        f"{size_text(traced['current'])} / {size_text(traced['peak'])}\n")
+        trace = report["trace"]
+        if trace["active"]:
+            text.append(RText(server.tr('sakuraflow.debug.memory.trace_active', trace["remaining"]), color=RColor.yellow), "\n")
+        elif trace["top"]:
+            text.append(RText(f"{server.tr('sakuraflow.debug.memory.trace_top')}:\n", color=RColor.yellow))
+            for entry in trace["top"]:
+                text.append(RText(f"{entry['size_diff'] / 1024:+.1f} KiB ", color=RColor.aqua),
+                            RText(f"×{entry['count_diff']:+d} ", color=RColor.gray), entry["site"], "\n")
+        text.append(UI.make_dividing_line(newline=False))
+        return text
+
+    @staticmethod
+    def render_history(tid: str, entries: list, server: ServerInterface, limit: int = 10) -> RTextBase:
+        """
+        渲染任务变更历史，只显示最新 limit 条
+        :param entries: HistoryStore.changes() 的返回值
+        """
+        def field_name(field: str) -> str:
+            if field in TASK_PROPERTIES or field in LIST_PROPERTIES:
+                return server.tr(f"sakuraflow.prop.{field}")
+            if field == "notes":
+                return server.tr('sakuraflow.ui.info.progress_header')
+            return field
+
+        def change_text(old, new) -> RTextBase:
+            if isinstance(old, list) or isinstance(new, list):
+                old, new = old or [], new or []
+                items = [RText(f"+{x['content'] if isinstance(x, dict) else x}", color=RColor.green) for x in new if x not in old]
+                items += [RText(f"-{x['content'] if isinstance(x, dict) else x}", color=RColor.red) for x in old if x not in new]
+                return Utils.list_to_rtext(items)
+            return RTextList(RText(str(old), color=RColor.gray), RText(" → ", color=RColor.dark_gray),
+                             RText(str(new), color=RColor.white))
+
+        text = RTextList(UI.make_dividing_line(server.tr('sakuraflow.history.header', tid)))
+        if not entries:
+            text.append(RText(f" {server.tr('sakuraflow.history.empty')}\n", color=RColor.dark_gray))
+        elif len(entries) > limit:
+            text.append(RText(f" {server.tr('sakuraflow.history.omitted', len(entries) - limit)}\n", color=RColor.dark_gray))
+        for entry in entries[-limit:]:
+            text.append(RText(f" [{entry['time']}] ", color=RColor.gray), RText(str(entry['editor'])))
+            if entry["created"]:
+                text.append(RText(f" {server.tr('sakuraflow.history.created')}\n", color=RColor.green))
+                continue
+            text.append("\n")
+            for field, old, new in entry["changes"]:
+                text.append(RText(f"   {field_name(field)}", color=RColor.gold), COLON, change_text(old, new), "\n")
+        text.append(UI.make_dividing_line(newline=False))
+        return text
+
+    @staticmethod
+    def render_board_list(server: ServerInterface, names: list, counts: dict, current: str) -> RTextBase:
+        """
+        渲染看板列表，点击看板名切换
+        :param counts: 已加载看板的任务数 {看板名: 数量}，未加载的看板不显示数量
+        """
+        text = RTextList(UI.make_dividing_line(server.tr('sakuraflow.board.header')))
+        for name in names:
+            marker = RText("▶ " if name == current else "  ", color=RColor.green)
+            count = server.tr('sakuraflow.board.task_count', counts[name]) if name in counts \
+                else server.tr('sakuraflow.board.not_loaded')
+            text.append(
+                marker,
+                RText(name, color=RColor.green if name == current else RColor.aqua)
+                .h(server.tr('sakuraflow.board.use_hover'))
+                .c(RAction.run_command, f"{COMMAND_PREFIX} board use {name}"),
+                RText(f" ({count})\n", color=RColor.gray)
+            )
+        text.append(RText(f"{server.tr('sakuraflow.board.current', current)}\n", color=RColor.gray))
+        text.append(UI.make_dividing_line(newline=False))
+        return text
+
+    @staticmethod
+    def render_digest(server: ServerInterface, digest: dict, tasks_db: dict, limit: int = 8) -> RTextBase:
+        """
+        渲染进服时的任务摘要：数量统计与可点击的任务 ID（可开始的排在前面，受阻的标红）
+        :param digest: AssignmentIndex.digest 的结果
+        """
+        ready, blocked = set(digest["ready"]), set(digest["blocked"])
+        ordered = digest["ready"] + [tid for tid in digest["open"] if tid not in ready]
+        text = RTextList(RText(server.tr('sakuraflow.digest.summary', len(digest["open"]), len(digest["blocked"]),
+                                         len(digest["ready"])), color=RColor.gold), "\n")
+        for tid in ordered[:limit]:
+            color = RColor.green if tid in ready else RColor.red if tid in blocked else RColor.gray
+            text.append(
+                RText(f"[#{tid}]", color=color)
+                .h(UI.create_hover_info(tid, tasks_db[tid], tasks_db, server))
+                .c(RAction.run_command, f"{COMMAND_PREFIX} info {tid}"),
+                " "
+            )
+        if len(ordered) > limit:
+            text.append(RText(server.tr('sakuraflow.digest.more', len(ordered) - limit), color=RColor.gray), " ")
+        text.append(Utils.create_button(server.tr('sakuraflow.digest.view_all'), RColor.aqua,
+                                        server.tr('sakuraflow.digest.view_all_hover'), f"{COMMAND_PREFIX} mine",
+                                        RAction.run_command))
+        return text
+
+    @staticmethod
+    def render_did_you_mean(server: ServerInterface, options: list) -> RTextBase:
+        """
+        渲染"你是不是要找"：每个候选条件为一个按钮，点击后以修正后的条件重新搜索
+        :param options: [(按钮文字, 修正后的完整查询)]
+        """
+        text = RTextList(RText(server.tr('sakuraflow.search.did_you_mean'), color=RColor.gray))
+        for label, query in options:
+            text.append(Utils.create_button(label, RColor.aqua, server.tr('sakuraflow.search.did_you_mean_hover', query),
+                                            f"{COMMAND_PREFIX} search {query}", RAction.run_command), " ")
+        return text
+
+    @staticmethod
+    def render_due_list(server: ServerInterface, entries: list, tasks_db: dict, days: int) -> RTextBase:
+        """
+        渲染即将到期的任务，按截止时间排序，已过期的标红
+        :param entries: TodoController.upcoming_deadlines 的结果 [(截止时间, 任务ID)]
+        """
+        now = time.strftime(TIME_FORMAT)
+        text = RTextList(UI.make_dividing_line(server.tr('sakuraflow.due.header', days)))
+        if not entries:
+            text.append(RText(f"{server.tr('sakuraflow.due.empty', days)}\n", color=RColor.gray))
+        for due, tid in entries:
+            task = tasks_db[tid]
+            overdue = due <= now
+            text.append(
+                RText(f"{due[:16]} ", color=RColor.red if overdue else RColor.yellow),
+                RText(f"[#{tid}] ", color=RColor.green)
+                .h(UI.create_hover_info(tid, task, tasks_db, server))
+                .c(RAction.run_command, f"{COMMAND_PREFIX} info {tid}"),
+                RText(task['title']),
+                RText(f" {server.tr('sakuraflow.due.overdue')}\n", color=RColor.red) if overdue else "\n"
+            )
+        text.append(UI.make_dividing_line(newline=False))
+        return text
+
+    @staticmethod
+    def render_tree(server: ServerInterface, root: str, entries: list, tasks_db: dict,
+                    subtasks: SubtaskIndex) -> RTextBase:
+        """
+        渲染子任务树，每个有子任务的节点后显示其汇总进度
+        :param entries: TodoController.subtask_tree 的结果 [(深度, 任务ID)]
+        """
+        text = RTextList(UI.make_dividing_line(server.tr('sakuraflow.tree.header', root)))
+        for depth, tid in entries:
+            task = tasks_db.get(tid)
+            if task is None:
+                continue
+            rollup = subtasks.rollup(tid)
+            status = task.get("status", "Unknown")
+            text.append(
+                RText("  " * depth + ("└ " if depth else ""), color=RColor.dark_gray),
+                RText(f"[#{tid}] ", color=RColor.green)
+                .h(UI.create_hover_info(tid, task, tasks_db, server, rollup))
+                .c(RAction.run_command, f"{COMMAND_PREFIX} info {tid}"),
+                RText(task['title'], color=RColor.gray if status == Status.DONE.value else Status.get_color(status)),
+                RTextList(" ", UI._render_progress(rollup, server)) if rollup is not None else "",
+                "\n"
+            )
+        if len(entries) <= 1:
+            text.append(RText(f"{server.tr('sakuraflow.tree.empty')}\n", color=RColor.gray))
+        text.append(UI.make_dividing_line(newline=False))
+        return text
+
+    @staticmethod
+    def render_deadline_alert(server: ServerInterface, tid: str, task: dict, kind: str) -> RTextBase:
+        """
+        渲染到时通知，点击任务 ID 查看详情
+        :param tid: 任务 ID，非默认看板上为 "<看板>:<ID>"
+        :param kind: "remind"（提醒时间已到）或 "due"（截止时间已到）
+        """
+        tid_text = RText(f"#{tid} {task['title']}", color=RColor.aqua) \
+            .h(server.tr('sakuraflow.due.alert_hover')).c(RAction.run_command, f"{COMMAND_PREFIX} info {tid}")
+        if kind == "due":
+            return RTextList(RText(server.tr('sakuraflow.due.alert_due'), color=RColor.red), " ", tid_text)
+        due = task.get('due') or server.tr('sakuraflow.common.none')
+        return RTextList(RText(server.tr('sakuraflow.due.alert_remind'), color=RColor.gold), " ", tid_text,
+                         RText(f" ({server.tr('sakuraflow.prop.due')}: {due})", color=RColor.gray))
+
+    @staticmethod
+    def render_view_list(server: ServerInterface, views: dict) -> RTextBase:
+        """渲染已保存的视图，点击视图名运行，悬停显示查询条件"""
+        text = RTextList(UI.make_dividing_line(server.tr('sakuraflow.view.list_header')))
+        if not views:
+            text.append(RText(f"{server.tr('sakuraflow.view.empty')}\n", color=RColor.gray))
+        for name, view in sorted(views.items()):
+            text.append(
+                RText(name, color=RColor.aqua)
+                .h(server.tr('sakuraflow.view.run_hover', view['query']))
+                .c(RAction.run_command, f"{COMMAND_PREFIX} view run {name}"),
+                RText(f" {view['query']} ({view.get('creator', '')})\n", color=RColor.gray)
+            )
+        text.append(UI.make_dividing_line(newline=False))
+        return text
+
+    @staticmethod
+    def render_backup_list(server: ServerInterface, backups: list) -> RTextBase:
+        """渲染备份列表（从新到旧），点击备份名填入恢复指令"""
+        text = RTextList(UI.make_dividing_line(server.tr('sakuraflow.backup.header')))
+        if not backups:
+            text.append(RText(f"{server.tr('sakuraflow.backup.empty')}\n", color=RColor.gray))
+        for backup in backups:
+            text.append(
+                RText(backup["name"], color=RColor.aqua)
+                .h(server.tr('sakuraflow.backup.restore_hover'))
+                .c(RAction.suggest_command, f"{COMMAND_PREFIX} backup restore {backup['name']}"),
+                RText(f" {backup['time']} ({backup['size']} B)\n", color=RColor.gray)
+            )
+        text.append(UI.make_dividing_line(newline=False))
+        return text
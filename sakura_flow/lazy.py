@@ -0,0 +1,157 @@
+"""
+数据文件的延迟加载
+
+数据文件由 TodoManager 以 json.dump(indent=4) 写出，"tasks" 中的每个任务都从一行 8 个空格缩进的 "<ID>": { 开始。
+JSON 字符串中不会出现未转义的换行，因此可以按行定位每个任务的字节范围：
+加载时只用正则扫描一遍文件（在 C 中完成）建立 任务ID -> 字节范围 的索引，任务在第一次被访问时才解码。
+文件不是这种布局（例如手工编辑过）时 scan 返回 None，由调用方退回到完整解析。
+只读快照（见 snapshot 模块）以此为基础，并把扫描得到的索引发布给后续的读取者复用。
+"""
+import json
+import mmap
+import os
+import re
+from collections.abc import MutableMapping, ItemsView, ValuesView
+from typing import Dict, Any, Iterator, List, Optional, Tuple, Union
+
+Buffer = Union[bytes, mmap.mmap]
+
+_TASKS_OPEN = b'\n    "tasks": {'
+_TASKS_CLOSE = b'\n    }'
+# 任务对象的起始行："<ID>": { 且恰好缩进 8 个空格（更深的行在第 9 个字符处仍是空格，不会匹配）
+_TASK_LINE = re.compile(rb'\n        ("(?:[^"\\\n]|\\.)*"): \{\n')
+
+
+class LazyTasks(MutableMapping):
+    """
+    按需解码的任务集合，行为与 dict 相同（保持文件中的顺序）
+    未访问的任务只保存其在缓冲区中的字节范围（从 "<ID>": 开始到任务对象结束），访问后替换为解码出的任务字典
+    顺序遍历 items()/values() 时把文件中相邻的一段任务合并为一次 json.loads，避免逐个解码的开销
+    """
+    # 顺序遍历时一次解码的最大任务数
+    RUN_SIZE = 256
+
+    def __init__(self, buf: Buffer, spans: Dict[str, Tuple[int, int]]):
+        self._buf = buf
+        # 任务ID -> 解码后的任务，或尚未解码时的 (起始, 结束) 偏移
+        self._items: Dict[str, Any] = dict(spans)
+
+    def _decode_run(self, task_ids: List[str]):
+        """解码一段尚未解码的任务；它们在文件中相邻（中间被删除的任务解码后丢弃）"""
+        first, last = self._items[task_ids[0]], self._items[task_ids[-1]]
+        decoded = json.loads(b"{" + self._buf[first[0]:last[1]] + b"}")
+        for task_id in task_ids:
+            self._items[task_id] = decoded[task_id]
+
+    def __getitem__(self, task_id: str) -> Dict[str, Any]:
+        value = self._items[task_id]
+        if isinstance(value, tuple):
+            self._decode_run([task_id])
+            value = self._items[task_id]
+        return value
+
+    def __setitem__(self, task_id: str, task: Dict[str, Any]):
+        self._items[task_id] = task
+
+    def __delitem__(self, task_id: str):
+        del self._items[task_id]
+
+    def __contains__(self, task_id) -> bool:
+        return task_id in self._items
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._items)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def items(self) -> ItemsView:
+        return _LazyItems(self)
+
+    def values(self) -> ValuesView:
+        return _LazyValues(self)
+
+    def _iter_items(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        run: List[str] = []
+        # 只替换已有键的值，不改变字典大小，遍历期间是安全的
+        for task_id, value in self._items.items():
+            if isinstance(value, tuple):
+                run.append(task_id)
+                if len(run) < self.RUN_SIZE:
+                    continue
+            if run:
+                self._decode_run(run)
+                yield from ((tid, self._items[tid]) for tid in run)
+                run = []
+            if not isinstance(value, tuple):
+                yield task_id, value
+        if run:
+            self._decode_run(run)
+            yield from ((tid, self._items[tid]) for tid in run)
+
+    def decoded_count(self) -> int:
+        return sum(1 for value in self._items.values() if not isinstance(value, tuple))
+
+
+class _LazyItems(ItemsView):
+    def __iter__(self):
+        return self._mapping._iter_items()
+
+
+class _LazyValues(ValuesView):
+    def __iter__(self):
+        return (task for _, task in self._mapping._iter_items())
+
+
+def scan(buf: Buffer) -> Optional[Tuple[Dict[str, Any], Dict[str, Tuple[int, int]]]]:
+    """
+    扫描文档，返回 (除任务外的其余字段, {任务ID: 任务对象的字节范围})；布局不符合时返回 None
+    """
+    opening = buf.find(_TASKS_OPEN)
+    if opening < 0:
+        return None
+    body = opening + len(_TASKS_OPEN)
+    if buf[body:body + 1] == b"}":
+        # 空看板：文档很小，直接整体解析
+        return json.loads(buf[:]), {}
+
+    spans: Dict[str, Tuple[int, int]] = {}
+    previous: Optional[Tuple[str, int]] = None
+    for match in _TASK_LINE.finditer(buf, body):
+        if previous is not None:
+            end = buf.rfind(b"}", previous[1], match.start()) + 1
+            # 相邻的两个任务之间只有一个逗号；否则 "tasks" 已经结束（例如匹配到了之后 "views" 中的条目）
+            if buf[end:match.start()] != b",":
+                break
+            spans[previous[0]] = (previous[1], end)
+        elif match.start() != body:
+            return None
+        key = match.group(1)
+        previous = (key[1:-1].decode("utf-8") if b"\\" not in key else json.loads(key), match.start(1))
+    if previous is None:
+        return None
+    closing = buf.find(_TASKS_CLOSE, previous[1])
+    if closing < 0:
+        return None
+    spans[previous[0]] = (previous[1], buf.rfind(b"}", previous[1], closing) + 1)
+
+    # 其余字段（next_id、default_tier 等）很小，把任务部分替换为空对象后整体解析
+    header = json.loads(buf[:body - 1] + b"{}" + buf[closing + len(_TASKS_CLOSE):])
+    return header, spans
+
+
+def open_buffer(path: str) -> Optional[Tuple[Buffer, Tuple[int, int, int]]]:
+    """
+    打开数据文件的当前版本，返回 (缓冲区, 该版本的 (inode, mtime_ns, size))；文件为空时返回 None
+    POSIX 上通过 mmap 映射文件（数据文件总是被原子替换，映射的 inode 不会被改写）；
+    Windows 上映射会阻止其他进程替换文件，因此读入内存，仍然只按需解码
+    """
+    with open(path, 'rb') as f:
+        st = os.fstat(f.fileno())
+        if st.st_size == 0:
+            return None
+        if os.name == "nt":
+            buf: Buffer = f.read()
+        else:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return buf, (st.st_ino, st.st_mtime_ns, st.st_size)
@@ -0,0 +1,214 @@
+import json
+import os
+import socket
+import time
+from contextlib import contextmanager
+from typing import Optional, Dict, Any
+
+from .metrics import metrics
+
+
+class LockTimeoutError(TimeoutError):
+    """获取锁超时，附带当前持有者信息"""
+    def __init__(self, lock_file: str, holder: Optional[Dict[str, Any]], waited: float):
+        self.lock_file = lock_file
+        self.holder = holder
+        self.waited = waited
+        super().__init__(f"Could not acquire lock on {lock_file} after {waited:.1f}s ({describe_holder(holder)})")
+
+
+def describe_holder(holder: Optional[Dict[str, Any]]) -> str:
+    """将锁记录格式化为一行可读描述"""
+    if not holder:
+        return "holder unknown"
+    held = time.time() - holder.get("acquired_at", time.time())
+    text = f"held by pid {holder.get('pid')} [{holder.get('role', '?')}]"
+    if holder.get("command"):
+        text += f" running '{holder['command']}'"
+    text += f" for {held:.1f}s"
+    if holder.get("host") and holder["host"] != socket.gethostname():
+        text += f" on {holder['host']}"
+    elif not pid_alive(holder.get("pid")):
+        text += ", process is gone (stale)"
+    return text
+
+
+def pid_alive(pid: Any) -> bool:
+    """检查同一主机上的进程是否存活；无法判断时视为存活"""
+    if not isinstance(pid, int) or pid <= 0:
+        return True
+    if pid == os.getpid():
+        return True
+    if os.name == 'nt':
+        # Windows 上 os.kill 会结束目标进程，不能用于探测
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+
+class FileLock:
+    """
+    简单的基于文件的互斥锁
+    锁文件中记录持有者的 PID、进程角色 (MCDR/CLI/daemon)、正在执行的指令与获取时间，
+    超时时据此报告持有者，并可在持有进程已不存在时打破残留的锁
+    """
+    def __init__(self, lock_file: str, timeout: float = 5, delay: float = 0.1, role: str = "MCDR",
+                 break_stale: bool = True):
+        self.lock_file = lock_file
+        self.timeout = timeout
+        self.delay = delay
+        self.role = role
+        self.break_stale = break_stale
+        self._acquired_at: Optional[float] = None
+
+    def configure(self, timeout: Optional[float] = None, role: Optional[str] = None,
+                  break_stale: Optional[bool] = None):
+        if timeout is not None:
+            self.timeout = timeout
+        if role is not None:
+            self.role = role
+        if break_stale is not None:
+            self.break_stale = break_stale
+
+    def read_holder(self) -> Optional[Dict[str, Any]]:
+        """读取当前锁记录；锁未被持有或记录尚未写入时返回 None"""
+        try:
+            with open(self.lock_file, 'r', encoding='utf-8') as f:
+                holder = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return holder if isinstance(holder, dict) else None
+
+    def is_stale(self, holder: Optional[Dict[str, Any]]) -> bool:
+        """锁由本机上已退出的进程持有"""
+        if not holder or holder.get("host") != socket.gethostname():
+            return False
+        return not pid_alive(holder.get("pid"))
+
+    def _write_record(self, fd: int):
+        record = {
+            "pid": os.getpid(),
+            "role": self.role,
+            "command": metrics.current_command(),
+            "acquired_at": time.time(),
+            "host": socket.gethostname(),
+        }
+        os.write(fd, json.dumps(record).encode('utf-8'))
+        self._acquired_at = record["acquired_at"]
+
+    def _break_stale(self, holder: Dict[str, Any]) -> bool:
+        """
+        打破残留的锁
+        先原子地将锁文件改名再核对内容，避免多个等待者同时清理时误删刚被他人获取的新锁
+        """
+        claimed = f"{self.lock_file}.stale.{os.getpid()}"
+        try:
+            os.rename(self.lock_file, claimed)
+        except OSError:
+            return False
+        try:
+            with open(claimed, 'r', encoding='utf-8') as f:
+                current = json.load(f)
+        except (OSError, ValueError):
+            current = None
+        if current != holder:
+            # 改名的已不是那把残留的锁，尽量放回（若已有新锁则放弃）
+            try:
+                os.link(claimed, self.lock_file)
+            except OSError:
+                pass
+            os.remove(claimed)
+            return False
+        os.remove(claimed)
+        metrics.incr("stale_locks_broken")
+        return True
+
+    def acquire(self):
+        with metrics.phase("lock_wait"):
+            return self._acquire()
+
+    def _acquire(self):
+        start_time = time.time()
+        contended = False
+        while True:
+            try:
+                # 确保锁文件的父目录存在
+                os.makedirs(os.path.dirname(self.lock_file), exist_ok=True)
+                # 尝试以独占模式创建锁文件
+                fd = os.open(self.lock_file, os.O_CREAT | os.O_EXCL | os.O_RDWR)
+                try:
+                    self._write_record(fd)
+                except OSError:
+                    # 写入持有者记录失败（如磁盘已满）时删除刚创建的锁文件，不留下无法识别的残留锁
+                    os.close(fd)
+                    os.remove(self.lock_file)
+                    raise
+                os.close(fd)
+                waited = time.time() - start_time
+                metrics.observe("lock_wait", waited * 1000)
+                metrics.incr("lock_acquired")
+                if contended:
+                    metrics.incr("lock_contended")
+                return True
+            except (FileExistsError, PermissionError):
+                # 文件已存在（Windows 上删除中的文件会报 PermissionError），说明被锁定
+                contended = True
+                holder = self.read_holder()
+                if self.break_stale and self.is_stale(holder) and self._break_stale(holder):
+                    continue
+                waited = time.time() - start_time
+                if waited >= self.timeout:
+                    metrics.incr("lock_timeouts")
+                    raise LockTimeoutError(self.lock_file, holder, waited)
+                time.sleep(self.delay)
+            except OSError as e:
+                # 其他错误（只读文件系统、磁盘已满、I/O 错误等）同样重试到超时，之后作为获取锁失败报告
+                waited = time.time() - start_time
+                if waited >= self.timeout:
+                    metrics.incr("lock_timeouts")
+                    raise LockTimeoutError(self.lock_file, None, waited) from e
+                time.sleep(self.delay)
+
+    def release(self):
+        if self._acquired_at is not None:
+            metrics.observe("lock_hold", (time.time() - self._acquired_at) * 1000)
+            self._acquired_at = None
+        try:
+            os.remove(self.lock_file)
+        except OSError:
+            pass
+
+    def diagnose(self) -> Dict[str, Any]:
+        """
+        锁竞争诊断：当前持有者，以及本进程的等待/持有时间分布与竞争计数
+        """
+        holder = self.read_holder()
+        if holder:
+            holder = dict(holder)
+            holder["held_for"] = round(time.time() - holder.get("acquired_at", time.time()), 3)
+            holder["stale"] = self.is_stale(holder)
+        counters = metrics.counters
+        return {
+            "lock_file": self.lock_file,
+            "locked": os.path.exists(self.lock_file),
+            "holder": holder,
+            "process": {"pid": os.getpid(), "role": self.role, "timeout": self.timeout,
+                        "break_stale": self.break_stale},
+            "wait_ms": metrics.distribution("lock_wait"),
+            "hold_ms": metrics.distribution("lock_hold"),
+            "counters": {k: counters.get(k, 0) for k in
+                         ("lock_acquired", "lock_contended", "lock_timeouts", "stale_locks_broken")},
+        }
+
+    @contextmanager
+    def lock(self):
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
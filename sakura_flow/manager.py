@@ -1,112 +1,412 @@
+import copy
 import json
 import os
+import shutil
+import threading
 import time
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple, Iterable
 from contextlib import contextmanager
-from .enums import Status
+from .enums import Status, Tier, Priority
+from .backup import BackupStore
+from .lock import FileLock
+from . import snapshot
+from .metrics import metrics
+from .note_archive import NoteArchive
+from .history import HistoryStore
+from .sequence import IdSequence
 
+# 导入时接受的任务字段：文本字段、列表字段与笔记的文本字段；其余键（包括 archived_notes 等内部字段）一律丢弃
+IMPORT_TEXT_FIELDS = ("title", "creator", "description", "status", "tier", "priority", "created_at",
+                      "last_updated", "last_editor", "completed_at", "due", "remind", "parent")
+IMPORT_LIST_FIELDS = ("collaborators", "dependencies", "labels")
+NOTE_FIELDS = ("time", "author", "content")
 
-class FileLock:
-    """简单的基于文件的互斥锁"""
-    def __init__(self, lock_file: str, timeout: int = 5, delay: float = 0.1):
-        self.lock_file = lock_file
-        self.timeout = timeout
-        self.delay = delay
 
-    def acquire(self):
-        start_time = time.time()
-        while True:
-            try:
-                # 确保锁文件的父目录存在
-                os.makedirs(os.path.dirname(self.lock_file), exist_ok=True)
-                # 尝试以独占模式创建锁文件
-                fd = os.open(self.lock_file, os.O_CREAT | os.O_EXCL | os.O_RDWR)
-                os.close(fd)
-                return True
-            except OSError:
-                # 文件已存在，说明被锁定
-                if time.time() - start_time >= self.timeout:
-                    raise TimeoutError(f"Could not acquire lock on {self.lock_file}")
-                time.sleep(self.delay)
+def _import_text(value: Any) -> Optional[str]:
+    """导入的标量值转为文本；对象、列表等无法表示为文本的值返回 None"""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    return None
 
-    def release(self):
-        try:
-            os.remove(self.lock_file)
-        except OSError:
-            pass
 
-    @contextmanager
-    def lock(self):
-        self.acquire()
-        try:
-            yield
-        finally:
-            self.release()
+def is_valid_task_id(task_id: str) -> bool:
+    """任务 ID 为十进制数字串；ID 会用于笔记归档等按任务命名的文件，不接受其他形式"""
+    return task_id.isascii() and task_id.isdigit()
+
+
+class DataFileError(IOError):
+    """数据文件无法读取或已损坏，且没有可用的备份"""
+
+
+class ReadOnlyError(RuntimeError):
+    """在只读快照模式下尝试修改看板"""
 
 
 class TodoManager:
-    def __init__(self, data_path: str):
+    # 导入时每次向序列文件预留的 ID 数
+    IMPORT_ID_BLOCK = 256
+
+    def __init__(self, data_path: str, role: str = "MCDR", read_only: bool = False):
+        """
+        :param role: 本进程在锁记录中的角色 (MCDR/CLI/daemon)，用于锁竞争诊断
+        :param read_only: 只读快照模式：打开数据文件的最新完整版本并复用已发布的偏移索引（见 snapshot 模块），
+                          从不获取写锁；开启事务时抛出 ReadOnlyError
+        """
         self.data_path = data_path
+        self.read_only = read_only
         self.lock_path = data_path + ".lock"
-        self.file_lock = FileLock(self.lock_path)
+        self.file_lock = FileLock(self.lock_path, role=role)
+        self.note_archive = NoteArchive(data_path)
+        self.backups = BackupStore(data_path)
+        # 数据文件损坏时实际加载的备份名称
+        self.recovered_from: Optional[str] = None
+        # 笔记保留策略，compact 未显式指定时使用，由配置覆盖
+        self.note_retention_days = 0
+        self.note_retention_keep = 0
         self.data: Dict[str, Any] = {"tasks": {}, "next_id": 1, "default_tier": "LV"}
+        # 最近一次读取/写入时数据文件的 (inode, mtime_ns, size)，用于跳过不必要的重新加载
+        self._file_stamp: Optional[Tuple[int, int, int]] = None
+        # 当前持有事务的线程及嵌套深度，同一线程内的嵌套事务并入最外层事务
+        self._tx_owner: Optional[int] = None
+        self._tx_depth = 0
+        # 当前事务中被修改的任务 {任务ID: (修改前的副本, 编辑者)}，提交后转换为变更通知
+        self._pending: Dict[str, Tuple[Optional[Dict[str, Any]], str]] = {}
+        # 当前事务中打开的保存点，每个保存点记录 {任务ID: 进入保存点后第一次修改前的副本}
+        self._savepoints: List[Dict[str, Optional[Dict[str, Any]]]] = []
+        # 变更监听者：可实现 on_commit(changes)、on_sync(changes) 与 on_reload()，用于维护历史记录与各类派生索引
+        # on_commit 在每个事务提交后调用（只修改看板设置时 changes 为空列表），on_reload 在重新解析数据文件后调用，
+        # on_sync 在协调者模式下将其他进程的提交应用到本地缓存后调用
+        self.listeners: List[Any] = []
+        self.history = HistoryStore(data_path)
+        self.listeners.append(self.history)
+        # 任务 ID 由独立的序列文件分配；数据文件中的 next_id 仅为兼容旧版本而同步写回
+        self.ids = IdSequence(data_path, self._initial_next_id, role=role)
         # 初始加载不需要锁，因为只是读取
         self.load()
 
+    def _stat_file(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            st = os.stat(self.data_path)
+        except OSError:
+            return None
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    def refresh(self) -> bool:
+        """
+        仅当数据文件被其他进程修改过时才重新加载
+        :return: 是否真正执行了重新加载
+        """
+        if self._file_stamp is not None and self._stat_file() == self._file_stamp:
+            metrics.incr("reloads_avoided")
+            return False
+        self.load()
+        return True
+
     def load(self):
+        with metrics.phase("load"):
+            self._load()
+
+    def _load(self):
+        self._file_stamp = self._stat_file()
         if os.path.exists(self.data_path):
+            metrics.incr("reloads")
+            try:
+                data = None
+                if self.read_only:
+                    loaded = snapshot.load(self.data_path)
+                    if loaded is not None:
+                        # 以实际打开的版本为准，os.stat 之后文件可能已被替换
+                        data, self._file_stamp = loaded
+                if data is None:
+                    with open(self.data_path, 'r', encoding='utf-8') as f:
+                        data = json.load(f)
+                self.data = data
+            except (json.JSONDecodeError, IOError) as e:
+                self.data = self._recover(e)
+            # 确保 default_tier 存在
+            if "default_tier" not in self.data:
+                self.data["default_tier"] = "LV"
+            self._notify("on_reload")
+
+    def _recover(self, error: Exception) -> Dict[str, Any]:
+        """
+        数据文件损坏时改为加载最新的可用备份，并把损坏的文件另存为 <数据文件>.corrupt 以便排查
+        下一次保存会以备份内容覆盖数据文件；没有可用备份时抛出 DataFileError，而不是以空看板覆盖原数据
+        """
+        name = self.backups.latest_valid()
+        if name is None:
+            raise DataFileError(f"Could not load {self.data_path} and no usable backup exists: {error}") from error
+        if not self.read_only:
             try:
-                with open(self.data_path, 'r', encoding='utf-8') as f:
-                    self.data = json.load(f)
-                    # 确保 default_tier 存在
-                    if "default_tier" not in self.data:
-                        self.data["default_tier"] = "LV"
-            except (json.JSONDecodeError, IOError):
-                self.data = {"tasks": {}, "next_id": 1, "default_tier": "LV"}
+                shutil.copyfile(self.data_path, self.data_path + ".corrupt")
+            except OSError:
+                pass
+        metrics.incr("recovered_loads")
+        self.recovered_from = name
+        return self.backups.read(name)
+
+    def _initial_next_id(self) -> int:
+        """序列文件不存在时的起始值：不小于 next_id，也不小于现有最大数字 ID + 1"""
+        if self._tx_owner is None:
+            self.refresh()
+        numeric = [int(tid) for tid in self.data["tasks"] if tid.isdigit()]
+        return max([self.data.get("next_id", 1)] + [n + 1 for n in numeric])
+
+    def _notify(self, event: str, *args):
+        for listener in self.listeners:
+            handler = getattr(listener, event, None)
+            if handler is not None:
+                handler(*args)
+
+    def _track(self, task_id: str, editor: str):
+        """在修改任务之前调用，记录其修改前的状态（每个事务中只记录第一次）"""
+        if task_id in self._pending:
+            self._pending[task_id] = (self._pending[task_id][0], editor)
+        else:
+            self._pending[task_id] = (copy.deepcopy(self.data["tasks"].get(task_id)), editor)
+        for saved in self._savepoints:
+            if task_id not in saved:
+                saved[task_id] = copy.deepcopy(self.data["tasks"].get(task_id))
 
     def save(self):
+        with metrics.phase("save"):
+            self._save()
+
+    def _save(self):
+        """
+        写入临时文件并 fsync 后原子地替换数据文件：崩溃时数据文件要么是旧版本要么是新版本，不会被截断
+        已有的 inode 从不被改写，备份因此可以在不持有写锁的情况下复制数据文件
+        写入失败时清理临时文件后重新抛出，由 transaction() 回滚内存中的修改，调用者不会误以为已经保存
+        """
         os.makedirs(os.path.dirname(self.data_path), exist_ok=True)
+        # 文档版本号：每次保存加一，供只读的报表工具判断看到的是哪个快照
+        self.data["version"] = self.data.get("version", 0) + 1
+        tmp_path = f"{self.data_path}.{os.getpid()}.tmp"
         try:
-            with open(self.data_path, 'w', encoding='utf-8') as f:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
                 json.dump(self.data, f, indent=4, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.data_path)
         except IOError:
-            pass
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+        self._file_stamp = self._stat_file()
+        if self._file_stamp:
+            metrics.incr("saves")
+            metrics.incr("bytes_written", self._file_stamp[2])
 
     @contextmanager
     def transaction(self):
         """
         事务上下文：获取锁 -> 重新加载数据 -> 执行操作 -> 保存数据 -> 释放锁
+        同一线程内嵌套的事务直接并入外层事务，只在最外层加锁、加载与保存一次（用于批量操作）
         """
+        if self._tx_owner == threading.get_ident():
+            self._tx_depth += 1
+            try:
+                yield
+            finally:
+                self._tx_depth -= 1
+            return
+        if self.read_only:
+            raise ReadOnlyError(f"{self.data_path} is opened as a read-only snapshot")
+
         with self.file_lock.lock():
-            self.load()  # 关键：在持有锁的情况下重新加载最新数据
+            self.refresh()  # 关键：在持有锁的情况下确保数据为最新（文件未变化时跳过解析）
+            self._tx_owner, self._tx_depth = threading.get_ident(), 1
+            self._pending = {}
+            try:
+                start = time.perf_counter()
+                yield
+                metrics.add_phase_time("mutate", (time.perf_counter() - start) * 1000)
+                self.save()
+            except BaseException:
+                # 事务失败：重新加载以丢弃内存中未提交的修改；数据文件尚未创建时恢复为空看板
+                self._pending = {}
+                if os.path.exists(self.data_path):
+                    self.load()
+                else:
+                    self.data = {"tasks": {}, "next_id": 1, "default_tier": "LV"}
+                    self._notify("on_reload")
+                raise
+            finally:
+                self._tx_owner, self._tx_depth = None, 0
+            # 仍持有锁时通知监听者，保证多进程追加历史的顺序与写入顺序一致
+            pending, self._pending = self._pending, {}
+            changes = [(tid, before, self.data["tasks"].get(tid), editor) for tid, (before, editor) in pending.items()]
+            self._notify("on_commit", changes)
+
+    @contextmanager
+    def savepoint(self):
+        """
+        事务内的保存点：块内抛出异常时撤销块内的全部修改（看板设置与经 _track 记录的任务），异常继续向外抛出，
+        外层事务不受影响；用于批量执行时让失败的单条命令不留下部分写入
+        """
+        if self._tx_owner != threading.get_ident():
+            raise RuntimeError("savepoint() must be used inside a transaction")
+        tasks = self.data["tasks"]
+        settings = copy.deepcopy({k: v for k, v in self.data.items() if k != "tasks"})
+        pending = dict(self._pending)
+        saved: Dict[str, Optional[Dict[str, Any]]] = {}
+        self._savepoints.append(saved)
+        try:
             yield
-            self.save()
+        except BaseException:
+            for tid, before in saved.items():
+                if before is None:
+                    tasks.pop(tid, None)
+                else:
+                    tasks[tid] = before
+            self.data = {**settings, "tasks": tasks}
+            self._pending = pending
+            raise
+        finally:
+            self._savepoints.pop()
 
     def set_default_tier(self, tier: str):
         with self.transaction():
             self.data["default_tier"] = tier
 
-    def add_task(self, title: str, creator: str) -> str:
+    def save_view(self, name: str, query: str, criteria: Dict[str, str], creator: str):
+        """保存（或覆盖）一个命名的搜索视图，随看板一起保存"""
         with self.transaction():
-            task_id = str(self.data["next_id"])
-            self.data["tasks"][task_id] = {
-                "title": title,
+            self.data.setdefault("views", {})[name] = {
+                "query": query,
+                "criteria": dict(criteria),
                 "creator": creator,
-                "description": "",
-                "status": Status.IN_PROGRESS.value,
-                "tier": self.data.get("default_tier", "LV"),
-                "priority": "Medium",
-                "labels": [],
-                "collaborators": [],
-                "dependencies": [],
-                "notes": [],
                 "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
-                "last_updated": time.strftime("%Y-%m-%d %H:%M:%S"),
-                "last_editor": creator
             }
-            self.data["next_id"] += 1
+
+    def delete_view(self, name: str) -> bool:
+        with self.transaction():
+            return self.data.get("views", {}).pop(name, None) is not None
+
+    def _new_task(self, title: str, creator: str) -> Dict[str, Any]:
+        """按当前默认值构建一个新任务"""
+        return {
+            "title": title,
+            "creator": creator,
+            "description": "",
+            "status": Status.IN_PROGRESS.value,
+            "tier": self.data.get("default_tier", "LV"),
+            "priority": "Medium",
+            "labels": [],
+            "collaborators": [],
+            "dependencies": [],
+            "notes": [],
+            "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "last_updated": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "last_editor": creator
+        }
+
+    def _sync_next_id(self, task_id: str):
+        if task_id.isdigit():
+            self.data["next_id"] = max(self.data.get("next_id", 1), int(task_id) + 1)
+
+    def add_task(self, title: str, creator: str, parent: Optional[str] = None) -> str:
+        """
+        :param parent: 父任务 ID，与任务在同一事务中写入
+        """
+        # 在获取数据文件锁之前分配 ID
+        task_id = self.ids.allocate()
+        with self.transaction():
+            # 旧版本可能绕过序列文件写入过任务，遇到已占用的 ID 时继续向后分配
+            while task_id in self.data["tasks"]:
+                task_id = self.ids.allocate()
+            self._track(task_id, creator)
+            task = self.data["tasks"][task_id] = self._new_task(title, creator)
+            if parent:
+                task["parent"] = parent
+            self._sync_next_id(task_id)
             return task_id
 
+    def _normalize_imported(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        以新任务的默认值补全导入行，并校验字段类型与枚举值
+        只保留已知字段；类型不符的字段（如对象形式的标题）使用默认值，列表中无法表示为文本的元素与格式不符的笔记被丢弃
+        """
+        task = self._new_task("", _import_text(row.get("creator")) or "Import")
+        for key in IMPORT_TEXT_FIELDS:
+            value = _import_text(row.get(key))
+            if value:
+                task[key] = value
+        task["status"] = Status.validate(task["status"]) or Status.IN_PROGRESS.value
+        task["tier"] = Tier.validate(task["tier"]) or self.data.get("default_tier", "LV")
+        task["priority"] = Priority.validate(task["priority"]) or "Medium"
+        for key in IMPORT_LIST_FIELDS:
+            items = row.get(key) if isinstance(row.get(key), list) else []
+            task[key] = list(dict.fromkeys(text for text in map(_import_text, items) if text))
+            self._sort_collection(task[key], key)
+        notes = row.get("notes") if isinstance(row.get("notes"), list) else []
+        for note in notes:
+            if isinstance(note, dict):
+                fields = {key: _import_text(note.get(key)) for key in NOTE_FIELDS}
+                if None not in fields.values():
+                    task["notes"].append(fields)
+        return task
+
+    def import_tasks(self, rows: Iterable[Dict[str, Any]], id_remap: bool = False) -> Tuple[int, int]:
+        """
+        批量导入任务：整个导入在单个事务中完成，逐行消费 rows
+        重新分配 ID 时按块向序列文件预留，结束后归还未用完的部分
+        :param rows: 任务字典流，每项以 "id" 给出原任务 ID
+        :param id_remap: 为导入任务重新分配 ID，并同步改写依赖与父任务引用（无法解析的引用会被丢弃）；
+                         否则保留原 ID，ID 不是数字或与现有任务冲突的行将被跳过
+        :return: (导入数, 跳过数)
+        """
+        imported = skipped = 0
+        block = range(0)
+        try:
+            with self.transaction():
+                tasks = self.data["tasks"]
+                remap: Dict[str, str] = {}
+                remapped_ids: List[str] = []
+                max_kept = 0
+
+                for row in rows:
+                    old_id = str(row.get("id", "")).strip()
+                    if id_remap:
+                        new_id = ""
+                        while not new_id or new_id in tasks:
+                            if not block:
+                                block = self.ids.reserve(self.IMPORT_ID_BLOCK)
+                            new_id, block = str(block.start), block[1:]
+                        self._sync_next_id(new_id)
+                        if old_id:
+                            remap[old_id] = new_id
+                        remapped_ids.append(new_id)
+                    else:
+                        if not is_valid_task_id(old_id) or old_id in tasks:
+                            skipped += 1
+                            continue
+                        new_id = old_id
+                        max_kept = max(max_kept, int(old_id))
+                        self._sync_next_id(old_id)
+                    self._track(new_id, "Import")
+                    tasks[new_id] = self._normalize_imported(row)
+                    imported += 1
+
+                if id_remap:
+                    # 所有行读取完毕后再改写依赖与父任务，允许文件中引用出现在被引用任务之前
+                    for new_id in remapped_ids:
+                        task = tasks[new_id]
+                        task["dependencies"] = [remap[d] for d in task["dependencies"] if d in remap]
+                        self._sort_collection(task["dependencies"], "dependencies")
+                        if task.get("parent"):
+                            task["parent"] = remap.get(str(task["parent"]), "")
+
+                if max_kept:
+                    self.ids.ensure_above(max_kept)
+        finally:
+            self.ids.give_back(block)
+        return imported, skipped
+
     @staticmethod
     def _sort_collection(collection: List, key_type: str):
         """
@@ -124,6 +424,7 @@ class TodoManager:
             task = self.data["tasks"].get(task_id)
             if not task:
                 return False
+            self._track(task_id, editor)
 
             # 列表属性去重与自然排序 (包含 labels)
             if key in ["collaborators", "dependencies", "labels"]:
@@ -133,6 +434,12 @@ class TodoManager:
                 else:
                     return False
             else:
+                if key == "status" and value != task[key]:
+                    # 记录完成时间供统计使用；重新激活时清除
+                    if value == Status.DONE.value:
+                        task["completed_at"] = time.strftime("%Y-%m-%d %H:%M:%S")
+                    else:
+                        task.pop("completed_at", None)
                 task[key] = value
 
             task.update({
@@ -149,6 +456,7 @@ class TodoManager:
                 return False
 
             if value in task[key]:
+                self._track(task_id, editor)
                 task[key].remove(value)
                 task.update({
                     "last_updated": time.strftime("%Y-%m-%d %H:%M:%S"),
@@ -161,7 +469,70 @@ class TodoManager:
         with self.transaction():
             task = self.data["tasks"].get(task_id)
             if not task: return False
+            self._track(task_id, author)
             note = {"time": time.strftime("%Y-%m-%d %H:%M:%S"), "author": author, "content": content}
             task["notes"].append(note)
             task.update({"last_updated": note["time"], "last_editor": author})
             return True
+
+    def compact_notes(self, max_age_days: Optional[int] = None, keep_latest: Optional[int] = None) -> Dict[str, int]:
+        """
+        按保留策略将旧笔记移入压缩归档：早于 max_age_days 天的笔记，以及每个任务最新 keep_latest 条之外的笔记
+        两项为 0 时各自不生效，为 None 时使用配置的保留策略；任务中以 archived_notes 记录已归档的条数
+        :return: 归档的任务数、笔记数，数据文件压缩前后大小及归档增量
+        """
+        max_age_days = self.note_retention_days if max_age_days is None else max_age_days
+        keep_latest = self.note_retention_keep if keep_latest is None else keep_latest
+        cutoff = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(time.time() - max_age_days * 86400)) \
+            if max_age_days > 0 else None
+        result = {"tasks": 0, "notes": 0, "bytes_before": 0, "bytes_after": 0, "archive_bytes": 0}
+        with self.transaction():
+            result["bytes_before"] = self._file_stamp[2] if self._file_stamp else 0
+            for tid, task in self.data["tasks"].items():
+                notes = task.get("notes", [])
+                # 笔记按时间顺序追加，时间字符串格式可直接按字典序比较
+                split = len(notes) - keep_latest if keep_latest > 0 else 0
+                moved, kept = [], []
+                for i, note in enumerate(notes):
+                    (moved if i < split or (cutoff and note.get("time", "") < cutoff) else kept).append(note)
+                if not moved:
+                    continue
+                self._track(tid, "Compact")
+                result["archive_bytes"] += self.note_archive.append(tid, moved, task.get("archived_notes", 0))
+                task["notes"] = kept
+                task["archived_notes"] = task.get("archived_notes", 0) + len(moved)
+                result["tasks"] += 1
+                result["notes"] += len(moved)
+        result["bytes_after"] = self._file_stamp[2] if self._file_stamp else 0
+        return result
+
+    def take_backup(self) -> Optional[str]:
+        """立即生成一代备份（不持有写锁）；数据未变化时返回 None"""
+        return self.backups.take()
+
+    def restore_backup(self, name: str, editor: str = "Restore") -> bool:
+        """
+        以一代备份替换看板内容，作为一次普通事务提交：变更历史与变更通知照常记录，恢复操作本身也可以再次回滚
+        恢复前先为当前数据生成一代备份；next_id 不回退，已分配的 ID 不会被重复使用
+        :return: 备份不存在时返回 False；备份损坏时抛出 ValueError
+        """
+        try:
+            restored = self.backups.read(name)
+        except FileNotFoundError:
+            return False
+        self.backups.take()
+        now = time.strftime("%Y-%m-%d %H:%M:%S")
+        with self.transaction():
+            current = self.data["tasks"]
+            for tid in set(current) | set(restored["tasks"]):
+                task = restored["tasks"].get(tid)
+                if current.get(tid) == task:
+                    continue
+                self._track(tid, editor)
+                if task is not None:
+                    task.update({"last_updated": now, "last_editor": editor})
+            restored["next_id"] = max(self.data.get("next_id", 1), restored.get("next_id", 1))
+            restored.setdefault("default_tier", "LV")
+            self.data = restored
+        self.recovered_from = None
+        return True
@@ -1,13 +1,192 @@
+import functools
+import inspect
+from typing import Dict, Optional, Set, Tuple
+
 from mcdreforged.api.all import PluginServerInterface, CommandSource, CommandContext, RText, RColor, RStyle
-from mcdreforged.api.command import Literal, Integer, GreedyText, Text
+from mcdreforged.api.command import Literal, Integer, GreedyText, Text, QuotableText
 
-from .controller import TodoController
+from . import transfer
+from .diagnostics import memory_report, allocation_sampler
+from .boards import BoardRegistry, ALL_BOARDS, is_valid_board_name
 from .interface import UI
 from .utils import Utils
-from .constants import COMMAND_PREFIX, GT_TIERS
+from .completion import match_options, enum_options
+from .constants import COMMAND_PREFIX, GT_TIERS, PROP_ALIASES, LIST_PROP_ALIASES
 from .enums import Status, Tier, Priority
+from .deadlines import DEADLINE_FIELDS
+from .fuzzy import FUZZY_FIELDS
+from .metrics import metrics
+
+
+def timed(name: str, callback):
+    """
+    为指令回调包装耗时统计
+    MCDR 按回调的参数个数决定传入 (source) 还是 (source, context)，包装后统一接收两者
+    """
+    takes_context = len(inspect.signature(callback).parameters) >= 2
+
+    def wrapper(source: CommandSource, context: CommandContext):
+        with metrics.command(name):
+            if takes_context:
+                callback(source, context)
+            else:
+                callback(source)
+    return wrapper
+
+
+SUGGESTION_LIMIT = 30
+# due/remind 的补全候选：相对时间与清除
+DEADLINE_SUGGESTIONS = ["+1h", "+1d", "+3d", "+1w", "none"]
+# 搜索条件的键名 -> 字段
+SEARCH_FIELDS = {
+    't': 'title', 'title': 'title', 's': 'status', 'stat': 'status', 'status': 'status', 'tier': 'tier',
+    'p': 'priority', 'prio': 'priority', 'priority': 'priority', 'c': 'creator', 'creator': 'creator',
+    'collab': 'collaborator', 'collaborator': 'collaborator', 'l': 'label', 'label': 'label', 'b': 'board', 'board': 'board',
+}
+SEARCH_KEYS = ['t=', 's=', 'tier=', 'p=', 'c=', 'collab=', 'l=', 'b=']
+# 字段 -> 最短的键，用于拼出修正后的查询
+SEARCH_SHORT_KEYS = {field: key[:-1] for key in SEARCH_KEYS for field in [SEARCH_FIELDS[key[:-1]]]}
+
+
+def parse_query(query_raw: str) -> Tuple[Dict[str, str], Optional[str], Set[str]]:
+    """
+    解析搜索条件，例如 "c=playerA s=!Done title=机器"
+    :return: (条件, b= 指定的看板, 以 ~ 开头要求模糊匹配的字段)
+    """
+    criteria = {}
+    board_scope = None
+    fuzzy_fields = set()
+    for part in query_raw.split():
+        if '=' in part:
+            key, val = part.split('=', 1)
+            # 映射简写
+            field = SEARCH_FIELDS.get(key.lower())
+            if field == 'board': board_scope = val
+            elif field is not None: criteria[field] = val
+        else:
+            # 没有等号的部分视为标题关键词（只取最后一个）
+            field = 'title'
+            criteria['title'] = part
+        if field in FUZZY_FIELDS and criteria.get(field, '').startswith('~'):
+            criteria[field] = criteria[field][1:]
+            fuzzy_fields.add(field)
+    return criteria, board_scope, fuzzy_fields
+
+
+def register_mcdr_commands(server: PluginServerInterface, boards: BoardRegistry):
+    # --- Board Resolution ---
+
+    def player_of(source: CommandSource) -> str:
+        return source.player if source.is_player else "Console"
+
+    def board_of(source: CommandSource):
+        """玩家（或控制台）当前使用的看板控制器"""
+        return boards.for_player(player_of(source))
+
+    def resolve_task(source: CommandSource, context: CommandContext):
+        """
+        解析指令中的任务 ID，支持 "<看板>:<ID>" 形式的限定 ID
+        :return: (控制器, 任务ID)；看板名无效时回复错误并返回 (None, None)
+        """
+        try:
+            _, controller, tid = boards.resolve_id(player_of(source), str(context['id']))
+        except ValueError:
+            source.reply(Utils.error_msg(server, 'sakuraflow.board.invalid_name', str(context['id']).split(':', 1)[0]))
+            return None, None
+        return controller, tid
+
+    # --- Suggestions ---
+    # 补全只查询各看板的前缀索引，不扫描任务，每次最多返回 SUGGESTION_LIMIT 条
+
+    def typed(context: CommandContext, name: str) -> str:
+        """正在输入的参数：已能解析时取解析结果，否则为剩余输入"""
+        return context.command_remaining or str(context.get(name, ""))
+
+    def complete_ids(source: CommandSource, prefix: str, open_first: bool = True, exclude=()) -> list:
+        """任务 ID 补全，支持 "<看板>:<ID>" 形式的限定 ID"""
+        if ":" in prefix:
+            board, local = prefix.split(":", 1)
+            if board not in boards.names():
+                return []
+            ids = boards.get(board).completion.task_ids(local, SUGGESTION_LIMIT, open_first, exclude)
+            return [f"{board}:{tid}" for tid in ids]
+        return board_of(source).completion.task_ids(prefix, SUGGESTION_LIMIT, open_first, exclude)
+
+    def id_arg(open_first: bool = True) -> Text:
+        """任务 ID 参数节点；open_first 为 False 时优先推荐已完成的任务"""
+        def provider(source: CommandSource, context: CommandContext):
+            with metrics.command('suggest'):
+                return complete_ids(source, typed(context, 'id'), open_first)
+        return Text('id').suggests(provider)
+
+    def prop_arg() -> Text:
+        return Text('prop').suggests(lambda src, ctx: match_options(PROP_ALIASES, typed(ctx, 'prop'), SUGGESTION_LIMIT))
+
+    def list_prop_arg() -> Text:
+        return Text('list_prop').suggests(
+            lambda src, ctx: match_options(LIST_PROP_ALIASES, typed(ctx, 'list_prop'), SUGGESTION_LIMIT))
+
+    def target_task(source: CommandSource, context: CommandContext):
+        try:
+            _, controller, tid = boards.resolve_id(player_of(source), str(context.get('id', '')))
+        except ValueError:
+            return None, None, None
+        return controller, tid, controller.get_task(tid)
+
+    def suggest_set_value(source: CommandSource, context: CommandContext):
+        prop = PROP_ALIASES.get(str(context.get('prop', '')).lower())
+        if prop == 'parent':
+            controller, tid, _ = target_task(source, context)
+            if controller is None:
+                return []
+            return controller.completion.task_ids(typed(context, 'value'), SUGGESTION_LIMIT, True, [tid])
+        if prop in DEADLINE_FIELDS:
+            return match_options(DEADLINE_SUGGESTIONS, typed(context, 'value'), SUGGESTION_LIMIT)
+        options = {'status': Status, 'tier': Tier, 'priority': Priority}.get(prop)
+        return match_options(enum_options(options), typed(context, 'value'), SUGGESTION_LIMIT) if options else []
+
+    def suggest_append_value(source: CommandSource, context: CommandContext):
+        with metrics.command('suggest'):
+            prop = LIST_PROP_ALIASES.get(str(context.get('list_prop', '')).lower())
+            controller, tid, task = target_task(source, context)
+            if prop is None or controller is None:
+                return []
+            prefix, existing = typed(context, 'value'), (task or {}).get(prop, [])
+            if prop == 'dependencies':
+                # 依赖优先推荐未完成的任务，排除任务自身与已有依赖
+                return controller.completion.task_ids(prefix, SUGGESTION_LIMIT, True, [tid, *existing])
+            kind = 'players' if prop == 'collaborators' else 'labels'
+            return controller.completion.complete(kind, prefix, SUGGESTION_LIMIT, existing)
+
+    def suggest_remove_value(source: CommandSource, context: CommandContext):
+        prop = LIST_PROP_ALIASES.get(str(context.get('list_prop', '')).lower())
+        _, _, task = target_task(source, context)
+        if prop is None or task is None:
+            return []
+        return match_options(task.get(prop, []), typed(context, 'value'), SUGGESTION_LIMIT)
+
+    def suggest_query(source: CommandSource, context: CommandContext):
+        """补全搜索条件的最后一项：键名，或 键=值 中的值"""
+        with metrics.command('suggest'):
+            query = typed(context, 'query')
+            head, _, last = query.rpartition(' ')
+            head = head + ' ' if head else ''
+            if '=' not in last:
+                return [head + key for key in match_options(SEARCH_KEYS, last, SUGGESTION_LIMIT)]
+            key, value = last.split('=', 1)
+            field = SEARCH_FIELDS.get(key.lower())
+            if field in ('status', 'tier', 'priority'):
+                values = match_options(enum_options({'status': Status, 'tier': Tier, 'priority': Priority}[field]),
+                                       value, SUGGESTION_LIMIT)
+            elif field == 'board':
+                values = match_options(boards.names() + [ALL_BOARDS], value, SUGGESTION_LIMIT)
+            elif field is not None:
+                kind = {'title': 'title_words', 'label': 'labels'}.get(field, 'players')
+                values = board_of(source).completion.complete(kind, value, SUGGESTION_LIMIT)
+            else:
+                values = []
+            return [f"{head}{key}={v}" for v in values]
 
-def register_mcdr_commands(server: PluginServerInterface, controller: TodoController):
     # --- Command Callbacks ---
 
     def on_welcome(source: CommandSource):
@@ -18,21 +197,35 @@ def register_mcdr_commands(server: PluginServerInterface, controller: TodoContro
 
     def on_list(source: CommandSource, context: CommandContext):
         page = context.get("page", 1)
+        controller = board_of(source)
         # 使用 search_tasks 获取非 Done 任务
         tasks = controller.search_tasks({'status': '!Done'})
         UI.render_paged_list(source, tasks, controller.manager, 'sakuraflow.list.header', 'sakuraflow.list.empty', 
-                             input_page=page, cmd_prefix="list")
+                             input_page=page, cmd_prefix="list",
+                             subtasks=controller.rollups)
+
+    def on_mine(source: CommandSource, context: CommandContext):
+        page = context.get("page", 1)
+        controller = board_of(source)
+        tasks_db = controller.manager.data["tasks"]
+        tasks = {tid: tasks_db[tid] for tid in controller.assignments.open_tasks(player_of(source))}
+        UI.render_paged_list(source, tasks, controller.manager, 'sakuraflow.mine.header', 'sakuraflow.mine.empty',
+                             input_page=page, cmd_prefix="mine",
+                             subtasks=controller.rollups)
 
     def on_archive(source: CommandSource, context: CommandContext):
         page = context.get("page", 1)
+        controller = board_of(source)
         # 使用 search_tasks 获取 Done 任务
         tasks = controller.search_tasks({'status': 'Done'})
         UI.render_paged_list(source, tasks, controller.manager, 'sakuraflow.archive.header', 'sakuraflow.archive.empty', 
-                             input_page=page, cmd_prefix="archive")
+                             input_page=page, cmd_prefix="archive",
+                             subtasks=controller.rollups)
 
     def on_search(source: CommandSource, context: CommandContext):
         query_raw = context['query']
-        player_key = source.player if source.is_player else "Console"
+        player_key = player_of(source)
+        controller = board_of(source)
         
         # 尝试判断是否为纯数字（翻页）
         is_page = False
@@ -42,6 +235,8 @@ def register_mcdr_commands(server: PluginServerInterface, controller: TodoContro
             page = int(query_raw)
         
         results = None
+        header_key = 'sakuraflow.search.header'
+        did_you_mean = None
         
         if is_page:
             # 尝试从缓存获取
@@ -54,55 +249,85 @@ def register_mcdr_commands(server: PluginServerInterface, controller: TodoContro
             # 执行新搜索
             # 解析复合查询
             # 示例: "c=playerA s=!Done title=机器"
-            criteria = {}
-            parts = query_raw.split()
-            
-            for part in parts:
-                if '=' in part:
-                    key, val = part.split('=', 1)
-                    key = key.lower()
-                    
-                    # 映射简写
-                    if key in ['t', 'title']: criteria['title'] = val
-                    elif key in ['s', 'stat', 'status']: criteria['status'] = val
-                    elif key in ['tier']: criteria['tier'] = val
-                    elif key in ['p', 'prio', 'priority']: criteria['priority'] = val
-                    elif key in ['c', 'creator']: criteria['creator'] = val
-                    elif key in ['collab', 'collaborator']: criteria['collaborator'] = val
-                    elif key in ['l', 'label']: criteria['label'] = val
-                    # 可以添加更多映射
-                else:
-                    # 如果没有等号，默认视为标题搜索
-                    # 如果已经有标题搜索条件了，可以追加还是覆盖？
-                    # 简单起见，覆盖或者作为补充。这里假设用户只输入一个标题关键词。
-                    criteria['title'] = part
-
-            # 执行搜索并缓存
-            results = controller.search_tasks(criteria, cache_key=player_key)
+            criteria, board_scope, fuzzy_fields = parse_query(query_raw)
+
+            # 执行搜索并缓存；b=* 时在所有看板中搜索，结果以 "<看板>:<ID>" 标识
+            # 结果统一缓存在玩家当前看板上，翻页时从这里读取
+            if board_scope is None:
+                if not fuzzy_fields:
+                    results = controller.search_tasks(criteria, cache_key=player_key)
+                if fuzzy_fields or not results:
+                    # 指定了 ~ 或精确匹配没有结果时改用模糊匹配
+                    results, suggestions = controller.fuzzy_search(criteria, fuzzy_fields or None)
+                    controller.search_cache.set(player_key, query_raw, results)
+                    header_key = 'sakuraflow.search.fuzzy_header'
+                    options = []
+                    for field, words in suggestions.items():
+                        for word in words:
+                            corrected = dict(criteria, **{field: word})
+                            query = " ".join(f"{SEARCH_SHORT_KEYS[f]}={v}" for f, v in corrected.items())
+                            options.append((f"{SEARCH_SHORT_KEYS[field]}={word}", query))
+                    if options:
+                        did_you_mean = UI.render_did_you_mean(server, options)
+            elif board_scope == ALL_BOARDS:
+                results = boards.search_all(criteria)
+                controller.search_cache.set(player_key, query_raw, results)
+            elif is_valid_board_name(board_scope):
+                results = {f"{board_scope}:{tid}": task for tid, task in boards.get(board_scope).iter_tasks(criteria)}
+                controller.search_cache.set(player_key, query_raw, results)
+            else:
+                source.reply(Utils.error_msg(server, 'sakuraflow.board.invalid_name', board_scope))
+                return
             page = 1 # 新搜索重置为第一页
 
         # 渲染搜索结果
-        UI.render_paged_list(source, results, controller.manager, 'sakuraflow.search.header', 'sakuraflow.search.empty', 
-                             input_page=page, cmd_prefix="search")
+        UI.render_paged_list(source, results, controller.manager, header_key, 'sakuraflow.search.empty', 
+                             input_page=page, cmd_prefix="search",
+                             subtasks=controller.rollups)
+        if did_you_mean is not None:
+            source.reply(did_you_mean)
 
 
     def on_add(source: CommandSource, context: CommandContext):
-        creator = source.player if source.is_player else "Console"
-        tid = controller.add_task(context['title'], creator)
+        creator = player_of(source)
+        parent = context.get('parent')
+        parent = str(parent).lstrip('#') if parent is not None else None
+        tid = board_of(source).add_task(context['title'], creator, parent)
+        if tid is None:
+            source.reply(Utils.error_msg(server, 'sakuraflow.msg.parent_not_found', parent))
+            return
         tid_text = RText(f"#{tid}", color=RColor.green, styles=RStyle.bold)
         source.reply(Utils.info_msg(server, 'sakuraflow.msg.add_success', tid_text))
 
-    def on_info(source: CommandSource, context: CommandContext):
-        tid = str(context['id'])
+    def on_info(source: CommandSource, context: CommandContext, show_all: bool = False):
+        controller, tid = resolve_task(source, context)
+        if controller is None:
+            return
         task = controller.get_task(tid)
         if not task:
             source.reply(Utils.error_msg(server, 'sakuraflow.msg.not_found'))
             return
-        source.reply(UI.render_task_info(tid, task, controller.manager.data["tasks"], server))
+        archived = controller.get_archived_notes(tid) if show_all else None
+        rollups = controller.rollups
+        source.reply(UI.render_task_info(tid, task, controller.manager.data["tasks"], server, archived,
+                                         rollups.rollup(tid) if rollups is not None else None))
+
+    def on_history(source: CommandSource, context: CommandContext):
+        controller, tid = resolve_task(source, context)
+        if controller is None:
+            return
+        entries = controller.get_task_history(tid)
+        if not entries and not controller.get_task(tid):
+            source.reply(Utils.error_msg(server, 'sakuraflow.msg.not_found'))
+            return
+        source.reply(UI.render_history(tid, entries, server))
 
     def on_set(source: CommandSource, context: CommandContext):
-        editor = source.player if source.is_player else "Console"
-        success, val, err = controller.set_property(str(context['id']), context['prop'], context['value'], editor)
+        editor = player_of(source)
+        controller, tid = resolve_task(source, context)
+        if controller is None:
+            return
+        success, val, err = controller.set_property(tid, context['prop'], context['value'], editor)
         
         if not success:
             if err == 'sakuraflow.msg.invalid_tier':
@@ -114,6 +339,8 @@ def register_mcdr_commands(server: PluginServerInterface, controller: TodoContro
             elif err == 'sakuraflow.msg.invalid_status':
                 status_list = Utils.list_to_rtext([Status.get_rtext(s.value) for s in Status])
                 source.reply(Utils.error_msg(server, err, status_list))
+            elif err in ('sakuraflow.msg.invalid_time', 'sakuraflow.msg.parent_not_found'):
+                source.reply(Utils.error_msg(server, err, context['value']))
             else:
                 source.reply(Utils.error_msg(server, err or 'sakuraflow.msg.unknown_error', context.get('prop')))
             return
@@ -122,17 +349,21 @@ def register_mcdr_commands(server: PluginServerInterface, controller: TodoContro
         # 需要重新获取 real_prop 对应的显示文本，这里稍微有点 hack，因为 controller 已经处理了逻辑
         # 简单起见，我们直接用 context['prop'] 作为显示，或者让 controller 返回 real_prop
         # 为了更好的体验，这里简单处理：
-        rval = RText(val)
+        rval = RText(val) if val != "" else RText(server.tr('sakuraflow.common.none'), color=RColor.gray)
         # 尝试美化显示
         if Tier.validate(val): rval = Tier.get_rtext(val)
         elif Priority.validate(val): rval = Priority.get_rtext(val, server)
         elif Status.validate(val): rval = Status.get_rtext(val, server)
+        if val and PROP_ALIASES.get(context['prop'].lower()) == 'parent': rval = RText(f"#{val}", color=RColor.aqua)
         
         source.reply(Utils.info_msg(server, 'sakuraflow.msg.set_success', context['id'], context['prop'], rval))
 
     def on_append(source: CommandSource, context: CommandContext):
-        editor = source.player if source.is_player else "Console"
-        success, err = controller.append_list_property(str(context['id']), context['list_prop'], str(context['value']), editor)
+        editor = player_of(source)
+        controller, tid = resolve_task(source, context)
+        if controller is None:
+            return
+        success, err = controller.append_list_property(tid, context['list_prop'], str(context['value']), editor)
         
         if not success:
             if err == 'sakuraflow.msg.dep_not_found':
@@ -144,8 +375,11 @@ def register_mcdr_commands(server: PluginServerInterface, controller: TodoContro
         source.reply(Utils.info_msg(server, 'sakuraflow.msg.append_success', context['id'], context['list_prop'], context['value']))
 
     def on_remove(source: CommandSource, context: CommandContext):
-        editor = source.player if source.is_player else "Console"
-        success, err = controller.remove_list_property(str(context['id']), context['list_prop'], str(context['value']), editor)
+        editor = player_of(source)
+        controller, tid = resolve_task(source, context)
+        if controller is None:
+            return
+        success, err = controller.remove_list_property(tid, context['list_prop'], str(context['value']), editor)
         
         if not success:
              source.reply(Utils.error_msg(server, 'sakuraflow.msg.remove_failed', context['value']))
@@ -154,24 +388,175 @@ def register_mcdr_commands(server: PluginServerInterface, controller: TodoContro
         source.reply(Utils.info_msg(server, 'sakuraflow.msg.remove_success', context['id'], context['list_prop'], context['value']))
 
     def on_note(source: CommandSource, context: CommandContext):
-        author = source.player if source.is_player else "Console"
-        if controller.add_note(str(context['id']), context['content'], author):
+        controller, tid = resolve_task(source, context)
+        if controller is not None and controller.add_note(tid, context['content'], player_of(source)):
             source.reply(Utils.info_msg(server, 'sakuraflow.msg.note_success', context['id']))
 
     def on_status_change(source: CommandSource, context: CommandContext, status: Status, msg_key: str):
-        editor = source.player if source.is_player else "Console"
-        if controller.update_status(str(context['id']), status, editor):
+        controller, tid = resolve_task(source, context)
+        if controller is not None and controller.update_status(tid, status, player_of(source)):
             source.reply(Utils.info_msg(server, msg_key, context['id']))
 
     def on_default_tier(source: CommandSource, context: CommandContext):
-        if controller.set_default_tier(context['tier']):
+        if board_of(source).set_default_tier(context['tier']):
              source.reply(Utils.info_msg(server, 'sakuraflow.msg.default_tier_success', context['tier']))
         else:
              tier_list = Utils.list_to_rtext([Tier.get_rtext(t.value) for t in Tier])
              source.reply(Utils.error_msg(server, 'sakuraflow.msg.invalid_tier', len(GT_TIERS) - 1, tier_list))
 
+    def on_export(source: CommandSource, context: CommandContext):
+        fmt, path = context['format'].lower(), context['path']
+        if fmt not in transfer.FORMATS:
+            source.reply(Utils.error_msg(server, 'sakuraflow.msg.invalid_format', fmt, ", ".join(transfer.FORMATS)))
+            return
+        try:
+            with open(path, 'w', encoding='utf-8', newline='') as f:
+                count = transfer.export_tasks(board_of(source).manager.data["tasks"], f, fmt)
+        except OSError as e:
+            source.reply(Utils.error_msg(server, 'sakuraflow.msg.transfer_failed', e))
+            return
+        source.reply(Utils.info_msg(server, 'sakuraflow.msg.export_success', count, path))
+
+    def on_import(source: CommandSource, context: CommandContext, id_remap: bool = False):
+        fmt, path = context['format'].lower(), context['path']
+        if fmt not in transfer.FORMATS:
+            source.reply(Utils.error_msg(server, 'sakuraflow.msg.invalid_format', fmt, ", ".join(transfer.FORMATS)))
+            return
+        try:
+            with open(path, 'r', encoding='utf-8', newline='') as f:
+                imported, skipped = board_of(source).import_tasks(transfer.read_tasks(f, fmt), id_remap)
+        except (OSError, ValueError) as e:
+            source.reply(Utils.error_msg(server, 'sakuraflow.msg.transfer_failed', e))
+            return
+        source.reply(Utils.info_msg(server, 'sakuraflow.msg.import_success', imported, skipped))
+
+    def on_compact(source: CommandSource):
+        r = board_of(source).compact_notes()
+        source.reply(Utils.info_msg(server, 'sakuraflow.msg.compact_success', r["tasks"], r["notes"], r["bytes_before"],
+                                    r["bytes_after"], r["bytes_before"] - r["bytes_after"], r["archive_bytes"]))
+
+    def on_backup(source: CommandSource):
+        name = board_of(source).take_backup()
+        if name:
+            source.reply(Utils.info_msg(server, 'sakuraflow.backup.taken', name))
+        else:
+            source.reply(Utils.info_msg(server, 'sakuraflow.backup.unchanged'))
+
+    def on_backup_list(source: CommandSource):
+        source.reply(UI.render_backup_list(server, board_of(source).list_backups()))
+
+    def on_backup_restore(source: CommandSource, context: CommandContext):
+        name = context['name']
+        try:
+            restored = board_of(source).restore_backup(name, player_of(source))
+        except ValueError as e:
+            source.reply(Utils.error_msg(server, 'sakuraflow.backup.invalid', name, e))
+            return
+        if restored:
+            source.reply(Utils.info_msg(server, 'sakuraflow.backup.restored', name))
+        else:
+            source.reply(Utils.error_msg(server, 'sakuraflow.backup.not_found', name))
+
+    def on_view_list(source: CommandSource):
+        source.reply(UI.render_view_list(server, board_of(source).list_views()))
+
+    def on_view_save(source: CommandSource, context: CommandContext):
+        name, query = context['name'], context['query']
+        if not is_valid_board_name(name):
+            source.reply(Utils.error_msg(server, 'sakuraflow.view.invalid_name', name))
+            return
+        criteria, board_scope, fuzzy_fields = parse_query(query)
+        # 物化视图只支持当前看板上的精确条件
+        if board_scope is not None or fuzzy_fields or not criteria:
+            source.reply(Utils.error_msg(server, 'sakuraflow.view.invalid_query', query))
+            return
+        board_of(source).save_view(name, query, criteria, player_of(source))
+        source.reply(Utils.info_msg(server, 'sakuraflow.view.saved', name))
+
+    def on_view_run(source: CommandSource, context: CommandContext):
+        name, page = context['name'], context.get('page', 1)
+        controller = board_of(source)
+        results = controller.run_view(name)
+        if results is None:
+            source.reply(Utils.error_msg(server, 'sakuraflow.view.not_found', name))
+            return
+        UI.render_paged_list(source, results, controller.manager, 'sakuraflow.view.header', 'sakuraflow.search.empty',
+                             input_page=page, cmd_prefix=f"view run {name}",
+                             subtasks=controller.rollups)
+
+    def on_view_delete(source: CommandSource, context: CommandContext):
+        name = context['name']
+        if board_of(source).delete_view(name):
+            source.reply(Utils.info_msg(server, 'sakuraflow.view.deleted', name))
+        else:
+            source.reply(Utils.error_msg(server, 'sakuraflow.view.not_found', name))
+
+    def suggest_view_name(source: CommandSource, context: CommandContext):
+        return match_options(board_of(source).list_views(), typed(context, 'name'), SUGGESTION_LIMIT)
+
+    def on_board_list(source: CommandSource):
+        # 只统计已加载看板的任务数，列出看板不会触发加载
+        counts = {name: len(c.manager.data["tasks"]) for name, c in boards.loaded().items()}
+        source.reply(UI.render_board_list(server, boards.names(), counts, boards.current(player_of(source))))
+
+    def on_board_use(source: CommandSource, context: CommandContext):
+        name = context['name']
+        if not is_valid_board_name(name):
+            source.reply(Utils.error_msg(server, 'sakuraflow.board.invalid_name', name))
+            return
+        boards.use(player_of(source), name)
+        source.reply(Utils.info_msg(server, 'sakuraflow.board.use_success', name))
+
+    def on_report(source: CommandSource):
+        for line in UI.render_report(server, board_of(source).report()):
+            source.reply(line)
+
+    def on_due(source: CommandSource, context: CommandContext):
+        days = context.get('days', 7)
+        controller = board_of(source)
+        source.reply(UI.render_due_list(server, controller.upcoming_deadlines(days), controller.manager.data["tasks"],
+                                        days))
+
+    def on_tree(source: CommandSource, context: CommandContext):
+        controller, tid = resolve_task(source, context)
+        if controller is None:
+            return
+        if not controller.get_task(tid):
+            source.reply(Utils.error_msg(server, 'sakuraflow.msg.not_found'))
+            return
+        source.reply(UI.render_tree(server, tid, controller.subtask_tree(tid), controller.manager.data["tasks"],
+                                    controller.subtasks))
+
+    def on_stats(source: CommandSource):
+        for line in UI.render_stats(server, metrics.snapshot()):
+            source.reply(line)
+
+    def on_debug_lock(source: CommandSource):
+        source.reply(UI.render_lock_report(server, board_of(source).manager.file_lock.diagnose()))
+
+    def on_debug_memory(source: CommandSource):
+        source.reply(UI.render_memory_report(server, memory_report(board_of(source))))
+
+    def on_debug_memory_trace(source: CommandSource, context: CommandContext):
+        commands = context['commands']
+        allocation_sampler.start(commands)
+        source.reply(Utils.info_msg(server, 'sakuraflow.debug.memory.trace_started', commands))
+
 
     # --- Command Tree Definition ---
+
+    # 所有指令回调统一包装耗时统计
+    on_welcome, on_help = timed('welcome', on_welcome), timed('help', on_help)
+    on_list, on_archive, on_search = timed('list', on_list), timed('archive', on_archive), timed('search', on_search)
+    # 在 on_info 被重新绑定为包装后的回调之前绑定原始回调
+    on_info_all = timed('info', functools.partial(on_info, show_all=True))
+    on_add, on_info, on_note = timed('add', on_add), timed('info', on_info), timed('note', on_note)
+    on_history = timed('history', on_history)
+    on_board_list, on_board_use = timed('board', on_board_list), timed('board', on_board_use)
+    on_set, on_append, on_remove = timed('set', on_set), timed('append', on_append), timed('remove', on_remove)
+    on_default_tier, on_stats = timed('default_tier', on_default_tier), timed('stats', on_stats)
+    on_export, on_debug_lock = timed('export', on_export), timed('debug', on_debug_lock)
+    on_debug_memory, on_debug_memory_trace = timed('debug', on_debug_memory), timed('debug', on_debug_memory_trace)
     
     # Nodes
     node_root = Literal(COMMAND_PREFIX).runs(on_welcome)
@@ -181,55 +566,123 @@ def register_mcdr_commands(server: PluginServerInterface, controller: TodoContro
     node_list = Literal('list').runs(on_list).then(Integer('page').runs(on_list))
     node_list_alias = Literal('l').runs(on_list).then(Integer('page').runs(on_list))
     
+    node_mine = Literal('mine').runs(timed('mine', on_mine)).then(Integer('page').runs(timed('mine', on_mine)))
+
     node_archive = Literal('archive').runs(on_archive).then(Integer('page').runs(on_archive))
     node_archive_alias = Literal('ar').runs(on_archive).then(Integer('page').runs(on_archive))
     
-    node_search = Literal('search').then(GreedyText('query').runs(on_search))
-    node_search_alias = Literal('find').then(GreedyText('query').runs(on_search))
+    node_search = Literal('search').then(GreedyText('query').suggests(suggest_query).runs(on_search))
+    node_search_alias = Literal('find').then(GreedyText('query').suggests(suggest_query).runs(on_search))
 
-    node_add = Literal('add').then(GreedyText('title').runs(on_add))
-    node_add_alias = Literal('a').then(GreedyText('title').runs(on_add))
+    def add_args(node: Literal) -> Literal:
+        """add 的参数：标题，或以 --parent <id> 开头，创建为该任务的子任务"""
+        parent_arg = Text('parent').suggests(lambda src, ctx: complete_ids(src, typed(ctx, 'parent')))
+        return node.then(Literal('--parent').then(parent_arg.then(GreedyText('title').runs(on_add)))) \
+            .then(GreedyText('title').runs(on_add))
+
+    node_add = add_args(Literal('add'))
+    node_add_alias = add_args(Literal('a'))
     
-    node_info = Literal('info').then(Text('id').runs(on_info))
-    node_info_alias = Literal('i').then(Text('id').runs(on_info))
+    node_info = Literal('info').then(id_arg().runs(on_info).then(Literal('all').runs(on_info_all)))
+    node_info_alias = Literal('i').then(id_arg().runs(on_info).then(Literal('all').runs(on_info_all)))
     
+    node_board = Literal('board').runs(on_board_list).then(
+        Literal('list').runs(on_board_list)
+    ).then(
+        Literal('use').then(Text('name').runs(on_board_use))
+    )
+
+    node_view = Literal('view').runs(on_view_list).then(
+        Literal('list').runs(on_view_list)
+    ).then(
+        Literal('save').then(Text('name').suggests(suggest_view_name).then(
+            GreedyText('query').suggests(suggest_query).runs(on_view_save)))
+    ).then(
+        Literal('run').then(Text('name').suggests(suggest_view_name).runs(timed('view_run', on_view_run))
+                            .then(Integer('page').runs(timed('view_run', on_view_run))))
+    ).then(
+        Literal('delete').then(Text('name').suggests(suggest_view_name).runs(on_view_delete))
+    )
+
+    node_history = Literal('history').then(id_arg().runs(on_history))
+
     node_set = Literal('set').then(
-        Text('id').then(
-            Text('prop').then(
-                GreedyText('value').runs(on_set)
+        id_arg().then(
+            prop_arg().then(
+                GreedyText('value').suggests(suggest_set_value).runs(on_set)
             )
         )
     )
-    node_set_alias = Literal('s').then(Text('id').then(Text('prop').then(GreedyText('value').runs(on_set))))
+    node_set_alias = Literal('s').then(id_arg().then(prop_arg().then(GreedyText('value').suggests(suggest_set_value).runs(on_set))))
 
-    node_append = Literal('append').then(Text('id').then(Text('list_prop').then(GreedyText('value').runs(on_append))))
-    node_append_alias = Literal('ap').then(Text('id').then(Text('list_prop').then(GreedyText('value').runs(on_append))))
+    node_append = Literal('append').then(id_arg().then(list_prop_arg().then(GreedyText('value').suggests(suggest_append_value).runs(on_append))))
+    node_append_alias = Literal('ap').then(id_arg().then(list_prop_arg().then(GreedyText('value').suggests(suggest_append_value).runs(on_append))))
 
-    node_remove = Literal('remove').then(Text('id').then(Text('list_prop').then(GreedyText('value').runs(on_remove))))
-    node_remove_alias = Literal('rm').then(Text('id').then(Text('list_prop').then(GreedyText('value').runs(on_remove))))
+    node_remove = Literal('remove').then(id_arg().then(list_prop_arg().then(GreedyText('value').suggests(suggest_remove_value).runs(on_remove))))
+    node_remove_alias = Literal('rm').then(id_arg().then(list_prop_arg().then(GreedyText('value').suggests(suggest_remove_value).runs(on_remove))))
 
-    node_note = Literal('note').then(Text('id').then(GreedyText('content').runs(on_note)))
-    node_note_alias = Literal('n').then(Text('id').then(GreedyText('content').runs(on_note)))
+    node_note = Literal('note').then(id_arg().then(GreedyText('content').runs(on_note)))
+    node_note_alias = Literal('n').then(id_arg().then(GreedyText('content').runs(on_note)))
 
-    node_complete = Literal('complete').then(Text('id').runs(lambda s, c: on_status_change(s, c, Status.DONE, 'sakuraflow.msg.complete_success')))
-    node_pause = Literal('pause').then(Text('id').runs(lambda s, c: on_status_change(s, c, Status.ON_HOLD, 'sakuraflow.msg.pause_success')))
-    node_resume = Literal('resume').then(Text('id').runs(lambda s, c: on_status_change(s, c, Status.IN_PROGRESS, 'sakuraflow.msg.resume_success')))
-    node_restore = Literal('restore').then(Text('id').runs(lambda s, c: on_status_change(s, c, Status.IN_PROGRESS, 'sakuraflow.msg.restore_success')))
+    node_complete = Literal('complete').then(id_arg().runs(timed('complete', lambda s, c: on_status_change(s, c, Status.DONE, 'sakuraflow.msg.complete_success'))))
+    node_pause = Literal('pause').then(id_arg().runs(timed('pause', lambda s, c: on_status_change(s, c, Status.ON_HOLD, 'sakuraflow.msg.pause_success'))))
+    node_resume = Literal('resume').then(id_arg().runs(timed('resume', lambda s, c: on_status_change(s, c, Status.IN_PROGRESS, 'sakuraflow.msg.resume_success'))))
+    node_restore = Literal('restore').then(id_arg(open_first=False).runs(timed('restore', lambda s, c: on_status_change(s, c, Status.IN_PROGRESS, 'sakuraflow.msg.restore_success'))))
 
-    node_default_tier = Literal('default_tier').then(Text('tier').runs(on_default_tier))
+    node_default_tier = Literal('default_tier').then(
+        Text('tier').suggests(lambda src, ctx: match_options(enum_options(Tier), typed(ctx, 'tier'), SUGGESTION_LIMIT))
+        .runs(on_default_tier)
+    )
+
+    node_report = Literal('report').runs(timed('report', on_report))
+    node_tree = Literal('tree').then(id_arg().runs(timed('tree', on_tree)))
+    node_due = Literal('due').runs(timed('due', on_due)).then(Integer('days').at_min(0).runs(timed('due', on_due)))
+    node_stats = Literal('stats').requires(lambda src: src.has_permission(3)).runs(on_stats)
+    node_compact = Literal('compact').requires(lambda src: src.has_permission(3)).runs(timed('compact', on_compact))
+    node_backup = Literal('backup').requires(lambda src: src.has_permission(3)).runs(timed('backup', on_backup)).then(
+        Literal('list').runs(on_backup_list)
+    ).then(
+        Literal('restore').then(Text('name').runs(timed('backup_restore', on_backup_restore)))
+    )
+    node_debug = Literal('debug').requires(lambda src: src.has_permission(3)).then(
+        Literal('lock').runs(on_debug_lock)
+    ).then(
+        Literal('memory').runs(on_debug_memory)
+        .then(Literal('trace').then(Integer('commands').at_min(1).runs(on_debug_memory_trace)))
+    )
+
+    # 导入导出直接读写服务器文件，仅限控制台使用
+    node_export = Literal('export').requires(lambda src: src.is_console).then(
+        Text('format').then(QuotableText('path').runs(on_export))
+    )
+    node_import = Literal('import').requires(lambda src: src.is_console).then(
+        Text('format').then(
+            QuotableText('path').runs(timed('import', on_import))
+            .then(Literal('remap').runs(timed('import', lambda s, c: on_import(s, c, True))))
+        )
+    )
 
     # Assembly
     node_root.then(node_help)
     node_root.then(node_list).then(node_list_alias)
     node_root.then(node_archive).then(node_archive_alias)
+    node_root.then(node_mine)
     node_root.then(node_search).then(node_search_alias)
     node_root.then(node_add).then(node_add_alias)
     node_root.then(node_info).then(node_info_alias)
+    node_root.then(node_history)
+    node_root.then(node_board)
+    node_root.then(node_view)
+    node_root.then(node_report)
+    node_root.then(node_due)
+    node_root.then(node_tree)
     node_root.then(node_set).then(node_set_alias)
     node_root.then(node_append).then(node_append_alias)
     node_root.then(node_remove).then(node_remove_alias)
     node_root.then(node_note).then(node_note_alias)
     node_root.then(node_complete).then(node_pause).then(node_resume).then(node_restore)
     node_root.then(node_default_tier)
+    node_root.then(node_export).then(node_import)
+    node_root.then(node_stats).then(node_debug).then(node_compact).then(node_backup)
 
     server.register_command(node_root)
@@ -0,0 +1,191 @@
+import math
+import threading
+import time
+from collections import deque, defaultdict
+from contextlib import contextmanager
+from typing import Dict, Any, Optional, Callable, Iterable, List, Deque
+
+# 命令耗时的拆分阶段；render 为总耗时中除存储阶段以外的部分（查询、渲染与输出）
+PHASES = ("lock_wait", "load", "mutate", "save", "render")
+STORAGE_PHASES = PHASES[:-1]
+
+
+def percentile(sorted_samples: List[float], q: float) -> float:
+    """最近秩法求百分位数，输入需已排序"""
+    if not sorted_samples:
+        return 0.0
+    index = min(len(sorted_samples) - 1, max(0, math.ceil(q / 100 * len(sorted_samples)) - 1))
+    return sorted_samples[index]
+
+
+def summarize(samples: Iterable[float]) -> Dict[str, float]:
+    """样本分布的 p50/p95/p99、最大值与样本数"""
+    samples = sorted(samples)
+    result = {f"p{q}": round(percentile(samples, q), 3) for q in (50, 95, 99)}
+    result["max"] = round(samples[-1], 3) if samples else 0.0
+    result["count"] = len(samples)
+    return result
+
+
+class _CommandRecord:
+    __slots__ = ("name", "start", "phases")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.start = time.perf_counter()
+        self.phases: Dict[str, float] = defaultdict(float)
+
+
+class Metrics:
+    """
+    进程内的命令耗时统计
+    每个命令保留最近 window 次调用的各阶段耗时（滚动窗口），按需计算 p50/p95/p99；
+    另维护缓存命中、避免的重新加载、写入字节数等计数器
+    """
+    def __init__(self, window: int = 1000):
+        self.window = window
+        self.slow_threshold_ms: float = 500.0
+        self.slow_logger: Optional[Callable[[str], None]] = None
+        self.counters: Dict[str, int] = defaultdict(int)
+        self._samples: Dict[str, Dict[str, Deque[float]]] = {}
+        self._calls: Dict[str, int] = defaultdict(int)
+        # 与命令无关的独立分布，例如锁的等待/持有时间
+        self._distributions: Dict[str, Deque[float]] = {}
+        # 每条命令结束后调用，参数为命令名
+        self._finish_hooks: List[Callable[[str], None]] = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def configure(self, slow_threshold_ms: Optional[float] = None, window: Optional[int] = None,
+                  slow_logger: Optional[Callable[[str], None]] = None):
+        if slow_threshold_ms is not None:
+            self.slow_threshold_ms = slow_threshold_ms
+        if window is not None and window != self.window:
+            with self._lock:
+                self.window = window
+                self._samples = {}
+                self._distributions = {}
+        if slow_logger is not None:
+            self.slow_logger = slow_logger
+
+    def _stack(self) -> List[_CommandRecord]:
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    @contextmanager
+    def command(self, name: str):
+        """统计一次命令调用；嵌套调用（如批处理中的每一行）分别计入各自的命令"""
+        record = _CommandRecord(name)
+        stack = self._stack()
+        stack.append(record)
+        try:
+            yield
+        finally:
+            stack.pop()
+            self._finish(record)
+
+    @contextmanager
+    def phase(self, name: str):
+        """将耗时计入当前线程正在执行的命令的某个阶段；没有命令在执行时不做统计"""
+        stack = self._stack()
+        if not stack:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            stack[-1].phases[name] += (time.perf_counter() - start) * 1000
+
+    def add_phase_time(self, name: str, elapsed_ms: float):
+        stack = self._stack()
+        if stack:
+            stack[-1].phases[name] += elapsed_ms
+
+    def add_finish_hook(self, hook: Callable[[str], None]):
+        self._finish_hooks.append(hook)
+
+    def current_command(self) -> Optional[str]:
+        """当前线程正在执行的（最内层）命令名"""
+        stack = self._stack()
+        return stack[-1].name if stack else None
+
+    def incr(self, counter: str, amount: int = 1):
+        self.counters[counter] += amount
+
+    def observe(self, name: str, value_ms: float):
+        """向独立分布中记录一个样本"""
+        with self._lock:
+            samples = self._distributions.get(name)
+            if samples is None:
+                samples = self._distributions[name] = deque(maxlen=self.window)
+            samples.append(value_ms)
+
+    def samples(self, name: str) -> List[float]:
+        """独立分布中（窗口内）的原始样本，供跨进程汇总"""
+        with self._lock:
+            return list(self._distributions.get(name, ()))
+
+    def distribution(self, name: str) -> Dict[str, float]:
+        return summarize(self.samples(name))
+
+    def _finish(self, record: _CommandRecord):
+        total = (time.perf_counter() - record.start) * 1000
+        storage = sum(record.phases.get(p, 0.0) for p in STORAGE_PHASES)
+        values = {p: record.phases.get(p, 0.0) for p in STORAGE_PHASES}
+        values["render"] = max(0.0, total - storage)
+        values["total"] = total
+
+        with self._lock:
+            samples = self._samples.get(record.name)
+            if samples is None:
+                samples = self._samples[record.name] = {k: deque(maxlen=self.window) for k in values}
+            for key, value in values.items():
+                samples[key].append(value)
+            self._calls[record.name] += 1
+
+        for hook in self._finish_hooks:
+            hook(record.name)
+
+        if total >= self.slow_threshold_ms and self.slow_logger is not None:
+            breakdown = ", ".join(f"{p}={values[p]:.1f}ms" for p in PHASES)
+            self.slow_logger(f"Slow command '{record.name}' took {total:.1f}ms ({breakdown})")
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        导出统计快照
+        :return: {"commands": {名称: {"calls", "total": {p50,p95,p99}, "phases": {阶段: p50}}},
+                  "distributions": {名称: {p50,p95,p99,max,count}}, "counters": {...}}
+        """
+        commands = {}
+        with self._lock:
+            items = [(name, {k: sorted(v) for k, v in samples.items()}) for name, samples in self._samples.items()]
+            calls = dict(self._calls)
+        for name, samples in sorted(items):
+            total = samples["total"]
+            commands[name] = {
+                "calls": calls.get(name, 0),
+                "total": {f"p{q}": round(percentile(total, q), 3) for q in (50, 95, 99)},
+                "phases": {p: round(percentile(samples[p], 50), 3) for p in PHASES},
+            }
+
+        counters = dict(self.counters)
+        hits, misses = counters.get("cache_hits", 0), counters.get("cache_misses", 0)
+        counters["cache_hit_rate"] = round(hits / (hits + misses), 3) if hits + misses else 0.0
+        with self._lock:
+            names = sorted(self._distributions)
+        distributions = {name: self.distribution(name) for name in names}
+        return {"commands": commands, "distributions": distributions, "counters": counters}
+
+    def reset(self):
+        with self._lock:
+            self._samples = {}
+            self._distributions = {}
+            self._calls.clear()
+            self.counters.clear()
+
+
+# 进程级单例：插件、守护进程与 CLI 在各自进程中共用
+metrics = Metrics()
@@ -0,0 +1,54 @@
+import json
+import os
+import zlib
+from typing import Dict, Any, List
+
+
+class NoteArchive:
+    """
+    冷笔记归档：每个任务一个 zlib 压缩的 JSON Lines 文件，位于 <数据文件>.notes/<任务ID>.jsonl.z
+    归档内容不随主数据文件加载，仅在查看完整记录时按需解压
+    """
+    SUFFIX = ".jsonl.z"
+
+    def __init__(self, data_path: str):
+        self.directory = data_path + ".notes"
+
+    def path_for(self, task_id: str) -> str:
+        return os.path.join(self.directory, f"{task_id}{self.SUFFIX}")
+
+    def read(self, task_id: str) -> List[Dict[str, Any]]:
+        """读取任务的全部归档笔记（按时间先后），不存在时返回空列表"""
+        try:
+            with open(self.path_for(task_id), 'rb') as f:
+                raw = zlib.decompress(f.read())
+        except FileNotFoundError:
+            return []
+        return [json.loads(line) for line in raw.decode('utf-8').splitlines() if line]
+
+    def append(self, task_id: str, notes: List[Dict[str, Any]], committed: int) -> int:
+        """
+        将笔记追加到任务的归档中，整体重新压缩后原子替换
+        归档在事务提交前写入；事务失败时这些笔记仍留在数据文件中，归档里则多出未提交的部分。
+        因此只保留前 committed 条（即任务 archived_notes 记录的、已随数据文件提交的条数），丢弃其后的残留再追加，
+        重新归档同一批笔记不会产生重复
+        :param committed: 已提交的归档条数
+        :return: 归档文件大小的增量（字节）
+        """
+        path = self.path_for(task_id)
+        before = os.path.getsize(path) if os.path.exists(path) else 0
+        merged = self.read(task_id)[:committed] + notes
+        payload = "".join(json.dumps(n, ensure_ascii=False) + "\n" for n in merged).encode('utf-8')
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(zlib.compress(payload, 9))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        return os.path.getsize(path) - before
+
+    def total_size(self) -> int:
+        if not os.path.isdir(self.directory):
+            return 0
+        return sum(entry.stat().st_size for entry in os.scandir(self.directory) if entry.name.endswith(self.SUFFIX))
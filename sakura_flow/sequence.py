@@ -0,0 +1,85 @@
+import os
+import threading
+from typing import Callable, Optional
+
+from .lock import FileLock
+
+
+class IdSequence:
+    """
+    任务 ID 序列：下一个未分配的 ID 单独保存在 <数据文件>.seq 中，由独立的小锁保护
+    分配 ID 只需读写这一个数字，不需要加载整份数据文件，也不占用数据文件的写锁
+    长驻进程与批量导入以"租约"方式一次预留一段连续 ID，之后在本进程内逐个发放
+    """
+    def __init__(self, data_path: str, initial: Callable[[], int], role: str = "MCDR", block_size: int = 1):
+        """
+        :param initial: 序列文件不存在时提供起始值（沿用数据文件中的 next_id）
+        :param block_size: 每次向序列文件预留的 ID 数；大于 1 时各进程交替分配会使 ID 不连续
+        """
+        self.path = data_path + ".seq"
+        self.file_lock = FileLock(self.path + ".lock", timeout=5, delay=0.01, role=role)
+        self.initial = initial
+        self.block_size = max(1, block_size)
+        # 本进程持有的租约 [_next, _end)
+        self._next = self._end = 0
+        self._lock = threading.Lock()
+
+    def _read(self) -> Optional[int]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return int(f.read().strip())
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, value: int):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(str(value))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def peek(self) -> int:
+        """下一个尚未被任何进程预留的 ID"""
+        value = self._read()
+        return value if value is not None else self.initial()
+
+    def reserve(self, count: int) -> range:
+        """原子地预留 count 个连续 ID"""
+        with self.file_lock.lock():
+            start = self.peek()
+            self._write(start + count)
+        return range(start, start + count)
+
+    def ensure_above(self, task_id: int):
+        """保证之后分配的 ID 都大于 task_id（导入保留原 ID 时调用）"""
+        with self.file_lock.lock():
+            if self.peek() <= task_id:
+                self._write(task_id + 1)
+
+    def allocate(self) -> str:
+        """从本进程的租约中取出一个 ID，租约用尽时再向序列文件预留一段"""
+        with self._lock:
+            if self._next >= self._end:
+                block = self.reserve(self.block_size)
+                self._next, self._end = block.start, block.stop
+            task_id = self._next
+            self._next += 1
+            return str(task_id)
+
+    def give_back(self, block: range):
+        """
+        归还租约中未使用的部分：仅当此后没有其他进程预留过 ID 时才能回退序列，否则这些 ID 作废
+        """
+        if not block:
+            return
+        with self.file_lock.lock():
+            if self._read() == block.stop:
+                self._write(block.start)
+
+    def release(self):
+        """进程退出前归还本进程的剩余租约"""
+        with self._lock:
+            block, self._next, self._end = range(self._next, self._end), 0, 0
+        self.give_back(block)
@@ -0,0 +1,74 @@
+"""
+只读快照
+
+数据文件总是先完整写入临时文件再原子替换（见 TodoManager._save），路径上的每个 inode 都是一个完整且之后不再改变的版本，
+因此只读的报表与统计工具无需获取写锁，也不会读到写了一半的文件。
+本模块以 mmap 打开当前版本，并为每个版本发布一份偏移索引 <数据文件>.idx：第一个读取某个版本的进程扫描文件（见 lazy.scan）
+后原子地写出索引，之后读取同一版本的进程直接加载索引而不再扫描。索引以数据文件的 (inode, mtime_ns, size) 标识其所属版本，
+与当前版本不符时视为失效并重新生成。
+"""
+import json
+import os
+from typing import Dict, Any, List, Optional, Tuple
+
+from . import lazy
+
+INDEX_SUFFIX = ".idx"
+
+Stamp = Tuple[int, int, int]
+
+
+def index_path_for(data_path: str) -> str:
+    return data_path + INDEX_SUFFIX
+
+
+def _read_index(path: str, stamp: Stamp) -> Optional[Tuple[Dict[str, Any], Dict[str, Tuple[int, int]]]]:
+    try:
+        with open(path, 'rb') as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(index, dict) or index.get("stamp") != list(stamp):
+        return None
+    offsets: List[int] = index["spans"]
+    spans = {tid: (offsets[2 * i], offsets[2 * i + 1]) for i, tid in enumerate(index["ids"])}
+    return index["header"], spans
+
+
+def _write_index(path: str, stamp: Stamp, header: Dict[str, Any], spans: Dict[str, Tuple[int, int]]):
+    """原子地发布索引；多个读取者同时发布同一版本的索引时内容相同，谁最后替换都一样"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    index = {"stamp": list(stamp), "header": header, "ids": list(spans),
+             "spans": [offset for span in spans.values() for offset in span]}
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, path)
+    except OSError:
+        # 索引只是缓存：数据目录只读等情况下放弃发布，不影响本次读取
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+def load(data_path: str) -> Optional[Tuple[Dict[str, Any], Stamp]]:
+    """
+    打开数据文件的最新完整版本，任务按需解码
+    :return: (数据, 该版本的 (inode, mtime_ns, size))；文件为空或布局不符合时返回 None，由调用方退回到完整解析
+    """
+    opened = lazy.open_buffer(data_path)
+    if opened is None:
+        return None
+    buf, stamp = opened
+    index_path = index_path_for(data_path)
+    indexed = _read_index(index_path, stamp)
+    if indexed is None:
+        indexed = lazy.scan(buf)
+        if indexed is None:
+            return None
+        _write_index(index_path, stamp, *indexed)
+    header, spans = indexed
+    if spans:
+        header["tasks"] = lazy.LazyTasks(buf, spans)
+    return header, stamp
@@ -0,0 +1,114 @@
+"""
+任务的流式导入/导出
+
+支持两种格式，均为 UTF-8 编码、每个任务一行，读写时逐行处理而不在内存中构建完整输出：
+
+* jsonl: 每行一个 JSON 对象 {"id": "<任务ID>", <任务字段>...}，列表属性与笔记保持为 JSON 数组
+* csv:   首行为表头 (EXPORT_FIELDS)，标量字段原样写出；
+         列表属性 (labels/collaborators/dependencies) 与笔记 (notes) 以紧凑 JSON 文本写入单元格，
+         例如 ["iron","farm"] 与 [{"time": "...", "author": "...", "content": "..."}]
+"""
+import csv
+import json
+from typing import Dict, Any, Iterable, Iterator, TextIO, Optional
+
+FORMATS = ("jsonl", "csv")
+
+EXPORT_FIELDS = [
+    "id", "title", "creator", "description", "status", "tier", "priority",
+    "labels", "collaborators", "dependencies", "notes",
+    "created_at", "last_updated", "last_editor", "completed_at", "due", "remind", "parent"
+]
+
+# CSV 中以 JSON 文本编码的字段
+JSON_ENCODED_FIELDS = {"labels", "collaborators", "dependencies", "notes"}
+
+
+def guess_format(path: Optional[str], default: str = "jsonl") -> str:
+    """根据文件扩展名推断格式"""
+    if path and path.lower().endswith(".csv"):
+        return "csv"
+    if path and path.lower().endswith((".jsonl", ".ndjson")):
+        return "jsonl"
+    return default
+
+
+def _id_key(tid: str):
+    return (0, int(tid), "") if tid.isdigit() else (1, 0, tid)
+
+
+def iter_export_rows(tasks: Dict[str, Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """按任务 ID 的自然顺序逐个产出导出行"""
+    for tid in sorted(tasks, key=_id_key):
+        row = {"id": tid}
+        row.update(tasks[tid])
+        yield row
+
+
+def write_jsonl(rows: Iterable[Dict[str, Any]], fp: TextIO) -> int:
+    count = 0
+    for row in rows:
+        fp.write(json.dumps(row, ensure_ascii=False))
+        fp.write("\n")
+        count += 1
+    return count
+
+
+def write_csv(rows: Iterable[Dict[str, Any]], fp: TextIO) -> int:
+    writer = csv.DictWriter(fp, fieldnames=EXPORT_FIELDS, extrasaction='ignore')
+    writer.writeheader()
+    count = 0
+    for row in rows:
+        encoded = dict(row)
+        for field in JSON_ENCODED_FIELDS:
+            encoded[field] = json.dumps(row.get(field, []), ensure_ascii=False, separators=(',', ':'))
+        writer.writerow(encoded)
+        count += 1
+    return count
+
+
+def read_jsonl(fp: TextIO) -> Iterator[Dict[str, Any]]:
+    for lineno, line in enumerate(fp, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"line {lineno}: {e}") from e
+        if not isinstance(row, dict):
+            raise ValueError(f"line {lineno}: expected a JSON object")
+        yield row
+
+
+def read_csv(fp: TextIO) -> Iterator[Dict[str, Any]]:
+    reader = csv.DictReader(fp)
+    for row in reader:
+        decoded: Dict[str, Any] = {k: v for k, v in row.items() if k is not None and v is not None}
+        for field in JSON_ENCODED_FIELDS:
+            raw = decoded.get(field)
+            if raw is None:
+                continue
+            try:
+                decoded[field] = json.loads(raw) if raw else []
+            except json.JSONDecodeError as e:
+                raise ValueError(f"line {reader.line_num}: invalid {field} cell: {e}") from e
+        yield decoded
+
+
+def export_tasks(tasks: Dict[str, Dict[str, Any]], fp: TextIO, fmt: str) -> int:
+    """
+    将任务流式写出
+    :return: 导出的任务数
+    """
+    rows = iter_export_rows(tasks)
+    if fmt == "csv":
+        return write_csv(rows, fp)
+    return write_jsonl(rows, fp)
+
+
+def read_tasks(fp: TextIO, fmt: str) -> Iterator[Dict[str, Any]]:
+    """逐行解析导入文件，产出包含 "id" 的任务字典"""
+    if fmt == "csv":
+        return read_csv(fp)
+    return read_jsonl(fp)
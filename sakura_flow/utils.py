@@ -2,7 +2,16 @@ from typing import Any, List
 
 from mcdreforged.api.all import ServerInterface, RTextList, RText, RColor, RTextBase, RAction
 
-from .constants import ITEMIZE_PREFIX, LIST_ITEM_SEPERATOR
+# --- UI Formatting ---
+# 富文本常量属于展示层，放在这里而非 constants，避免 CLI 路径导入 MCDR
+LIST_ITEM_SEPERATOR = RText(", ", color=RColor.gray)
+COLON = RText(": ", color=RColor.gray)
+ITEMIZE_PREFIX = [
+    RText("• ", color=RColor.gray),
+    RText("- ", color=RColor.gray),
+    RText("* ", color=RColor.gray),
+    RText("· ", color=RColor.gray)
+]
 
 
 class Utils:
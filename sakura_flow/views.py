@@ -0,0 +1,87 @@
+import bisect
+from typing import Dict, Any, List, Optional, Callable, Tuple
+
+from .manager import TodoManager
+
+# 与 TodoController.task_matches 相同的签名 (任务, 条件) -> 是否匹配
+Matcher = Callable[[Dict[str, Any], Dict[str, str]], bool]
+
+
+def _order_key(tid: str) -> Tuple[int, int, str]:
+    """数字 ID 按数值排序，排在非数字 ID 之前"""
+    return (0, int(tid), "") if tid.isdigit() else (1, 0, tid)
+
+
+class MaterializedView:
+    """一个已保存视图的物化结果：按 ID 有序的匹配任务列表"""
+    def __init__(self, criteria: Dict[str, str]):
+        self.criteria = dict(criteria)
+        self._keys: List[Tuple[Tuple[int, int, str], str]] = []
+
+    def __len__(self):
+        return len(self._keys)
+
+    def load(self, tids: List[str]):
+        self._keys = sorted((_order_key(tid), tid) for tid in tids)
+
+    def set_member(self, tid: str, member: bool):
+        key = (_order_key(tid), tid)
+        i = bisect.bisect_left(self._keys, key)
+        present = i < len(self._keys) and self._keys[i] == key
+        if member and not present:
+            self._keys.insert(i, key)
+        elif present and not member:
+            del self._keys[i]
+
+    def tids(self) -> List[str]:
+        return [tid for _, tid in self._keys]
+
+
+class ViewIndex:
+    """
+    已保存视图（命名的搜索条件）的物化结果
+    视图定义随看板保存在数据文件的 "views" 中；每个视图的结果在首次运行时计算一次，
+    之后随事务提交只对变更的任务重新判断是否匹配，运行视图不再扫描整个看板
+    定义被修改（包括其他进程的修改）时，只重新计算发生变化的视图
+    """
+    def __init__(self, manager: TodoManager, matcher: Matcher):
+        self.manager = manager
+        self.matcher = matcher
+        self._views: Dict[str, MaterializedView] = {}
+
+    def _ensure(self, name: str) -> Optional[MaterializedView]:
+        definition = self.manager.data.get("views", {}).get(name)
+        if definition is None:
+            self._views.pop(name, None)
+            return None
+        view = self._views.get(name)
+        if view is None or view.criteria != definition["criteria"]:
+            view = self._views[name] = MaterializedView(definition["criteria"])
+            view.load([tid for tid, task in self.manager.data["tasks"].items()
+                       if self.matcher(task, view.criteria)])
+        return view
+
+    # --- 监听者接口 ---
+
+    def on_commit(self, changes):
+        for name, view in list(self._views.items()):
+            if name not in self.manager.data.get("views", {}):
+                del self._views[name]
+                continue
+            for tid, _, after, _ in changes:
+                view.set_member(tid, after is not None and self.matcher(after, view.criteria))
+
+    on_sync = on_commit
+
+    def on_reload(self):
+        self._views = {}
+
+    # --- 查询 ---
+
+    def results(self, name: str) -> Optional[Dict[str, Dict[str, Any]]]:
+        """视图的当前结果 {任务ID: 任务}（按 ID 排序）；视图不存在时返回 None"""
+        view = self._ensure(name)
+        if view is None:
+            return None
+        tasks = self.manager.data["tasks"]
+        return {tid: tasks[tid] for tid in view.tids()}
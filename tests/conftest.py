@@ -16,3 +16,8 @@ def mock_controller():
     # 这样可以解耦测试
     controller = MagicMock()
     return controller
+
+
+def pytest_configure(config):
+    # 多进程压力测试：python -m pytest -m stress 单独运行，或以 -m "not stress" 跳过
+    config.addinivalue_line("markers", "stress: multi-process concurrency stress test")
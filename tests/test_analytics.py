@@ -0,0 +1,62 @@
+import argparse
+import io
+import json
+import time
+from datetime import date
+
+import pytest
+
+from sakura_flow.analytics import BoardAnalytics
+from sakura_flow.cli_entry import register_cli_commands, handle_cli_command
+from sakura_flow.controller import TodoController
+from sakura_flow.enums import Status
+from sakura_flow.manager import TodoManager
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """固定任务时间戳"""
+    now = ["2024-01-01 10:00:00"]
+    monkeypatch.setattr(time, "strftime", lambda fmt, t=None: now[0])
+    return now
+
+
+def test_report_counters_follow_mutations(tmp_path, clock):
+    controller = TodoController(TodoManager(str(tmp_path / 'tasks.json')))
+    a = controller.add_task("地基", "Steve")
+    b = controller.add_task("城墙", "Alex")
+    c = controller.add_task("塔楼", "Alex")
+    controller.append_list_property(b, "label", "build", "Alex")
+    controller.append_list_property(b, "collab", "Steve", "Alex")
+
+    analytics = controller.analytics
+    report = controller.report(days=3, weeks=2)
+    assert report["status"] == {"In Progress": 3} and report["creator"] == {"Alex": 2, "Steve": 1}
+    assert report["median_hours_to_done"] is None
+
+    # 完成时间取自 completed_at，耗时按创建时间计算；重新激活后撤销
+    clock[0] = "2024-01-02 12:00:00"
+    controller.update_status(a, Status.DONE, "Steve")
+    clock[0] = "2024-01-09 10:00:00"
+    controller.update_status(c, Status.DONE, "Alex")
+    controller.update_status(b, Status.DONE, "Alex")
+    controller.update_status(b, Status.IN_PROGRESS, "Alex")
+    report = analytics.report(days=2, weeks=2, today=date(2024, 1, 9))
+    assert report["status"] == {"Done": 2, "In Progress": 1} and report["open"] == 1
+    assert report["creator"] == {"Alex": 1} and report["label"] == {"build": 1}
+    assert report["busiest_collaborators"] == {"Steve": 1}
+    assert report["completed_per_day"] == {"2024-01-09": 1, "2024-01-08": 0}
+    assert report["completed_per_week"] == {"2024-W02": 1, "2024-W01": 1}
+    assert report["median_hours_to_done"] == 109.0
+
+    # 增量结果与全量重建一致；重新加载后重建
+    fresh = BoardAnalytics(controller.manager).ensure()
+    assert analytics.groups == fresh.groups and analytics.durations == fresh.durations
+    controller.manager.load()
+    assert analytics._entries is None
+
+    parser = argparse.ArgumentParser()
+    register_cli_commands(parser)
+    out = io.StringIO()
+    handle_cli_command(parser.parse_args(["report", "--format", "json"]), controller, out)
+    assert json.loads(out.getvalue())["total"] == 3
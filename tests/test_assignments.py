@@ -0,0 +1,33 @@
+from sakura_flow.assignments import AssignmentIndex
+from sakura_flow.controller import TodoController
+from sakura_flow.enums import Status
+from sakura_flow.manager import TodoManager
+
+
+def test_index_tracks_mutations_incrementally(tmp_path):
+    controller = TodoController(TodoManager(str(tmp_path / 'tasks.json')))
+    a = controller.add_task("地基", "Steve")
+    b = controller.add_task("城墙", "Alex")
+    c = controller.add_task("塔楼", "Alex")
+    controller.append_list_property(b, "dep", a, "Alex")
+    controller.append_list_property(c, "collab", "steve", "Alex")
+    controller.update_status(c, Status.ON_HOLD, "Alex")
+
+    index = controller.assignments
+    assert index.open_tasks("STEVE") == [a, c]
+    assert index.digest("Alex") == {"open": [b, c], "ready": [], "blocked": [b]}
+
+    # 索引已构建后，后续修改增量生效
+    controller.update_status(a, Status.DONE, "Steve")
+    controller.append_list_property(b, "collab", "Steve", "Alex")
+    assert index.digest("Steve") == {"open": [b, c], "ready": [b], "blocked": []}
+    controller.remove_list_property(c, "collab", "steve", "Alex")
+    assert index.open_tasks("steve") == [b]
+    assert index._by_player == AssignmentIndex(controller.manager)._ensure()
+
+    # 其他进程写入后重新解析，索引在下次查询时重建
+    other = TodoManager(controller.manager.data_path)
+    d = other.add_task("新任务", "Steve")
+    controller.manager.refresh()
+    assert index.open_tasks("steve") == [b, d]
+    assert "assignments" in controller.indexes
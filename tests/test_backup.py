@@ -0,0 +1,68 @@
+import json
+import os
+
+import pytest
+
+from sakura_flow.controller import TodoController
+from sakura_flow.manager import TodoManager, DataFileError
+
+
+def test_backup_rotates_and_skips_unchanged(tmp_path):
+    data_path = str(tmp_path / 'tasks.json')
+    manager = TodoManager(data_path)
+    manager.backups.keep = 2
+    manager.add_task("任务", "Steve")
+
+    first = manager.take_backup()
+    assert first is not None
+    # 数据未变化时不产生新备份；之后的保存不会改动已有备份
+    assert manager.take_backup() is None
+    manager.add_task("另一个任务", "Alex")
+    assert list(manager.backups.read(first)["tasks"]) == ["1"]
+
+    for i in range(3):
+        manager.add_note("1", f"进度 {i}", "Alex")
+        manager.take_backup()
+    assert len(manager.backups.generations()) == 2
+
+
+def test_corrupted_file_loads_latest_backup(tmp_path):
+    data_path = str(tmp_path / 'tasks.json')
+    manager = TodoManager(data_path)
+    manager.add_task("任务", "Steve")
+    manager.take_backup()
+    with open(data_path, 'w', encoding='utf-8') as f:
+        f.write('{"tasks": {"1": ')
+
+    recovered = TodoManager(data_path)
+    assert recovered.recovered_from is not None
+    assert recovered.data["tasks"]["1"]["title"] == "任务"
+    assert os.path.exists(data_path + ".corrupt")
+
+    # 没有可用备份时报错，而不是以空看板覆盖数据
+    other = str(tmp_path / 'other.json')
+    with open(other, 'w', encoding='utf-8') as f:
+        f.write('not json')
+    with pytest.raises(DataFileError):
+        TodoManager(other)
+
+
+def test_restore_is_recorded_and_reversible(tmp_path):
+    data_path = str(tmp_path / 'tasks.json')
+    controller = TodoController(TodoManager(data_path))
+    controller.add_task("任务", "Steve")
+    snapshot = controller.take_backup()
+    controller.set_property("1", "title", "改坏了", "Alex")
+    controller.add_task("新任务", "Alex")
+
+    assert not controller.restore_backup("19700101-000000", "Steve")
+    assert controller.restore_backup(snapshot, "Steve")
+    assert controller.get_task("1")["title"] == "任务" and controller.get_task("2") is None
+    with open(data_path, 'r', encoding='utf-8') as f:
+        assert json.load(f)["next_id"] == 3
+    assert controller.get_task_history("1")[-1]["editor"] == "Steve"
+
+    # 恢复前的状态已自动备份，可以撤销恢复
+    before_restore = controller.list_backups()[0]["name"]
+    assert controller.restore_backup(before_restore, "Steve")
+    assert controller.get_task("1")["title"] == "改坏了"
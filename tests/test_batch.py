@@ -0,0 +1,95 @@
+import io
+
+from sakura_flow.cli_entry import run_batch
+from sakura_flow.controller import TodoController
+from sakura_flow.manager import TodoManager
+
+SCRIPT = """
+# 夜间同步示例
+add "建造刷铁机" --creator Steve
+add 收集床
+append 1 dep 2
+set 1 tier 5
+note 2 "已收集 12 张床"
+set 1 tier 99
+bogus
+"""
+
+
+def make_controller(tmp_path):
+    return TodoController(TodoManager(str(tmp_path / 'tasks.json')))
+
+
+def test_batch_single_transaction(tmp_path, monkeypatch):
+    """整批命令只应保存一次，并逐行输出结果"""
+    controller = make_controller(tmp_path)
+    saves = []
+    original_save = controller.manager.save
+    monkeypatch.setattr(controller.manager, 'save', lambda: (saves.append(1), original_save()))
+
+    out = io.StringIO()
+    run_batch(io.StringIO(SCRIPT), controller, out)
+    lines = out.getvalue().splitlines()
+
+    assert len(saves) == 1
+    assert lines[0] == "3: Task created with ID: 1"
+    assert "8: Error: sakuraflow.msg.invalid_tier" in lines
+    assert lines[-2].startswith("9: Error:")
+    assert lines[-1] == "Batch finished: 7 command(s), 2 rejected."
+
+    reloaded = TodoManager(str(tmp_path / 'tasks.json'))
+    task = reloaded.data["tasks"]["1"]
+    assert task["tier"] == "IV" and task["dependencies"] == ["2"]
+    assert reloaded.data["tasks"]["2"]["notes"][0]["content"] == "已收集 12 张床"
+
+
+def test_batch_chunking(tmp_path, monkeypatch):
+    controller = make_controller(tmp_path)
+    saves = []
+    original_save = controller.manager.save
+    monkeypatch.setattr(controller.manager, 'save', lambda: (saves.append(1), original_save()))
+
+    run_batch(io.StringIO("\n".join(f"add t{i}" for i in range(5))), controller, io.StringIO(), chunk_size=2)
+    assert len(saves) == 3
+    assert len(controller.manager.data["tasks"]) == 5
+
+
+def test_batch_unexpected_error_rolls_back_chunk(tmp_path, monkeypatch):
+    """意外异常回滚整块时，该块的每一行都应报告为失败，其余块照常提交"""
+    controller = make_controller(tmp_path)
+    original = controller.add_note
+
+    def add_note(tid, *args, **kwargs):
+        if tid == "2":
+            raise RuntimeError("disk full")
+        return original(tid, *args, **kwargs)
+
+    monkeypatch.setattr(controller, 'add_note', add_note)
+    out = io.StringIO()
+    run_batch(io.StringIO("add a\nadd b\nnote 2 x\nadd c\nadd d"), controller, out, chunk_size=3)
+    assert out.getvalue().splitlines() == [
+        "1: Rolled back: line 3 failed",
+        "2: Rolled back: line 3 failed",
+        "3: Error: disk full",
+        "4: Task created with ID: 3",
+        "5: Task created with ID: 4",
+        "Batch finished: 5 command(s), 3 rejected.",
+    ]
+    reloaded = TodoManager(str(tmp_path / 'tasks.json'))
+    assert [t["title"] for t in reloaded.data["tasks"].values()] == ["c", "d"]
+
+
+def test_batch_reported_error_undoes_line(tmp_path):
+    """命令自行报告错误时（如导入文件中途格式错误），该行的部分写入被撤销并计为失败"""
+    controller = make_controller(tmp_path)
+    bad = tmp_path / 'bad.jsonl'
+    bad.write_text('{"id": "1", "title": "甲"}\n{"id": "2", "title": "乙"}\n{oops\n', encoding='utf-8')
+    out = io.StringIO()
+    run_batch(io.StringIO(f"add first\nimport {bad}\nset 1 tier 99\nset 1 tier 5"), controller, out)
+    lines = out.getvalue().splitlines()
+    assert lines[1].startswith("2: Error: ")
+    assert lines[-1] == "Batch finished: 4 command(s), 2 rejected."
+
+    reloaded = TodoManager(str(tmp_path / 'tasks.json'))
+    assert list(reloaded.data["tasks"]) == ["1"]
+    assert reloaded.data["tasks"]["1"]["tier"] == "IV"
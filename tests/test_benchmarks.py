@@ -0,0 +1,21 @@
+import json
+
+from benchmarks.generator import generate_board
+from benchmarks.suite import run_suite
+
+
+def test_generator_is_seeded():
+    """相同种子应生成相同的看板，依赖只指向更早的任务"""
+    board = generate_board(200, seed=42)
+    assert board == generate_board(200, seed=42)
+    assert board["next_id"] == 201
+    for tid, task in board["tasks"].items():
+        assert all(int(d) < int(tid) for d in task["dependencies"])
+
+
+def test_suite_smoke():
+    """以极小规模跑通整个基准套件，确保其不会随代码演进而失效"""
+    report = run_suite([50], repeat=1)
+    json.dumps(report)
+    groups = {r['group'] for r in report['results']}
+    assert {'manager', 'controller', 'search', 'render'} <= groups
@@ -0,0 +1,62 @@
+import argparse
+import io
+import json
+
+import pytest
+
+from sakura_flow.boards import BoardRegistry
+from sakura_flow.cli_entry import register_cli_commands, handle_cli_command
+
+
+@pytest.fixture
+def boards(tmp_path):
+    return BoardRegistry(str(tmp_path / 'sf_tasks' / 'tasks.json'))
+
+
+def test_boards_are_independent(boards, tmp_path):
+    main, build = boards.get(), boards.get("build")
+    assert boards.loaded().keys() == {"main", "build"}
+    assert main.add_task("主看板任务", "Steve") == "1"
+    assert build.add_task("建造组任务", "Alex") == "1"
+    build.set_default_tier("HV")
+    assert main.manager.data["default_tier"] == "LV"
+    assert (tmp_path / 'sf_tasks' / 'boards' / 'build.json').exists()
+
+    # 持有一个看板的锁时，另一个看板仍可写入
+    with main.manager.file_lock.lock():
+        assert build.add_task("不被阻塞", "Alex") == "2"
+
+    # 新进程只在访问时加载看板
+    other = BoardRegistry(boards.data_path)
+    assert other.names() == ["main", "build"] and not other.loaded()
+    assert set(other.search_all({"status": "!Done"})) == {"main:1", "build:1", "build:2"}
+
+    with pytest.raises(ValueError):
+        boards.get("../evil")
+
+
+def test_player_selection_and_qualified_ids(boards):
+    boards.get("build").add_task("建造组任务", "Alex")
+    boards.use("Alex", "build")
+    assert BoardRegistry(boards.data_path).current("Alex") == "build"
+    assert boards.current("Steve") == "main"
+
+    board, controller, tid = boards.resolve_id("Steve", "build:1")
+    assert board == "build" and controller.get_task(tid)["title"] == "建造组任务"
+    assert boards.resolve_id("Alex", "1")[0] == "build"
+
+
+def test_cli_board_fan_out(boards):
+    boards.get().add_task("主看板任务", "Steve")
+    boards.get("build").add_task("建造组任务", "Alex")
+    parser = argparse.ArgumentParser()
+    register_cli_commands(parser)
+
+    out = io.StringIO()
+    args = parser.parse_args(["--board", "*", "list", "--format", "jsonl", "--sort", "id"])
+    handle_cli_command(args, boards.get(), out, boards)
+    assert [json.loads(line)["id"] for line in out.getvalue().splitlines()] == ["build:1", "main:1"]
+
+    out = io.StringIO()
+    handle_cli_command(parser.parse_args(["--board", "*", "add", "x"]), boards.get(), out, boards)
+    assert out.getvalue().startswith("Error:")
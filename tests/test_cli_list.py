@@ -0,0 +1,65 @@
+import argparse
+import io
+import json
+
+import pytest
+
+from sakura_flow.cli_entry import register_cli_commands, handle_cli_command
+from sakura_flow.controller import TodoController
+from sakura_flow.enums import Status
+from sakura_flow.manager import TodoManager
+
+
+@pytest.fixture
+def controller(tmp_path):
+    controller = TodoController(TodoManager(str(tmp_path / 'tasks.json')))
+    with controller.manager.transaction():
+        for i, prio in enumerate(["Low", "Very High", "Medium", "High", "Medium"], start=1):
+            tid = controller.add_task(f"任务{i}\t", "Steve")
+            controller.set_property(tid, "priority", prio, "Steve")
+        controller.update_status("2", Status.DONE, "Steve")
+    return controller
+
+
+def run(controller, *argv) -> str:
+    parser = argparse.ArgumentParser()
+    register_cli_commands(parser)
+    out = io.StringIO()
+    handle_cli_command(parser.parse_args(["list", *argv]), controller, out)
+    return out.getvalue()
+
+
+def test_status_scope_in_query(controller):
+    ids = [row["id"] for row in map(json.loads, run(controller, "--format", "jsonl").splitlines())]
+    assert ids == ["1", "3", "4", "5"]
+    assert [r["id"] for r in json.loads(run(controller, "--archive", "--format", "json"))] == ["2"]
+    assert len(json.loads(run(controller, "--all", "--format", "json"))) == 5
+
+
+def test_sort_and_paging(controller):
+    rows = json.loads(run(controller, "--all", "--sort", "priority", "--offset", "1", "--limit", "2", "--format", "json"))
+    assert [r["id"] for r in rows] == ["4", "3"]
+    rows = json.loads(run(controller, "--sort", "id", "--reverse", "--limit", "2", "--format", "json"))
+    assert [r["id"] for r in rows] == ["5", "4"]
+    rows = json.loads(run(controller, "--limit", "0", "--format", "json"))
+    assert rows == []
+    # 负数的 offset/limit 与 0 等价
+    assert json.loads(run(controller, "--limit", "-1", "--format", "json")) == []
+    assert json.loads(run(controller, "--sort", "id", "--limit", "-1", "--format", "json")) == []
+    assert len(json.loads(run(controller, "--offset", "-3", "--format", "json"))) == 4
+
+
+def test_select_stops_scanning_early(controller, monkeypatch):
+    """未排序时取满 limit 条即停止扫描"""
+    checked = []
+    original = TodoController.task_matches
+    monkeypatch.setattr(TodoController, "task_matches",
+                        classmethod(lambda cls, task, criteria: checked.append(1) or original(task, criteria)))
+    assert len(list(controller.select_tasks({}, limit=2))) == 2
+    assert len(checked) == 2
+
+
+def test_tsv_escapes_cells(controller):
+    lines = run(controller, "--format", "tsv", "--limit", "1").splitlines()
+    assert lines[0] == "id\tstatus\ttier\tpriority\tcreator\ttitle"
+    assert lines[1] == "1\tIn Progress\tLV\tLow\tSteve\t任务1\\t"
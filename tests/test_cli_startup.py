@@ -0,0 +1,40 @@
+import os
+import subprocess
+import sys
+
+# 定义项目根目录
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CORE_MODULES = [
+    'sakura_flow',
+    'sakura_flow.constants',
+    'sakura_flow.enums',
+    'sakura_flow.manager',
+    'sakura_flow.controller',
+    'sakura_flow.cli_entry',
+]
+
+
+def test_cli_path_does_not_import_mcdr():
+    """
+    验证 CLI 路径上的核心模块只依赖标准库，不会导入 MCDReforged
+    """
+    code = (
+        "import sys\n"
+        f"sys.path.insert(0, {PROJECT_ROOT!r})\n"
+        + "".join(f"import {m}\n" for m in CORE_MODULES)
+        + "print(sorted({m.split('.')[0] for m in sys.modules} & {'mcdreforged'}))\n"
+    )
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+    assert out.strip() == "[]", "CLI 核心模块导入了 MCDReforged"
+
+
+def test_enum_colors_resolve_lazily():
+    """验证枚举颜色在需要时才解析为 RColor"""
+    from mcdreforged.api.all import RColor
+    from sakura_flow.enums import Status, Tier
+
+    assert Status.DONE.color_name == 'green'
+    assert Status.DONE.color == RColor.green
+    assert Tier.get_color('LuV') == RColor.light_purple
+    assert Tier.get_color('unknown') == RColor.white
@@ -1,4 +1,5 @@
 import pytest
+from unittest.mock import MagicMock
 from sakura_flow.mcdr_entry import register_mcdr_commands
 from mcdreforged.api.command import Literal
 
@@ -24,3 +25,28 @@ def test_command_registration(mock_server, mock_controller):
     # 由于 MCDR 的 CommandNode 内部结构可能随版本变化且不一定公开 children 属性，
     # 这里我们只验证根节点对象存在且类型正确。
     # 如果命令树构建逻辑有误（如 .then() 链式调用错误），上面的 register_mcdr_commands 通常会直接抛出异常。
+
+
+def test_info_all_command_runs(mock_server, tmp_path):
+    """实际执行 !!todo info <id> all，确认回调能以 (source, context) 调用"""
+    from sakura_flow.boards import BoardRegistry
+
+    mock_server.tr.side_effect = lambda key, *args: key
+    boards = BoardRegistry(str(tmp_path / 'tasks.json'))
+    boards.get().add_task("信标", "Steve")
+    register_mcdr_commands(mock_server, boards)
+    node_root = mock_server.register_command.call_args[0][0]
+
+    source = MagicMock()
+    source.get_server.return_value = mock_server
+    source.is_player = False
+
+    class Invoker:
+        def invoke_sync(self, func, args):
+            return func(*args)
+
+    for command in ("!!todo info 1 all", "!!todo i 1 all", "!!todo info 1"):
+        source.reply.reset_mock()
+        for entry in node_root._entry_execute(source, command):
+            entry.scheduled_callback.invoke(Invoker())
+        assert source.reply.called
@@ -0,0 +1,70 @@
+import time
+from unittest.mock import MagicMock
+
+from mcdreforged.api.all import PluginServerInterface, CommandSource
+
+from sakura_flow.boards import BoardRegistry
+from sakura_flow.completion import PrefixIndex
+from sakura_flow.controller import TodoController
+from sakura_flow.enums import Status
+from sakura_flow.manager import TodoManager
+from sakura_flow.mcdr_entry import register_mcdr_commands
+
+
+def test_prefix_index_counts_and_orders_by_length():
+    index = PrefixIndex()
+    for term in ["Redstone", "red", "RED", "redstone", "rail"]:
+        index.add(term)
+    assert index.complete("RE", 10) == ["red", "Redstone"]
+    index.discard("red")
+    assert index.complete("re", 10) == ["red", "Redstone"]
+    index.discard("Red")
+    assert index.complete("re", 10, exclude=["redstone"]) == []
+    assert index.complete("", 1) == ["rail"]
+
+
+def test_completion_index_on_large_board(tmp_path):
+    manager = TodoManager(str(tmp_path / 'tasks.json'))
+    manager.data["tasks"] = {
+        str(i): {"title": f"task {i}", "creator": f"player{i % 50}", "status": "Done" if i % 3 else "In Progress",
+                 "labels": [f"label{i % 200}"], "collaborators": [], "dependencies": [], "notes": []}
+        for i in range(1, 100001)
+    }
+    controller = TodoController(manager)
+    controller.completion.ensure()
+
+    start = time.perf_counter()
+    for prefix in ("1", "99", "123", "50"):
+        ids = controller.completion.task_ids(prefix, 30)
+        assert len(ids) == 30 and all(i.startswith(prefix) for i in ids)
+        # 未完成的任务排在前面，同一前缀下短 ID 在前
+        assert all(int(i) % 3 == 0 for i in ids)
+    assert controller.completion.complete("labels", "label19", 30)[0] == "label19"
+    assert (time.perf_counter() - start) * 1000 < 50
+
+
+def test_mcdr_suggestions(tmp_path):
+    boards = BoardRegistry(str(tmp_path / 'tasks.json'))
+    controller = boards.get()
+    for i in range(1, 13):
+        controller.add_task(f"任务 {i}", "Steve")
+    controller.update_status("1", Status.DONE, "Steve")
+    controller.append_list_property("2", "dep", "10", "Steve")
+    controller.append_list_property("3", "label", "Redstone", "Steve")
+
+    server = MagicMock(spec=PluginServerInterface)
+    register_mcdr_commands(server, boards)
+    root = server.register_command.call_args[0][0]
+    source = MagicMock(spec=CommandSource)
+    source.is_player, source.player = True, "Steve"
+
+    def suggest(command):
+        return [s.suggest_input for s in root._entry_generate_suggestions(source, command)]
+
+    # 依赖补全：未完成任务在前，排除任务自身与已有依赖
+    assert suggest("!!todo append 2 dep 1") == ["11", "12", "1"]
+    assert suggest("!!todo restore 1")[0] == "1"
+    assert suggest("!!todo append 4 l red") == ["Redstone"]
+    assert suggest("!!todo set 3 p h") == ["High", "h"]
+    assert suggest("!!todo search t=任") == ["t=任务"]
+    assert suggest("!!todo info main:1")[:2] == ["main:10", "main:11"]
@@ -0,0 +1,123 @@
+import io
+import time
+
+import pytest
+
+from sakura_flow import daemon
+from sakura_flow.boards import BoardRegistry, DEFAULT_BOARD
+from sakura_flow.coordinator import CoordinatorClient, CoordinatedController, CoordinatorCallError
+from sakura_flow.enums import Status
+
+pytestmark = pytest.mark.skipif(not daemon.is_supported(), reason="需要 Unix 域套接字")
+
+
+@pytest.fixture
+def coordinator(tmp_path):
+    data_path = str(tmp_path / 'sf_tasks' / 'tasks.json')
+    server = daemon.TodoDaemon(BoardRegistry(data_path, role="daemon"), daemon.default_socket_path(data_path))
+    server.start()
+    yield server
+    server.stop()
+
+
+def connect(coordinator) -> BoardRegistry:
+    boards = BoardRegistry(coordinator.boards.data_path)
+    client = CoordinatorClient(coordinator.socket_path)
+    assert client.connect()
+    boards.coordinator = client
+    return boards
+
+
+def wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return predicate()
+
+
+def test_writes_go_through_coordinator(coordinator):
+    lobby, survival = connect(coordinator), connect(coordinator)
+    controller = lobby.get()
+    assert isinstance(controller, CoordinatedController)
+
+    tid = controller.add_task("共享任务", "Steve")
+    # 写入方立即可见，协调者的内存状态同样已更新
+    assert lobby.get().get_task(tid)["title"] == "共享任务"
+    assert coordinator.boards.get().get_task(tid)["title"] == "共享任务"
+
+    # 其他实例通过变更通知更新缓存，无需重新读取文件
+    survival.get()
+    assert survival.get("build").add_task("建造组", "Alex") == "1"
+    assert wait_until(lambda: survival.get().get_task(tid) is not None)
+    assert survival.get().update_status(tid, Status.DONE, "Alex")
+    assert wait_until(lambda: lobby.get().get_task(tid)["status"] == Status.DONE.value)
+
+    # CLI 转发到协调者的修改同样会推送
+    assert daemon.forward(coordinator.socket_path, ['set', tid, 'title', '改名'], io.StringIO())
+    assert wait_until(lambda: lobby.get().get_task(tid)["title"] == "改名")
+
+
+def test_falls_back_when_coordinator_stops(coordinator):
+    boards = connect(coordinator)
+    controller = boards.get()
+    controller.add_task("协调者在线", "Steve")
+    coordinator.stop()
+    assert wait_until(lambda: not boards.coordinator.connected)
+
+    # 回退为直接读写文件
+    assert controller.add_task("直接写入", "Steve") == "2"
+    assert BoardRegistry(boards.data_path).get().get_task("2")["title"] == "直接写入"
+
+
+def test_remote_validation_error_is_value_error(coordinator, monkeypatch):
+    boards = connect(coordinator)
+    boards.get()
+
+    def reject(tier_val):
+        raise ValueError("bad tier")
+    monkeypatch.setattr(coordinator.boards.get(), "set_default_tier", reject)
+    with pytest.raises(ValueError, match="bad tier"):
+        boards.coordinator.call(DEFAULT_BOARD, "set_default_tier", ("LV",))
+    with pytest.raises(RuntimeError):
+        boards.coordinator.call(DEFAULT_BOARD, "no_such_method", ())
+
+
+def test_reconnects_after_coordinator_restart(coordinator):
+    boards = connect(coordinator)
+    controller = boards.get()
+    controller.add_task("重启前", "Steve")
+    coordinator.stop()
+    assert wait_until(lambda: not boards.coordinator.connected)
+
+    restarted = daemon.TodoDaemon(BoardRegistry(boards.data_path, role="daemon"), coordinator.socket_path)
+    restarted.start()
+    try:
+        restarted.boards.get().add_task("断开期间", "Alex")
+        # 下一次写入时重新连接，写操作重新交给协调者，断开期间的提交从文件补上
+        assert controller.add_task("重启后", "Steve") == "3"
+        assert boards.coordinator.connected
+        assert restarted.boards.get().get_task("3")["title"] == "重启后"
+        assert boards.get().get_task("2")["title"] == "断开期间"
+    finally:
+        restarted.stop()
+
+
+def test_lost_reply_is_not_executed_again_locally(coordinator, monkeypatch):
+    boards = connect(coordinator)
+    controller = boards.get()
+    hosted = coordinator.boards.get()
+    original = hosted.add_task
+
+    def slow_add(*args):
+        tid = original(*args)
+        time.sleep(0.5)
+        return tid
+    monkeypatch.setattr(hosted, "add_task", slow_add)
+    boards.coordinator.timeout = 0.1
+
+    # 协调者已提交但回复超时：抛出异常而不是在本地再写一次
+    with pytest.raises(CoordinatorCallError):
+        controller.add_task("只写一次", "Steve")
+    time.sleep(0.6)
+    titles = [t["title"] for t in BoardRegistry(boards.data_path).get().manager.data["tasks"].values()]
+    assert titles == ["只写一次"]
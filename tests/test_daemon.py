@@ -0,0 +1,91 @@
+import io
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from sakura_flow import daemon
+from sakura_flow.boards import BoardRegistry
+
+pytestmark = pytest.mark.skipif(not daemon.is_supported(), reason="需要 Unix 域套接字")
+
+
+@pytest.fixture
+def running_daemon(tmp_path):
+    data_path = str(tmp_path / 'sf_tasks' / 'tasks.json')
+    server = daemon.TodoDaemon(BoardRegistry(data_path), daemon.default_socket_path(data_path))
+    server.start()
+    yield server
+    server.stop()
+
+
+def test_forward_runs_command_in_daemon(running_daemon):
+    """转发的命令应在常驻进程中执行，输出经套接字返回"""
+    out = io.StringIO()
+    assert daemon.forward(running_daemon.socket_path, ['add', '建造刷铁机'], out)
+    assert out.getvalue() == "Task created with ID: 1\n"
+    assert running_daemon.boards.get().get_task('1')['title'] == '建造刷铁机'
+
+    out = io.StringIO()
+    assert daemon.forward(running_daemon.socket_path, ['list'], out)
+    assert '建造刷铁机' in out.getvalue()
+
+
+def test_forward_reports_argument_errors(running_daemon):
+    """参数错误不应导致守护进程退出"""
+    out = io.StringIO()
+    assert daemon.forward(running_daemon.socket_path, ['set', '1'], out)
+    assert out.getvalue().startswith("Error:")
+
+    out = io.StringIO()
+    assert daemon.forward(running_daemon.socket_path, ['list'], out)
+
+
+def test_forward_falls_back_without_daemon(tmp_path):
+    """没有守护进程或套接字残留时应回退到直接文件访问"""
+    socket_path = str(tmp_path / daemon.SOCKET_NAME)
+    assert not daemon.forward(socket_path, ['list'], io.StringIO())
+
+    # 模拟崩溃遗留的套接字文件
+    open(socket_path, 'w').close()
+    assert not daemon.forward(socket_path, ['list'], io.StringIO())
+
+
+def test_daemon_replaces_stale_socket(tmp_path):
+    data_path = str(tmp_path / 'tasks.json')
+    socket_path = daemon.default_socket_path(data_path)
+    open(socket_path, 'w').close()
+
+    server = daemon.TodoDaemon(BoardRegistry(data_path), socket_path)
+    server.start()
+    try:
+        assert daemon.forward(socket_path, ['list'], io.StringIO())
+    finally:
+        server.stop()
+    assert not os.path.exists(socket_path)
+
+
+def test_hosted_daemon_runs_on_host_thread(tmp_path):
+    """由插件托管时，命令与调用都在宿主（MCDR 任务执行）线程中执行，与插件指令串行"""
+    host = ThreadPoolExecutor(max_workers=1, thread_name_prefix="host")
+    threads = []
+
+    def run_in_host(fn):
+        def task():
+            threads.append(threading.current_thread().name)
+            return fn()
+        return host.submit(task).result()
+
+    data_path = str(tmp_path / 'sf_tasks' / 'tasks.json')
+    server = daemon.TodoDaemon(BoardRegistry(data_path), daemon.default_socket_path(data_path), run_in_host)
+    server.start()
+    try:
+        out = io.StringIO()
+        assert daemon.forward(server.socket_path, ['add', '建造刷铁机'], out)
+        assert out.getvalue() == "Task created with ID: 1\n"
+        assert server.call({"call": "add_note", "args": ["1", "进度", "Steve"]})["result"] is True
+        assert len(threads) == 2 and all(name.startswith("host") for name in threads)
+    finally:
+        server.stop()
+        host.shutdown()
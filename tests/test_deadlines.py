@@ -0,0 +1,60 @@
+import time
+
+import pytest
+
+from sakura_flow.controller import TodoController
+from sakura_flow.deadlines import ReminderScheduler, parse_deadline, to_epoch, TIME_FORMAT
+from sakura_flow.enums import Status
+from sakura_flow.manager import TodoManager
+
+
+def stamp(offset: float) -> str:
+    return time.strftime(TIME_FORMAT, time.localtime(time.time() + offset))
+
+
+def test_parse_deadline():
+    now = time.mktime((2024, 3, 1, 12, 0, 0, 0, 0, -1))
+    assert parse_deadline("+2h", now) == "2024-03-01 14:00:00"
+    assert parse_deadline("+1w", now) == "2024-03-08 12:00:00"
+    assert parse_deadline("2024-03-05") == "2024-03-05 23:59:59"
+    assert parse_deadline(" none ") == ""
+    with pytest.raises(ValueError):
+        parse_deadline("tomorrow")
+
+
+def test_deadline_index_and_reminders(tmp_path):
+    controller = TodoController(TodoManager(str(tmp_path / 'tasks.json')))
+    a = controller.add_task("烈焰人塔", "Steve")
+    b = controller.add_task("末地门", "Alex")
+    c = controller.add_task("下界合金", "Alex")
+    fired = []
+    scheduler = ReminderScheduler(lambda board, ctl, tid, kind: fired.append((tid, kind)))
+    scheduler.watch("default", controller)
+    woken = scheduler._wake
+    woken.clear()
+
+    assert controller.set_property(a, "due", "2000-01-01 08:00", "Steve")[1] == "2000-01-01 08:00:59"
+    assert controller.set_property(b, "due", stamp(3 * 86400), "Alex")[0] and woken.is_set()
+    controller.set_property(c, "deadline", stamp(30 * 86400), "Alex")
+    assert controller.set_property(c, "remind", "soon", "Alex")[2] == 'sakuraflow.msg.invalid_time'
+    controller.set_property(b, "remind", stamp(86400), "Alex")
+
+    # 已过期的任务排在最前；完成或清除后不再列出
+    assert [tid for _, tid in controller.upcoming_deadlines(7)] == [a, b]
+    controller.update_status(a, Status.DONE, "Steve")
+    assert [tid for _, tid in controller.upcoming_deadlines(60)] == [b, c]
+
+    # 调度线程只在到时后发出通知，且每个事件只通知一次；索引创建前已过去的时间不补发
+    assert scheduler.tick() == ReminderScheduler.MAX_SLEEP and fired == []
+    assert scheduler.tick(to_epoch(controller.get_task(b)["remind"]) - 10) == 10 and fired == []
+    scheduler.tick(time.time() + 4 * 86400)
+    assert fired == [(b, "remind"), (b, "due")]
+    scheduler.tick(time.time() + 4 * 86400)
+    assert len(fired) == 2
+
+    # 其他进程的修改在重新加载后重建索引
+    other = TodoController(TodoManager(controller.manager.data_path))
+    other.set_property(c, "due", "none", "Steve")
+    woken.clear()
+    controller.manager.refresh()
+    assert woken.is_set() and controller.upcoming_deadlines(60) == [(controller.get_task(b)["due"], b)]
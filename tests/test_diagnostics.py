@@ -0,0 +1,65 @@
+from unittest.mock import MagicMock
+
+from sakura_flow.controller import TodoController
+from sakura_flow.diagnostics import deep_sizeof, memory_report, allocation_sampler
+from sakura_flow.manager import TodoManager
+from sakura_flow.metrics import metrics
+
+
+def make_controller(tmp_path):
+    controller = TodoController(TodoManager(str(tmp_path / 'tasks.json')))
+    for i in range(20):
+        tid = controller.add_task(f"任务 {i}", "Steve")
+        controller.add_note(tid, "笔记" * 20, "Alex")
+        controller.append_list_property(tid, "labels", "test", "Steve")
+    return controller
+
+
+def test_deep_sizeof_counts_shared_objects_once():
+    shared = ["x" * 100]
+    seen = set()
+    first = deep_sizeof({"a": shared}, seen)
+    second = deep_sizeof({"b": shared}, seen)
+    assert second < first
+
+
+def test_memory_report_sections(tmp_path):
+    controller = make_controller(tmp_path)
+    controller.search_tasks({"creator": "Steve"}, "creator:Steve")
+    report = memory_report(controller)
+    assert report["task_count"] == 20 and report["note_count"] == 20
+    sections = report["sections"]
+    assert sections["notes"] > 0 and sections["list_properties"] > 0 and sections["search_cache"] > 0
+    assert report["total"] == sum(sections.values())
+
+    from sakura_flow.interface import UI
+    server = MagicMock()
+    server.tr.side_effect = lambda key, *args: key
+    assert "sakuraflow.debug.memory.total" in UI.render_memory_report(server, report).to_plain_text()
+
+
+def test_allocation_sampler_window(tmp_path):
+    controller = make_controller(tmp_path)
+    allocation_sampler.start(2)
+    for i in range(2):
+        assert allocation_sampler.active
+        with metrics.command("add"):
+            controller.add_task(f"采样 {i}", "Steve")
+    status = allocation_sampler.status()
+    assert not status["active"]
+    assert status["top"]
+
+
+def test_memory_report_sizes_each_index_separately(tmp_path):
+    """索引经 manager 互相可达，每个索引仍应只计入自身的结构"""
+    controller = make_controller(tmp_path)
+    controller.fuzzy_search({"title": "任务"})
+    controller.report()
+    controller.upcoming_deadlines(7)
+    controller.subtask_tree("1")
+    for name in ("assignments", "completion", "views"):
+        getattr(controller, name)
+    report = memory_report(controller)
+    indexes = report["indexes"]
+    assert len(indexes) == 7
+    assert all(0 < size < report["total"] for size in indexes.values()), indexes
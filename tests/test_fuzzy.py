@@ -0,0 +1,56 @@
+import random
+
+from sakura_flow.controller import TodoController
+from sakura_flow.fuzzy import BKTree, Vocabulary, edit_distance
+from sakura_flow.manager import TodoManager
+
+
+def test_bk_tree_matches_brute_force():
+    rng = random.Random(7)
+    words = {"".join(rng.choice("abcde") for _ in range(rng.randint(2, 8))) for _ in range(500)}
+    tree = BKTree()
+    for word in words:
+        tree.add(word)
+    assert tree.size == len(words)
+    for query in ("abc", "eeded", "ab", "bacdeab"):
+        expected = {(w, edit_distance(query, w)) for w in words if edit_distance(query, w) <= 2}
+        assert set(tree.search(query, 2)) == expected
+
+    # 计数归零的词不再出现，重新加入后恢复
+    vocab = Vocabulary()
+    vocab.add("redstone")
+    vocab.add("redstone")
+    vocab.discard("redstone")
+    assert vocab.lookup("redstome", 1) == [("redstone", 1)]
+    vocab.discard("redstone")
+    assert vocab.lookup("redstome", 1) == []
+    vocab.add("redstone")
+    assert vocab.lookup("redstome", 1) == [("redstone", 1)]
+
+
+def test_fuzzy_search_and_suggestions(tmp_path):
+    controller = TodoController(TodoManager(str(tmp_path / 'tasks.json')))
+    a = controller.add_task("Redstone clock", "Steve")
+    b = controller.add_task("Redstone computer", "Alex")
+    c = controller.add_task("Iron farm", "Alex")
+    controller.append_list_property(a, "label", "redstone", "Steve")
+    controller.append_list_property(c, "label", "farm", "Alex")
+
+    # 标题词拼错：按编辑距离排序，精确子串同样命中
+    results, suggestions = controller.fuzzy_search({"title": "redston"})
+    assert list(results) == [a, b]
+    assert suggestions == {"title": ["redstone"]}
+    results, _ = controller.fuzzy_search({"title": "Iron"})
+    assert list(results) == [c]
+
+    # 标签与玩家名拼错，其余条件仍精确匹配；取反的条件不做近似
+    results, suggestions = controller.fuzzy_search({"label": "redstnoe", "creator": "stev"})
+    assert list(results) == [a] and suggestions == {"label": ["redstone"], "creator": ["steve"]}
+    results, _ = controller.fuzzy_search({"creator": "alx", "status": "!Done", "label": "!farm"})
+    assert list(results) == [b]
+
+    # 索引随提交增量更新
+    controller.set_property(c, "title", "Gold farm", "Alex")
+    assert controller.fuzzy.similar("title", "iorn") == []
+    assert controller.fuzzy.similar("title", "gld") == [("gold", 1)]
+    assert list(controller.fuzzy_search({"title": "gokd"})[0]) == [c]
@@ -0,0 +1,88 @@
+import argparse
+import io
+import json
+
+from sakura_flow.cli_entry import register_cli_commands, handle_cli_command
+from sakura_flow.controller import TodoController
+from sakura_flow.enums import Status
+from sakura_flow.hierarchy import SubtaskIndex
+from sakura_flow.manager import TodoManager
+
+
+def snapshot(index: SubtaskIndex):
+    tasks = index.manager.data["tasks"]
+    return {tid: index.rollup(tid).to_dict() for tid in tasks if index.rollup(tid) is not None}
+
+
+def test_rollup_follows_status_changes_and_moves(tmp_path):
+    controller = TodoController(TodoManager(str(tmp_path / 'tasks.json')))
+    reactor = controller.add_task("聚变反应堆", "Steve")
+    wiring = controller.add_task("布线", "Steve", reactor)
+    cooling = controller.add_task("冷却系统", "Alex", reactor)
+    pump = controller.add_task("冷却泵", "Alex", cooling)
+    assert controller.add_task("屏蔽层", "Alex", "999") is None
+
+    controller.set_property(pump, "priority", "High", "Alex")
+    controller.set_property(pump, "tier", "EV", "Alex")
+    index = controller.subtasks
+    assert index.children(reactor) == [wiring, cooling]
+    assert index.rollup(reactor).to_dict() == {"done": 0, "total": 3, "priority": "High", "tier": "EV"}
+    assert controller.subtask_tree(reactor) == [(0, reactor), (1, wiring), (1, cooling), (2, pump)]
+
+    # 状态变化沿祖先链增量更新
+    controller.update_status(pump, Status.DONE, "Alex")
+    assert index.progress(cooling) == (1, 1) and index.progress(reactor) == (1, 3)
+    assert index.rollup(reactor).highest_priority == "Medium"
+
+    # 移动子树：旧祖先撤销、新祖先计入整棵子树；拒绝形成环
+    assert controller.set_property(reactor, "parent", pump, "Steve")[2] == 'sakuraflow.msg.parent_cycle'
+    controller.set_property(cooling, "parent", wiring, "Steve")
+    assert index.progress(wiring) == (1, 2) and index.progress(reactor) == (1, 3)
+    controller.set_property(cooling, "parent", "none", "Steve")
+    assert index.progress(reactor) == (0, 1) and index.progress(cooling) == (1, 1)
+
+    # 增量维护的结果与全量重建一致
+    rebuilt = SubtaskIndex(controller.manager)
+    assert snapshot(rebuilt) == snapshot(index)
+
+
+def test_import_remap_and_cli_tree(tmp_path):
+    controller = TodoController(TodoManager(str(tmp_path / 'tasks.json')))
+    controller.add_task("占位", "Steve")
+    # 子任务出现在父任务之前也能正确汇总
+    rows = [{"id": "11", "title": "线圈", "parent": "10", "status": "Done"}, {"id": "10", "title": "工业高炉"}]
+    controller.subtasks.children("1")
+    assert controller.import_tasks(rows, id_remap=True) == (2, 0)
+    coil, furnace = "2", "3"
+    assert controller.get_task(coil)["parent"] == furnace and controller.subtasks.progress(furnace) == (1, 1)
+
+    parser = argparse.ArgumentParser()
+    register_cli_commands(parser)
+    out = io.StringIO()
+    handle_cli_command(parser.parse_args(["add", "--parent", furnace, "外壳"]), controller, out)
+    handle_cli_command(parser.parse_args(["tree", furnace, "--format", "json"]), controller, out)
+    rows = json.loads(out.getvalue().split("\n", 1)[1])
+    assert [(row["depth"], row["id"]) for row in rows] == [(0, furnace), (1, coil), (1, "4")]
+    assert rows[0]["done"] == 1 and rows[0]["total"] == 2
+
+    out = io.StringIO()
+    handle_cli_command(parser.parse_args(["info", furnace]), controller, out)
+    assert "Subtasks: 1/2 done" in out.getvalue()
+
+
+def test_read_only_info_does_not_decode_board(tmp_path):
+    path = str(tmp_path / 'tasks.json')
+    writer = TodoController(TodoManager(path))
+    with writer.manager.transaction():
+        root = writer.add_task("主基地", "Steve")
+        for i in range(200):
+            writer.add_task(f"分区 {i}", "Steve", root)
+
+    # 只读快照中 info 只解码被查询的任务，不为子任务汇总构建索引
+    reader = TodoController(TodoManager(path, read_only=True))
+    parser = argparse.ArgumentParser()
+    register_cli_commands(parser)
+    out = io.StringIO()
+    handle_cli_command(parser.parse_args(["info", "42"]), reader, out)
+    assert "Parent: 1" in out.getvalue() and "subtasks" not in reader.indexes
+    assert reader.manager.data["tasks"].decoded_count() == 1
@@ -0,0 +1,83 @@
+import argparse
+import io
+import time
+
+import pytest
+
+from sakura_flow.cli_entry import register_cli_commands, handle_cli_command
+from sakura_flow.controller import TodoController
+from sakura_flow.history import normalize_timestamp
+from sakura_flow.manager import TodoManager
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """固定任务时间戳，便于按时刻回溯"""
+    now = ["2024-01-01 10:00:00"]
+    monkeypatch.setattr(time, "strftime", lambda fmt, t=None: now[0])
+    return now
+
+
+def test_point_in_time_reads(tmp_path, clock):
+    manager = TodoManager(str(tmp_path / 'tasks.json'))
+    manager.history.keyframe_interval = 3
+    controller = TodoController(manager)
+    tid = controller.add_task("任务", "Steve")
+    for day in range(2, 9):
+        clock[0] = f"2024-01-0{day} 10:00:00"
+        controller.set_property(tid, "title", f"任务 v{day}", "Alex")
+    clock[0] = "2024-01-09 10:00:00"
+    controller.add_note(tid, "进度", "Alex")
+    other = controller.add_task("后来的任务", "Steve")
+
+    assert controller.task_at(tid, "2024-01-01 12:00:00")["title"] == "任务"
+    assert controller.task_at(tid, normalize_timestamp("2024-01-05"))["title"] == "任务 v5"
+    assert controller.task_at(tid, "2024-01-09 10:00:00")["notes"][0]["content"] == "进度"
+    assert controller.task_at(other, "2024-01-08 00:00:00") is None
+    assert set(controller.tasks_at("2024-01-08 00:00:00")) == {tid}
+
+    # 关键帧按间隔写入，回溯从最近的关键帧开始
+    kinds = [is_key for _, _, is_key in manager.history._index[tid]]
+    assert kinds[0] and kinds.count(True) >= 3
+
+    # 其他进程通过索引文件读取同一份历史
+    history = TodoManager(str(tmp_path / 'tasks.json')).history
+    changes = history.changes(tid)
+    assert changes[0]["created"] and len(changes) == 9
+    assert changes[1]["changes"] == [("title", "任务", "任务 v2")]
+
+
+def test_history_for_pre_existing_task(tmp_path, clock):
+    """历史启用前就存在的任务在首次修改时补写基线关键帧"""
+    manager = TodoManager(str(tmp_path / 'tasks.json'))
+    tid = manager.add_task("旧任务", "Steve")
+    (tmp_path / 'tasks.json.history').unlink()
+    (tmp_path / 'tasks.json.history.idx').unlink()
+
+    manager = TodoManager(str(tmp_path / 'tasks.json'))
+    clock[0] = "2024-02-01 10:00:00"
+    manager.update_task(tid, "status", "Done", "Alex")
+    assert manager.history.state_at(tid, "2024-01-15 00:00:00")["status"] == "In Progress"
+    assert [c["changes"] for c in manager.history.changes(tid)] == [[("status", "In Progress", "Done")]]
+
+    parser = argparse.ArgumentParser()
+    register_cli_commands(parser)
+    out = io.StringIO()
+    handle_cli_command(parser.parse_args(["history", tid]), TodoController(manager), out)
+    assert "status: 'In Progress' -> 'Done'" in out.getvalue()
+
+
+def test_board_without_history_file(tmp_path):
+    # 历史记录功能加入之前创建的看板：只有数据文件，没有 .history 与 .history.idx
+    path = tmp_path / 'tasks.json'
+    path.write_text('{"next_id": 2, "tasks": {"1": {"title": "旧任务", "creator": "Steve", "status": "In Progress", '
+                    '"created_at": "2023-01-01 00:00:00"}}}', encoding='utf-8')
+    controller = TodoController(TodoManager(str(path)))
+    assert controller.get_task_history("1") == []
+    assert controller.task_at("1", "2023-06-01") is not None
+
+    parser = argparse.ArgumentParser()
+    register_cli_commands(parser)
+    out = io.StringIO()
+    handle_cli_command(parser.parse_args(["history", "1"]), controller, out)
+    assert "Traceback" not in out.getvalue()
@@ -0,0 +1,30 @@
+import json
+
+from sakura_flow.controller import TodoController
+from sakura_flow.lazy import LazyTasks
+from sakura_flow.manager import TodoManager
+
+
+def test_lazy_load_matches_full_load(tmp_path):
+    path = str(tmp_path / 'tasks.json')
+    writer = TodoController(TodoManager(path))
+    with writer.manager.transaction():
+        for i in range(1, 601):
+            tid = writer.add_task(f"任务 {i} \"引号\" }},\n        \"{i}\": {{", "Steve")
+            writer.add_note(tid, "笔记\\n", "Steve")
+        writer.save_view("mine", "c=Steve", {"creator": "Steve"}, "Steve")
+    full = json.load(open(path, encoding='utf-8'))
+
+    manager = TodoManager(path, read_only=True)
+    tasks = manager.data["tasks"]
+    assert isinstance(tasks, LazyTasks) and manager.data["views"] == full["views"]
+    assert tasks["42"] == full["tasks"]["42"] and tasks.decoded_count() == 1
+    assert list(tasks) == list(full["tasks"]) and dict(tasks.items()) == full["tasks"]
+
+
+def test_lazy_load_falls_back_for_other_layouts(tmp_path):
+    path = tmp_path / 'tasks.json'
+    path.write_text(json.dumps({"tasks": {"1": {"title": "紧凑格式"}}, "next_id": 2}), encoding='utf-8')
+    assert TodoManager(str(path), read_only=True).data["tasks"] == {"1": {"title": "紧凑格式"}}
+    path.write_text(json.dumps({"tasks": {}, "next_id": 1}, indent=4), encoding='utf-8')
+    assert TodoManager(str(path), read_only=True).data["tasks"] == {}
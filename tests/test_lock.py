@@ -0,0 +1,96 @@
+import errno
+import json
+import os
+import socket
+import subprocess
+import sys
+from unittest.mock import MagicMock
+
+import pytest
+
+from sakura_flow.lock import FileLock, LockTimeoutError
+from sakura_flow.metrics import metrics
+
+
+def dead_pid() -> int:
+    """获取一个已退出进程的 PID"""
+    proc = subprocess.Popen([sys.executable, '-c', 'pass'])
+    proc.wait()
+    return proc.pid
+
+
+def test_lock_records_holder(tmp_path):
+    lock = FileLock(str(tmp_path / 'tasks.json.lock'), role="CLI")
+    with metrics.command("set"):
+        with lock.lock():
+            holder = lock.read_holder()
+            assert holder["role"] == "CLI" and holder["command"] == "set"
+            assert lock.diagnose()["holder"]["stale"] is False
+    assert lock.read_holder() is None
+
+
+def test_timeout_reports_holder(tmp_path):
+    path = str(tmp_path / 'tasks.json.lock')
+    holder = FileLock(path, role="MCDR")
+    holder.acquire()
+    try:
+        with pytest.raises(LockTimeoutError) as info:
+            FileLock(path, timeout=0.2, delay=0.05, role="CLI").acquire()
+        assert info.value.holder["role"] == "MCDR"
+        assert "held by pid" in str(info.value)
+        assert isinstance(info.value, TimeoutError)
+    finally:
+        holder.release()
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason="Windows 上无法安全探测 PID")
+def test_stale_lock_is_broken(tmp_path):
+    path = tmp_path / 'tasks.json.lock'
+    record = {"pid": dead_pid(), "role": "CLI", "command": "add", "acquired_at": 0, "host": socket.gethostname()}
+    path.write_text(json.dumps(record))
+
+    strict = FileLock(str(path), timeout=0.2, delay=0.05, break_stale=False)
+    assert strict.diagnose()["holder"]["stale"] is True
+    with pytest.raises(LockTimeoutError, match="stale"):
+        strict.acquire()
+
+    lock = FileLock(str(path), timeout=0.2, delay=0.05)
+    lock.acquire()
+    assert lock.read_holder()["pid"] != record["pid"]
+    lock.release()
+
+
+def test_render_lock_report(tmp_path):
+    from sakura_flow.interface import UI
+
+    server = MagicMock()
+    server.tr.side_effect = lambda key, *args: key
+    lock = FileLock(str(tmp_path / 'tasks.json.lock'))
+    with lock.lock():
+        text = UI.render_lock_report(server, lock.diagnose()).to_plain_text()
+    assert 'sakuraflow.debug.lock.holder_info' in text
+
+
+def test_other_os_errors_become_lock_failures(tmp_path, monkeypatch):
+    """创建锁文件时的其他 OSError 重试到超时后报告为获取锁失败；写入记录失败不留下残留的锁文件"""
+    path = tmp_path / 'tasks.json.lock'
+
+    def read_only_fs(*args):
+        raise OSError(errno.EROFS, "Read-only file system")
+    monkeypatch.setattr("sakura_flow.lock.os.open", read_only_fs)
+    with pytest.raises(LockTimeoutError) as info:
+        FileLock(str(path), timeout=0.1, delay=0.02).acquire()
+    assert info.value.__cause__.errno == errno.EROFS
+    monkeypatch.undo()
+
+    real_write, failures = os.write, [OSError(errno.ENOSPC, "No space left on device")]
+
+    def flaky_write(fd, data):
+        if failures:
+            raise failures.pop()
+        return real_write(fd, data)
+    monkeypatch.setattr("sakura_flow.lock.os.write", flaky_write)
+    lock = FileLock(str(path), timeout=1, delay=0.02, role="CLI")
+    with lock.lock():
+        assert lock.read_holder()["role"] == "CLI"
+    assert not path.exists()
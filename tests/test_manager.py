@@ -0,0 +1,92 @@
+import os
+
+import pytest
+
+from sakura_flow.manager import TodoManager
+
+
+def test_refresh_skips_unchanged_file(tmp_path):
+    """文件未被其他进程修改时，refresh 不应重新解析"""
+    data_path = str(tmp_path / 'tasks.json')
+    manager = TodoManager(data_path)
+    manager.add_task("任务", "Steve")
+    assert not manager.refresh()
+
+    # 另一个进程写入后应重新加载
+    other = TodoManager(data_path)
+    other.add_task("另一个任务", "Alex")
+    assert manager.refresh()
+    assert set(manager.data["tasks"]) == {"1", "2"}
+
+
+def test_id_sequence_leases_and_migrates(tmp_path):
+    """ID 由序列文件分配：旧数据按 next_id 起步，租约未用完的部分可以归还"""
+    data_path = str(tmp_path / 'tasks.json')
+    with open(data_path, 'w', encoding='utf-8') as f:
+        f.write('{"tasks": {"7": {"title": "旧任务"}}, "next_id": 5, "default_tier": "LV"}')
+
+    first = TodoManager(data_path)
+    first.ids.block_size = 10
+    assert first.add_task("任务", "Steve") == "8"
+    # 另一个进程从租约之后开始分配
+    second = TodoManager(data_path)
+    assert second.add_task("任务", "Alex") == "18"
+    assert first.add_task("任务", "Steve") == "9"
+    assert second.data["next_id"] == 19
+
+    # 已被他人预留过，first 的剩余租约只能作废
+    first.ids.release()
+    assert second.ids.peek() == 19
+    second.ids.block_size = 5
+    assert second.add_task("任务", "Alex") == "19"
+    second.ids.release()
+    assert second.ids.peek() == 20
+
+    # 非数字 ID 的行被跳过，保留的数字 ID 推进序列
+    assert second.import_tasks([{"id": "a", "title": "导入"}, {"id": "100", "title": "导入"}]) == (1, 1)
+    assert second.ids.peek() == 101
+    second.import_tasks([{"id": "1", "title": "重排"}], id_remap=True)
+    assert "101" in second.data["tasks"] and second.ids.peek() == 102
+
+
+def test_savepoint_undoes_only_its_own_writes(tmp_path):
+    """保存点内抛出异常时只撤销保存点内的修改，提交的变更通知中也不包含它们"""
+    manager = TodoManager(str(tmp_path / 'tasks.json'))
+    manager.add_task("任务", "Steve")
+    commits = []
+    manager.listeners.append(type("L", (), {"on_commit": lambda self, changes: commits.append(changes)})())
+    with manager.transaction():
+        manager.add_note("1", "保留", "Steve")
+        try:
+            with manager.savepoint():
+                manager.add_note("1", "撤销", "Alex")
+                manager.add_task("撤销", "Alex")
+                manager.data["default_tier"] = "EV"
+                raise ValueError
+        except ValueError:
+            pass
+    task = manager.data["tasks"]["1"]
+    assert [n["content"] for n in task["notes"]] == ["保留"] and list(manager.data["tasks"]) == ["1"]
+    assert manager.data["default_tier"] == "LV"
+    assert [(tid, editor) for tid, _, _, editor in commits[0]] == [("1", "Steve")]
+
+
+def test_failed_save_rolls_back_and_raises(tmp_path, monkeypatch):
+    """保存失败时事务应抛出异常并回滚，监听者不会收到从未写入磁盘的变更"""
+    data_path = str(tmp_path / 'tasks.json')
+    manager = TodoManager(data_path)
+    manager.add_task("任务", "Steve")
+    commits = []
+    manager.listeners.append(type("L", (), {"on_commit": lambda self, changes: commits.append(changes)})())
+
+    def fail_replace(src, dst):
+        raise OSError(28, "No space left on device")
+    monkeypatch.setattr("sakura_flow.manager.os.replace", fail_replace)
+    with pytest.raises(OSError):
+        manager.add_note("1", "写不进去", "Alex")
+    monkeypatch.undo()
+
+    assert manager.data["tasks"]["1"]["notes"] == [] and commits == []
+    assert len(manager.history.changes("1")) == 1
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+    assert TodoManager(data_path).data["tasks"]["1"]["notes"] == []
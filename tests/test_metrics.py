@@ -0,0 +1,47 @@
+from unittest.mock import MagicMock
+
+from sakura_flow.manager import TodoManager
+from sakura_flow.metrics import Metrics, metrics, percentile
+
+
+def test_percentile_nearest_rank():
+    samples = sorted(float(i) for i in range(1, 101))
+    assert percentile(samples, 50) == 50.0
+    assert percentile(samples, 99) == 99.0
+    assert percentile([], 50) == 0.0
+
+
+def test_command_phase_split(tmp_path):
+    """事务中的锁等待、加载、修改、保存应分别计入当前命令"""
+    metrics.reset()
+    manager = TodoManager(str(tmp_path / 'tasks.json'))
+    with metrics.command("add"):
+        manager.add_task("任务", "Steve")
+    snapshot = metrics.snapshot()
+    entry = snapshot["commands"]["add"]
+    assert entry["calls"] == 1
+    assert entry["phases"]["save"] > 0
+    assert snapshot["counters"]["saves"] == 1
+    assert snapshot["counters"]["bytes_written"] == (tmp_path / 'tasks.json').stat().st_size
+
+
+def test_slow_command_warning():
+    warnings = []
+    m = Metrics()
+    m.configure(slow_threshold_ms=0, slow_logger=warnings.append)
+    with m.command("list"):
+        pass
+    assert len(warnings) == 1 and "list" in warnings[0]
+
+
+def test_render_stats():
+    from sakura_flow.interface import UI
+
+    server = MagicMock()
+    server.tr.side_effect = lambda key, *args: key
+    m = Metrics()
+    with m.command("list"):
+        m.incr("cache_hits")
+    lines = UI.render_stats(server, m.snapshot())
+    assert len(lines) == 4
+    assert "cache_hit_rate" in lines[2].to_plain_text()
@@ -0,0 +1,86 @@
+import argparse
+import io
+
+import pytest
+
+from sakura_flow.cli_entry import register_cli_commands, handle_cli_command
+from sakura_flow.controller import TodoController
+from sakura_flow.manager import TodoManager
+
+
+def test_compact_keeps_newest_notes(tmp_path):
+    data_path = str(tmp_path / 'tasks.json')
+    manager = TodoManager(data_path)
+    tid = manager.add_task("任务", "Steve")
+    for i in range(10):
+        manager.add_note(tid, f"进度 {i}", "Alex")
+    # 手动构造一条很旧的笔记
+    with manager.transaction():
+        manager.data["tasks"][tid]["notes"][-1]["time"] = "2000-01-01 00:00:00"
+
+    result = manager.compact_notes(max_age_days=0, keep_latest=3)
+    assert result["notes"] == 7 and result["tasks"] == 1
+    assert result["bytes_after"] < result["bytes_before"]
+    task = manager.data["tasks"][tid]
+    assert [n["content"] for n in task["notes"]] == ["进度 7", "进度 8", "进度 9"]
+    assert task["archived_notes"] == 7
+
+    # 归档在重新加载后仍可按需读取，且不会重复归档
+    reloaded = TodoManager(data_path)
+    assert [n["content"] for n in reloaded.note_archive.read(tid)] == [f"进度 {i}" for i in range(7)]
+    result = reloaded.compact_notes(max_age_days=365, keep_latest=0)
+    assert result["notes"] == 1
+    assert len(reloaded.note_archive.read(tid)) == 8 and reloaded.data["tasks"][tid]["notes"][0]["content"] == "进度 7"
+
+
+def test_cli_info_all_shows_archived(tmp_path):
+    controller = TodoController(TodoManager(str(tmp_path / 'tasks.json')))
+    tid = controller.add_task("任务", "Steve")
+    controller.add_note(tid, "旧记录", "Alex")
+    controller.add_note(tid, "新记录", "Alex")
+    controller.compact_notes(0, 1)
+
+    parser = argparse.ArgumentParser()
+    register_cli_commands(parser)
+    out = io.StringIO()
+    handle_cli_command(parser.parse_args(["info", tid]), controller, out)
+    assert "旧记录" not in out.getvalue() and "1 older note(s) archived" in out.getvalue()
+    out = io.StringIO()
+    handle_cli_command(parser.parse_args(["info", tid, "--all"]), controller, out)
+    assert "旧记录 (archived)" in out.getvalue() and "新记录" in out.getvalue()
+
+
+def test_compact_after_failed_commit_does_not_duplicate(tmp_path, monkeypatch):
+    manager = TodoManager(str(tmp_path / 'tasks.json'))
+    tid = manager.add_task("任务", "Steve")
+    for i in range(5):
+        manager.add_note(tid, f"进度 {i}", "Alex")
+    manager.compact_notes(max_age_days=0, keep_latest=4)
+
+    # 归档已写入但保存失败：事务回滚，笔记仍在数据文件中
+    def fail():
+        raise OSError("disk full")
+    monkeypatch.setattr(manager, "save", fail)
+    with pytest.raises(OSError):
+        manager.compact_notes(max_age_days=0, keep_latest=2)
+    monkeypatch.undo()
+    assert len(manager.data["tasks"][tid]["notes"]) == 4
+
+    manager.compact_notes(max_age_days=0, keep_latest=2)
+    archived = [n["content"] for n in manager.note_archive.read(tid)]
+    assert archived == ["进度 0", "进度 1", "进度 2"] and manager.data["tasks"][tid]["archived_notes"] == 3
+
+
+def test_compact_notifies_listeners(tmp_path):
+    """压缩同样产生变更记录，监听者（派生索引、历史、协调者的通知）能看到笔记的变化"""
+    manager = TodoManager(str(tmp_path / 'tasks.json'))
+    tid = manager.add_task("任务", "Steve")
+    for i in range(3):
+        manager.add_note(tid, f"进度 {i}", "Alex")
+    commits = []
+    manager.listeners.append(type("L", (), {"on_commit": lambda self, changes: commits.append(changes)})())
+
+    manager.compact_notes(max_age_days=0, keep_latest=1)
+    [(changed, before, after, editor)] = commits[-1]
+    assert changed == tid and editor == "Compact"
+    assert len(before["notes"]) == 3 and after["notes"][0]["content"] == "进度 2" and after["archived_notes"] == 2
@@ -0,0 +1,57 @@
+import argparse
+import io
+import json
+
+import pytest
+
+from sakura_flow import lazy, snapshot
+from sakura_flow.boards import BoardRegistry
+from sakura_flow.cli_entry import register_cli_commands, handle_cli_command, READ_ONLY_COMMANDS
+from sakura_flow.controller import TodoController
+from sakura_flow.manager import TodoManager, ReadOnlyError
+
+
+def test_snapshot_reader_reuses_published_index(tmp_path, monkeypatch):
+    path = str(tmp_path / 'tasks.json')
+    writer = TodoController(TodoManager(path))
+    with writer.manager.transaction():
+        for i in range(1, 51):
+            writer.add_task(f"任务 {i}", "Steve")
+    version = json.load(open(path, encoding='utf-8'))["version"]
+
+    # 写者持有锁期间读取者照常打开最新版本
+    with writer.manager.file_lock.lock():
+        reader = TodoManager(path, read_only=True)
+    assert reader.data["version"] == version and len(reader.data["tasks"]) == 50
+    assert reader.data["tasks"]["7"]["title"] == "任务 7" and reader.data["tasks"].decoded_count() == 1
+    with pytest.raises(ReadOnlyError):
+        TodoController(reader).add_task("写入", "Alex")
+
+    # 同一版本的后续读取者直接使用已发布的索引
+    def no_scan(buf):
+        raise AssertionError("snapshot index was not reused")
+    monkeypatch.setattr(lazy, "scan", no_scan)
+    full = json.load(open(path, encoding='utf-8'))
+    assert dict(TodoManager(path, read_only=True).data["tasks"].items()) == full["tasks"]
+
+    # 新版本使旧索引失效
+    monkeypatch.undo()
+    writer.add_task("新任务", "Alex")
+    assert reader.refresh() and reader.data["version"] == version + 1 and len(reader.data["tasks"]) == 51
+    assert json.load(open(snapshot.index_path_for(path)))["stamp"] == list(reader._file_stamp)
+
+
+def test_read_only_cli_commands(tmp_path):
+    writer = BoardRegistry(str(tmp_path / 'tasks.json')).get()
+    writer.add_task("地基", "Steve")
+    controller = BoardRegistry(str(tmp_path / 'tasks.json'), read_only=True).get()
+    assert controller.manager.read_only
+
+    parser = argparse.ArgumentParser()
+    register_cli_commands(parser)
+    out = io.StringIO()
+    for argv in (["list", "--format", "json"], ["info", "1"], ["export", "--format", "jsonl"]):
+        handle_cli_command(parser.parse_args(argv), controller, out)
+    assert "地基" in out.getvalue()
+    # 需要遍历全部任务构建索引的命令不走快照，否则会逐个解码整个看板
+    assert not READ_ONLY_COMMANDS & {"tree", "report", "due"}
@@ -0,0 +1,31 @@
+import json
+
+import pytest
+
+from benchmarks.stress import run_stress, verify, SHARED_TASKS
+from sakura_flow.controller import TodoController
+from sakura_flow.manager import TodoManager
+
+
+@pytest.mark.stress
+def test_concurrent_writers_lose_nothing():
+    """多个 CLI 与常驻进程同时写入同一看板，结束后所有写入都应保留"""
+    report = run_stress(workers=4, ops=30, seed=1)
+    assert report["violations"] == []
+    assert report["total_ops"] == 120 and report["failed_ops"] == 0
+    assert report["lock_wait_ms"]["count"] >= report["total_ops"] and report["ops_per_sec"] > 0
+    json.dumps(report)
+
+
+def test_verify_reports_lost_writes(tmp_path):
+    path = str(tmp_path / 'tasks.json')
+    controller = TodoController(TodoManager(path))
+    for i in range(SHARED_TASKS + 1):
+        controller.add_task(f"任务 {i}", "Steve")
+    controller.add_note("1", "w0-n1", "w0")
+    log = {"created": ["5"], "titles": {"5": "w0-s2"}, "labels": [("2", "w0-l3")],
+           "notes": [("1", "w0-n1"), ("1", "w0-n4")], "completed": ["5"]}
+    violations = verify(path, [log])
+    assert len(violations) == 4 and "1 note(s) lost" in violations[0]
+    assert verify(path, [log, dict(log, titles={}, labels=[], notes=[], completed=[])])[0].startswith(
+        "task IDs handed out more than once")
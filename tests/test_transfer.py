@@ -0,0 +1,99 @@
+import io
+
+import pytest
+
+from sakura_flow import transfer
+from sakura_flow.controller import TodoController
+from sakura_flow.manager import TodoManager
+
+
+@pytest.fixture
+def source_manager(tmp_path):
+    manager = TodoManager(str(tmp_path / 'src' / 'tasks.json'))
+    manager.add_task("建造刷铁机", "Steve")
+    manager.add_task("收集床, \"红色\"", "Alex")
+    manager.update_task("1", "dependencies", "2", "Steve")
+    manager.update_task("1", "labels", "工业", "Steve")
+    manager.add_note("2", "已收集 12 张床\n还差 8 张", "Alex")
+    return manager
+
+
+@pytest.mark.parametrize("fmt", transfer.FORMATS)
+def test_round_trip(tmp_path, source_manager, fmt):
+    """导出后再导入应得到相同的任务"""
+    buffer = io.StringIO()
+    assert transfer.export_tasks(source_manager.data["tasks"], buffer, fmt) == 2
+
+    target = TodoManager(str(tmp_path / 'dst' / 'tasks.json'))
+    buffer.seek(0)
+    assert target.import_tasks(transfer.read_tasks(buffer, fmt)) == (2, 0)
+    assert target.data["tasks"] == source_manager.data["tasks"]
+    assert target.data["next_id"] == 3
+
+
+def test_import_skips_conflicts_and_remaps(tmp_path, source_manager):
+    buffer = io.StringIO()
+    transfer.export_tasks(source_manager.data["tasks"], buffer, "jsonl")
+
+    # 目标看板已有 ID 1，保留原 ID 时冲突行被跳过
+    target = TodoManager(str(tmp_path / 'dst' / 'tasks.json'))
+    target.add_task("已有任务", "Console")
+    buffer.seek(0)
+    assert target.import_tasks(transfer.read_tasks(buffer, "jsonl")) == (1, 1)
+
+    # 重新分配 ID 时依赖同步改写
+    buffer.seek(0)
+    assert target.import_tasks(transfer.read_tasks(buffer, "jsonl"), id_remap=True) == (2, 0)
+    assert target.data["tasks"]["3"]["title"] == "建造刷铁机"
+    assert target.data["tasks"]["3"]["dependencies"] == ["4"]
+    assert target.data["next_id"] == 5
+
+
+def test_import_is_streamed(tmp_path):
+    """导入应逐行消费输入，而非预先读取全部行"""
+    consumed = []
+
+    def rows():
+        for i in range(1, 4):
+            consumed.append(i)
+            yield {"id": str(i), "title": f"t{i}", "status": "bogus"}
+
+    reader = rows()
+    manager = TodoManager(str(tmp_path / 'tasks.json'))
+    assert manager.import_tasks(reader) == (3, 0)
+    assert consumed == [1, 2, 3]
+    assert manager.data["tasks"]["2"]["status"] == "In Progress"
+
+
+def test_invalid_jsonl_line():
+    with pytest.raises(ValueError):
+        list(transfer.read_tasks(io.StringIO('{"id": "1"}\nnot json\n'), "jsonl"))
+
+
+def test_failed_import_rolls_back(tmp_path):
+    """导入中途出错时不应留下部分导入的任务"""
+    manager = TodoManager(str(tmp_path / 'tasks.json'))
+    manager.add_task("已有任务", "Console")
+    with pytest.raises(ValueError):
+        manager.import_tasks(transfer.read_tasks(io.StringIO('{"id": "5", "title": "a"}\nnot json\n'), "jsonl"))
+    assert list(manager.data["tasks"]) == ["1"]
+    manager.add_task("新任务", "Console")
+    assert list(TodoManager(str(tmp_path / 'tasks.json')).data["tasks"]) == ["1", "2"]
+
+
+def test_import_validates_fields_and_ids(tmp_path):
+    manager = TodoManager(str(tmp_path / 'tasks.json'))
+    rows = [
+        {"id": "../x", "title": "越界"},
+        {"id": "1a", "title": "非数字"},
+        {"id": "7", "title": {"text": "对象"}, "creator": 42, "labels": ["iron", {"x": 1}, 3],
+         "notes": [{"time": "2024-01-01 00:00:00", "author": "Steve", "content": "ok"}, "bad", {"time": 1}],
+         "archived_notes": 5, "secret": "丢弃"},
+    ]
+    assert manager.import_tasks(rows) == (1, 2)
+    task = manager.data["tasks"]["7"]
+    assert task["title"] == "" and task["creator"] == "42" and task["labels"] == ["3", "iron"]
+    assert [n["content"] for n in task["notes"]] == ["ok"]
+    assert "archived_notes" not in task and "secret" not in task
+    # 索引可以正常处理导入的任务
+    assert TodoController(manager).search_tasks({"title": "对象"}) == {}
@@ -0,0 +1,34 @@
+from sakura_flow.controller import TodoController
+from sakura_flow.enums import Status
+from sakura_flow.manager import TodoManager
+
+
+def test_saved_view_is_maintained_incrementally(tmp_path):
+    controller = TodoController(TodoManager(str(tmp_path / 'tasks.json')))
+    a = controller.add_task("铁傀儡农场", "Alex")
+    b = controller.add_task("刷铁机", "Steve")
+    controller.append_list_property(a, "label", "iron", "Alex")
+    controller.save_view("iron", "l=iron s=!Done", {"label": "iron", "status": "!Done"}, "Alex")
+    assert list(controller.run_view("iron")) == [a]
+    assert controller.run_view("missing") is None
+
+    # 结果随提交增量更新，不重新扫描看板
+    view = controller.views._views["iron"]
+    controller.append_list_property(b, "label", "iron", "Steve")
+    controller.update_status(a, Status.DONE, "Alex")
+    assert controller.views._views["iron"] is view
+    assert list(controller.run_view("iron")) == [b]
+    assert controller.run_view("iron") == controller.search_tasks({"label": "iron", "status": "!Done"})
+
+    # 视图随看板保存，其他进程的修改在重新加载后生效
+    other = TodoController(TodoManager(controller.manager.data_path))
+    assert list(other.run_view("iron")) == [b]
+    other.save_view("iron", "l=iron", {"label": "iron"}, "Steve")
+    c = other.add_task("铁砧", "Steve")
+    other.append_list_property(c, "label", "IRON", "Steve")
+    controller.manager.refresh()
+    assert list(controller.run_view("iron")) == [a, b, c]
+
+    assert controller.delete_view("iron")
+    assert not controller.delete_view("iron")
+    assert controller.run_view("iron") is None and controller.list_views() == {}